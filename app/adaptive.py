@@ -0,0 +1,84 @@
+"""
+Adaptive polling
+Scrapes busy sources more often and quiet ones less: after every run the
+interval of its source is set to the time in which about target_new_jobs
+new jobs are expected.
+
+The arrival rate of a source is an exponentially weighted average over its
+completed runs of the new jobs per second, i.e. each run's new jobs divided
+by the time since the run before it, so the latest runs count most. The
+interval is kept between the source's min_interval and max_interval (see
+app/schedule.py) and rounded to ADAPTIVE_STEP_SECONDS, so a job is only
+rescheduled when the rate really changes.
+
+Settings:
+    ADAPTIVE_ALPHA          (default 0.3, weight of the latest run)
+    ADAPTIVE_HISTORY        (default 24, completed runs considered)
+    ADAPTIVE_STEP_SECONDS   (default 300)
+"""
+import os
+
+from app.models import db, ScraperRun
+from app.schedule import trigger_for
+
+ADAPTIVE_ALPHA = float(os.environ.get('ADAPTIVE_ALPHA', 0.3))
+ADAPTIVE_HISTORY = int(os.environ.get('ADAPTIVE_HISTORY', 24))
+ADAPTIVE_STEP_SECONDS = float(os.environ.get('ADAPTIVE_STEP_SECONDS', 300))
+
+
+def ewma_rate(runs, alpha=ADAPTIVE_ALPHA):
+    """
+    Weighted new jobs per second of runs given oldest first
+
+    Args:
+        runs: Rows with start_time and new_jobs
+
+    Returns:
+        The rate, or None with fewer than two runs
+    """
+    rate = None
+    for previous, run in zip(runs, runs[1:]):
+        seconds = (run.start_time - previous.start_time).total_seconds()
+        if seconds <= 0:
+            continue
+        sample = (run.new_jobs or 0) / seconds
+        rate = sample if rate is None else alpha * sample + (1 - alpha) * rate
+    return rate
+
+
+def arrival_rate(source, history=ADAPTIVE_HISTORY):
+    """New jobs per second of `source` (inside an app context), None without history"""
+    runs = db.session.query(ScraperRun.start_time, ScraperRun.new_jobs).filter(
+        ScraperRun.source == source,
+        ScraperRun.status == 'completed'
+    ).order_by(ScraperRun.end_time.desc()).limit(history + 1).all()
+    runs.reverse()
+    return ewma_rate(runs)
+
+
+def adapted_interval(entry, rate):
+    """Seconds between runs of a source at `rate`, within its bounds"""
+    if rate is None:
+        return entry.interval
+    if rate <= 0:
+        return entry.max_interval
+    interval = round(entry.target_new_jobs / rate / ADAPTIVE_STEP_SECONDS) * ADAPTIVE_STEP_SECONDS
+    return min(max(interval, entry.min_interval), entry.max_interval)
+
+
+def adapt_job(scheduler, entry, job_id):
+    """
+    Reschedule the job of a source at its adapted interval (inside an app
+    context); the job keeps its slot offset and jitter
+
+    Returns:
+        The interval in seconds
+    """
+    interval = adapted_interval(entry, arrival_rate(entry.source))
+    job = scheduler.get_job(job_id)
+    if job is not None and job.trigger.interval_length != interval:
+        print(f"📈 {entry.source}: scraping every {interval / 60:g} min "
+              f"(was {job.trigger.interval_length / 60:g} min)")
+        scheduler.modify_job(job_id, kwargs={'cooldown': interval / 2})
+        scheduler.reschedule_job(job_id, trigger=trigger_for(entry, interval))
+    return interval
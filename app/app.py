@@ -1,62 +1,143 @@
 """
 Flask application for Job Hunter
+Importing this module only defines the routes (on the `main` blueprint);
+create_app() builds an application: configuration, database engine,
+PRAGMAs and schema migrations. Background code (scheduler, scrapers) runs
+against get_app(), the process-wide application built from the
+environment on first use. `from app.app import app` still works and
+returns that application.
 """
-from flask import Flask, jsonify, render_template
+from flask import (Blueprint, Flask, Response, current_app, has_app_context, jsonify,
+                   make_response, render_template, request, stream_with_context)
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import datetime
+import base64
+import binascii
+import functools
+import hashlib
+import threading
 from app.models import db, Job, ScraperRun
+from app.migrations import init_database
+from app.search import search_jobs
+from app.facets import FACET_DIMENSIONS, facet_counts, filter_conditions
+from app.trends import get_trends
+from app.export import EXPORT_FORMATS, export_jobs
+from app.events import bus, event_stream
+from app.compression import init_compression
+from app.metrics import init_metrics, render_metrics
+from app.eligibility import check_all, check_batch, check_source
+from app.leader import owns_scrapers
+from app.serialization import JOB_FIELDS, job_columns, job_dicts, json_response, run_columns, run_dicts
+from app import stats
+from app.sqlite_profile import apply_sqlite_profile, sqlite_engine_options, sqlite_pragmas_from_env
 import os
 
-app = Flask(__name__, 
-            template_folder='../templates',
-            static_folder='../static')
-CORS(app)
+bp = Blueprint('main', __name__)
 
-# Configuration
-# Use absolute path for database to ensure it's in a predictable location
-DB_PATH = os.environ.get('DATABASE_PATH')
-if not DB_PATH:
-    # Default to /app/data/jobs.db in container, or local path if running locally
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    DB_PATH = os.path.join(data_dir, 'jobs.db')
+_default = {'app': None}
+_default_lock = threading.Lock()
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'your-secret-key-here'
 
-print(f"\n{'='*60}")
-print(f"📁 Database location: {DB_PATH}")
-print(f"{'='*60}\n")
+def database_path():
+    """DATABASE_PATH, or data/jobs.db next to the app package (created if missing)"""
+    path = os.environ.get('DATABASE_PATH')
+    if not path:
+        # Default to /app/data/jobs.db in container, or local path if running locally
+        data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        path = os.path.join(data_dir, 'jobs.db')
+    return path
 
-# Initialize database
-db.init_app(app)
 
+def create_app(config=None):
+    """
+    Build the Flask application
+    
+    Args:
+        config: Settings overriding the defaults, e.g. {'DATABASE_PATH': ...}.
+                INIT_DATABASE=False skips table creation and migrations.
+    
+    Returns:
+        The configured Flask application
+    """
+    app = Flask(__name__,
+                template_folder='../templates',
+                static_folder='../static')
+    config = dict(config or {})
+    db_path = config.get('DATABASE_PATH') or database_path()
+    app.config.update(
+        DATABASE_PATH=db_path,
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS=sqlite_engine_options(),
+        SQLITE_PRAGMAS=sqlite_pragmas_from_env(),
+        SECRET_KEY='your-secret-key-here',
+        INIT_DATABASE=True,
+    )
+    app.config.update(config)
+    
+    db.init_app(app)
+    with app.app_context():
+        # First, so that the request timing covers the other hooks
+        init_metrics(app, db.engine)
+    CORS(app)
+    init_compression(app)
+    app.register_blueprint(bp)
+    
+    with app.app_context():
+        # Apply WAL / busy_timeout / cache PRAGMAs to every pooled connection
+        apply_sqlite_profile(db.engine, app.config['SQLITE_PRAGMAS'])
+        # Create tables and bring existing databases up to date
+        if app.config['INIT_DATABASE']:
+            init_database()
+    
+    print(f"\n{'='*60}")
+    print(f"📁 Database location: {db_path}")
+    print(f"{'='*60}\n")
+    return app
 
-# Create tables
-with app.app_context():
-    db.create_all()
 
+def get_app():
+    """
+    The current application inside an app context, else the process-wide
+    one (created from the environment on first use)
+    """
+    if has_app_context():
+        return current_app._get_current_object()
+    with _default_lock:
+        if _default['app'] is None:
+            _default['app'] = create_app()
+        return _default['app']
 
-@app.route('/')
+
+def __getattr__(name):
+    # Lazy module attributes: `from app.app import app` builds the app on first use
+    if name == 'app':
+        return get_app()
+    if name == 'DB_PATH':
+        return get_app().config['DATABASE_PATH']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@bp.route('/')
 def home():
     """Home page"""
     return render_template('home.html')
 
 
-@app.route('/linkedin')
+@bp.route('/linkedin')
 def linkedin_page():
     """LinkedIn jobs page"""
     return render_template('linkedin.html')
 
 
-@app.route('/stepstone')
+@bp.route('/stepstone')
 def stepstone_page():
     """Stepstone jobs page"""
     return render_template('stepstone.html')
 
 
-@app.route('/glassdoor')
+@bp.route('/glassdoor')
 def glassdoor_page():
     """Glassdoor jobs page"""
     return render_template('glassdoor.html')
@@ -64,190 +145,397 @@ def glassdoor_page():
 
 # API Endpoints
 
-@app.route('/api/stats')
+def _runs_version():
+    """Latest scraper run id and end time; changes whenever a run starts or finishes"""
+    return db.session.query(
+        db.func.max(ScraperRun.id), db.func.max(ScraperRun.end_time)
+    ).one()
+
+
+def etag_from_runs(view):
+    """
+    Strong ETag / If-None-Match support for endpoints whose data only
+    changes with scraper runs
+
+    The ETag is derived from the request URL and _runs_version(), so a
+    matching If-None-Match is answered with 304 after a single index-only
+    query, before the view runs. The weak form sent with compressed
+    responses (app/compression.py) matches as well. Time-relative fields (rolling last-hour
+    counts, minutes since a run) are as of the response that set the ETag.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        last_run_id, last_end_time = _runs_version()
+        etag = hashlib.sha1(
+            f'{request.full_path}|{last_run_id}|{last_end_time}'.encode()
+        ).hexdigest()
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # Browsers must revalidate instead of reusing a cached copy
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+@bp.route('/metrics')
+def metrics():
+    """Request and scraper metrics of this process, in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('/api/stats')
+@etag_from_runs
 def get_stats():
     """Get overall statistics"""
     try:
-        total_jobs = Job.query.count()
-        linkedin_jobs = Job.query.filter_by(source='linkedin').count()
-        stepstone_jobs = Job.query.filter_by(source='stepstone').count()
-        glassdoor_jobs = Job.query.filter_by(source='glassdoor').count()
-        
-        # Jobs in last hour
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        new_jobs_last_hour = Job.query.filter(Job.first_seen >= one_hour_ago).count()
-        
-        linkedin_last_hour = Job.query.filter(
-            Job.source == 'linkedin',
-            Job.is_new_in_last_hour == True
-        ).count()
-        
-        stepstone_last_hour = Job.query.filter(
-            Job.source == 'stepstone',
-            Job.is_new_in_last_hour == True
-        ).count()
-        
-        glassdoor_last_hour = Job.query.filter(
-            Job.source == 'glassdoor',
-            Job.is_new_in_last_hour == True
-        ).count()
-        
-        # Last scraper runs
-        last_runs = {}
-        for source in ['linkedin', 'stepstone', 'glassdoor']:
-            last_run = ScraperRun.query.filter_by(source=source).order_by(
-                ScraperRun.start_time.desc()
-            ).first()
-            if last_run:
-                last_runs[source] = last_run.to_dict()
-            else:
-                last_runs[source] = None
-        
-        return jsonify({
-            'total_jobs': total_jobs,
-            'linkedin_jobs': linkedin_jobs,
-            'stepstone_jobs': stepstone_jobs,
-            'glassdoor_jobs': glassdoor_jobs,
-            'new_jobs_last_hour': new_jobs_last_hour,
-            'linkedin_last_hour': linkedin_last_hour,
-            'stepstone_last_hour': stepstone_last_hour,
-            'glassdoor_last_hour': glassdoor_last_hour,
-            'last_runs': last_runs,
-            'last_updated': datetime.utcnow().isoformat()
-        })
+        return jsonify(stats.get_stats())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/jobs/<source>')
+def _collapse_param():
+    """Validate ?collapse=; only 'cluster' (one row per duplicate cluster) exists"""
+    collapse = request.args.get('collapse') or None
+    if collapse not in (None, 'cluster'):
+        raise ValueError(f"Invalid collapse mode '{collapse}'")
+    return collapse
+
+
+def _cluster_sizes(rows):
+    """Count the members of the clusters of `rows` (one indexed GROUP BY)"""
+    cluster_ids = {row.cluster_id for row in rows if row.cluster_id is not None}
+    if not cluster_ids:
+        return {}
+    return dict(db.session.query(Job.cluster_id, db.func.count()).filter(
+        Job.cluster_id.in_(cluster_ids)
+    ).group_by(Job.cluster_id).all())
+
+
+def _jobs_response(rows, latest_run_ids, collapse, fields=JOB_FIELDS, **extra):
+    """Serialize job_columns() rows, adding cluster sizes when collapsed"""
+    jobs = job_dicts(rows, latest_run_ids, fields)
+    if collapse:
+        sizes = _cluster_sizes(rows)
+        for job, row in zip(jobs, rows):
+            job['cluster_size'] = sizes.get(row.cluster_id, 1)
+    return json_response({**extra, 'count': len(jobs), 'jobs': jobs})
+
+
+@bp.route('/api/jobs/<source>')
+@etag_from_runs
 def get_jobs_by_source(source):
-    """Get jobs from specific source (only those posted in last hour)"""
+    """
+    Get jobs from specific source (only those posted in last hour)
+    
+    Query parameters:
+        collapse: 'cluster' returns one row per near-duplicate cluster
+    """
     try:
         if source not in ['linkedin', 'stepstone', 'glassdoor']:
             return jsonify({'error': 'Invalid source'}), 400
+        collapse = _collapse_param()
         
-        # Get jobs marked as new in last hour
-        jobs = Job.query.filter_by(
-            source=source,
-            is_new_in_last_hour=True
-        ).order_by(Job.first_seen.desc()).all()
+        # Get jobs first seen by the latest completed run of this source
+        latest_run_ids = ScraperRun.latest_completed_ids()
+        run_id = latest_run_ids.get(source)
+        if run_id:
+            in_run = Job.first_seen_run_id == run_id
+            query = db.select(*job_columns()).where(in_run)
+            if collapse:
+                # Keep the earliest job of every cluster within this run
+                representatives = db.select(db.func.min(Job.id)).where(in_run).group_by(
+                    db.func.coalesce(Job.cluster_id, Job.id)
+                )
+                query = query.where(Job.id.in_(representatives.scalar_subquery()))
+            rows = db.session.execute(query.order_by(Job.first_seen.desc())).all()
+        else:
+            rows = []
         
-        return jsonify({
-            'source': source,
-            'count': len(jobs),
-            'jobs': [job.to_dict() for job in jobs]
-        })
+        return _jobs_response(rows, latest_run_ids, collapse, source=source)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/jobs/all')
+# /api/jobs/all leaves out 'description' unless it is asked for
+DEFAULT_JOB_LIST_FIELDS = [field for field in JOB_FIELDS if field != 'description']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _fields_param():
+    """Validate ?fields= (comma separated); defaults to everything but the description"""
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    unknown = [field for field in fields if field not in JOB_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields or DEFAULT_JOB_LIST_FIELDS
+
+
+def encode_cursor(first_seen, job_id):
+    """Opaque cursor pointing just after the job (first_seen, id)"""
+    return base64.urlsafe_b64encode(f'{first_seen.isoformat()}|{job_id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(); raises ValueError for malformed cursors"""
+    try:
+        first_seen, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(first_seen), int(job_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
+
+def _job_page(query, fields, collapse, **extra):
+    """
+    Run a job_columns() query one keyset page at a time (?limit=, ?cursor=)
+    
+    Pages are keyed on (first_seen, id) rather than an offset, so a page
+    deep into the history costs no more than the first one.
+    """
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    if collapse:
+        # The cluster id is the smallest job id, so that job represents it
+        query = query.where(db.func.coalesce(Job.cluster_id, Job.id) == Job.id)
+    cursor = request.args.get('cursor')
+    if cursor:
+        query = query.where(db.tuple_(Job.first_seen, Job.id) < decode_cursor(cursor))
+    rows = db.session.execute(
+        query.order_by(Job.first_seen.desc(), Job.id.desc()).limit(limit + 1)
+    ).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].first_seen, rows[-1].id) if has_more else None
+    return _jobs_response(rows, ScraperRun.latest_completed_ids(), collapse, fields,
+                          next_cursor=next_cursor, **extra)
+
+
+def _page_columns(fields):
+    """Columns for `fields` plus the ones paging and collapsing need"""
+    return job_columns(fields, extra=('id', 'first_seen', 'cluster_id'))
+
+
+@bp.route('/api/jobs/all')
 def get_all_jobs():
-    """Get all jobs"""
+    """
+    Get all jobs, newest first, one page at a time
+    
+    Query parameters:
+        limit: Page size (default 100, at most 1000)
+        cursor: 'next_cursor' of the previous page
+        fields: Comma separated columns to return (default: all but description)
+        collapse: 'cluster' returns one row per near-duplicate cluster
+    
+    Every page is a range read of ix_jobs_first_seen (which ends in the
+    rowid) however deep the cursor is. Only the requested columns are
+    selected.
+    """
     try:
-        jobs = Job.query.order_by(Job.first_seen.desc()).limit(1000).all()
-        return jsonify({
-            'count': len(jobs),
-            'jobs': [job.to_dict() for job in jobs]
+        collapse = _collapse_param()
+        fields = _fields_param()
+        return _job_page(db.select(*_page_columns(fields)), fields, collapse)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/jobs')
+def get_filtered_jobs():
+    """
+    Filter jobs by facet values, newest first, with facet counts
+    
+    Query parameters:
+        source, location, company, job_type, remote_option: Accepted values;
+            repeat a parameter to accept several (?company=A&company=B)
+        limit, cursor, fields, collapse: As for /api/jobs/all
+    
+    The first page (no cursor) carries 'facets': for each dimension the
+    value counts under the filters on the other dimensions (see app/facets.py).
+    """
+    try:
+        sources = request.args.getlist('source')
+        if any(source not in ['linkedin', 'stepstone', 'glassdoor'] for source in sources):
+            return jsonify({'error': 'Invalid source'}), 400
+        filters = {dimension: request.args.getlist(dimension) for dimension in FACET_DIMENSIONS}
+        collapse = _collapse_param()
+        fields = _fields_param()
+        
+        query = db.select(*_page_columns(fields)).where(*filter_conditions(sources, filters))
+        extra = {'filters': {dimension: values for dimension, values in filters.items() if values}}
+        if not request.args.get('cursor'):
+            extra['facets'] = facet_counts(sources, filters)
+        return _job_page(query, fields, collapse, **extra)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/export')
+def export():
+    """
+    Stream the job history, oldest first
+    
+    Query parameters:
+        format: 'ndjson' (default) or 'csv'
+        source: Optional source filter; CSV then uses that scraper's columns
+        since: Optional ISO timestamp, only jobs first seen at or after it
+    """
+    export_format = request.args.get('format', 'ndjson')
+    source = request.args.get('source') or None
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format'}), 400
+    if source and source not in ['linkedin', 'stepstone', 'glassdoor']:
+        return jsonify({'error': 'Invalid source'}), 400
+    since = request.args.get('since')
+    try:
+        since = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        return jsonify({'error': 'Invalid since timestamp'}), 400
+    
+    filename = f"jobs_{source or 'all'}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(export_jobs(export_format, source, since)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@bp.route('/api/stream')
+def stream():
+    """
+    Server-Sent Events: 'jobs' when new jobs are committed, 'run' when a
+    scraper run finishes
+    
+    Query parameters:
+        source: Only send events of this source
+    """
+    source = request.args.get('source') or None
+    if source and source not in ['linkedin', 'stepstone', 'glassdoor']:
+        return jsonify({'error': 'Invalid source'}), 400
+    # Subscribe now, so nothing committed after this request is missed
+    subscriber = bus.subscribe()
+    return Response(
+        event_stream(subscriber, source),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/api/search')
+def search():
+    """
+    Full-text search over titles, companies and descriptions
+    
+    Query parameters:
+        q: Search terms (all must match; 'term*' for prefix search)
+        source: Optional source filter
+        page, per_page: 1-based pagination (per_page at most 100)
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        source = request.args.get('source') or None
+        if not query:
+            return jsonify({'error': 'Missing search query'}), 400
+        if source and source not in ['linkedin', 'stepstone', 'glassdoor']:
+            return jsonify({'error': 'Invalid source'}), 400
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+        
+        total, results = search_jobs(query, source, page, per_page)
+        return json_response({
+            'query': query,
+            'total': total,
+            'page': page,
+            'count': len(results),
+            'jobs': results
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/scraper/status')
+@bp.route('/api/trends')
+@etag_from_runs
+def trends():
+    """
+    New jobs per source over time, from the hourly rollups
+    
+    Query parameters:
+        days: Window length in days (default 30)
+        bucket: 'day' (default) or 'hour'
+        source: Sources to include (repeatable, default all)
+        company, location: Only count one company or one location
+    """
+    try:
+        sources = request.args.getlist('source')
+        if any(source not in ['linkedin', 'stepstone', 'glassdoor'] for source in sources):
+            return jsonify({'error': 'Invalid source'}), 400
+        return json_response(get_trends(
+            days=request.args.get('days', 30, type=int),
+            bucket=request.args.get('bucket', 'day'),
+            sources=sources,
+            company=request.args.get('company') or None,
+            location=request.args.get('location') or None
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/scraper/status')
+@etag_from_runs
 def get_scraper_status():
     """Get status of all scrapers"""
     try:
         status = {}
-        for source in ['linkedin', 'stepstone', 'glassdoor']:
+        for source, eligibility in check_all().items():
             # Get last 5 runs
-            runs = ScraperRun.query.filter_by(source=source).order_by(
-                ScraperRun.start_time.desc()
-            ).limit(5).all()
-            
-            # Get last completed run
-            last_completed = ScraperRun.query.filter_by(
-                source=source,
-                status='completed'
-            ).order_by(ScraperRun.end_time.desc()).first()
-            
-            can_run = True
-            time_until_next_run = None
-            time_since_last_run = None
-            
-            if last_completed and last_completed.end_time:
-                time_diff = datetime.utcnow() - last_completed.end_time
-                time_since_last_run = time_diff.total_seconds() / 60  # in minutes
-                
-                if time_diff.total_seconds() < 3600:
-                    can_run = False
-                    time_until_next_run = (3600 - time_diff.total_seconds()) / 60  # in minutes
+            runs = db.session.execute(
+                db.select(*run_columns()).where(ScraperRun.source == source)
+                .order_by(ScraperRun.start_time.desc()).limit(5)
+            ).all()
             
+            seconds_since = eligibility.seconds_since_last
             status[source] = {
-                'recent_runs': [run.to_dict() for run in runs],
-                'can_run': can_run,
-                'time_since_last_run_minutes': round(time_since_last_run, 1) if time_since_last_run else None,
-                'time_until_next_run_minutes': round(time_until_next_run, 1) if time_until_next_run else 0
+                'recent_runs': run_dicts(runs),
+                'can_run': eligibility.can_run,
+                'time_since_last_run_minutes': round(seconds_since / 60, 1) if seconds_since else None,
+                'time_until_next_run_minutes': round(eligibility.seconds_remaining / 60, 1)
             }
         
-        return jsonify(status)
+        return json_response(status)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/scraper/can-run')
+@bp.route('/api/scraper/can-run')
 def can_run_scrapers():
-    """Check if scrapers can be run (1 hour has passed)"""
+    """Check if scrapers can be run (their cooldown has passed)"""
     try:
         result = {}
         
         # Check each individual scraper
-        for source in ['linkedin', 'stepstone', 'glassdoor']:
-            last_run = ScraperRun.query.filter_by(
-                source=source,
-                status='completed'
-            ).order_by(ScraperRun.end_time.desc()).first()
-            
-            can_run = True
-            time_until_next = 0
-            
-            if last_run and last_run.end_time:
-                time_diff = datetime.utcnow() - last_run.end_time
-                if time_diff.total_seconds() < 3600:
-                    can_run = False
-                    time_until_next = (3600 - time_diff.total_seconds()) / 60
-            
+        for source, eligibility in check_all().items():
             result[source] = {
-                'can_run': can_run,
-                'time_until_next_run_minutes': round(time_until_next, 1)
+                'can_run': eligibility.can_run,
+                'time_until_next_run_minutes': round(eligibility.seconds_remaining / 60, 1)
             }
         
         # Check if batch can run
-        sources = ['linkedin', 'stepstone', 'glassdoor']
-        latest_completion = None
-        
-        for src in sources:
-            last_run = ScraperRun.query.filter_by(
-                source=src,
-                status='completed'
-            ).order_by(ScraperRun.end_time.desc()).first()
-            
-            if last_run and last_run.end_time:
-                if latest_completion is None or last_run.end_time > latest_completion:
-                    latest_completion = last_run.end_time
-        
-        batch_can_run = True
-        batch_time_until_next = 0
-        
-        if latest_completion:
-            time_diff = datetime.utcnow() - latest_completion
-            if time_diff.total_seconds() < 3600:
-                batch_can_run = False
-                batch_time_until_next = (3600 - time_diff.total_seconds()) / 60
-        
+        batch = check_batch()
         result['all'] = {
-            'can_run': batch_can_run,
-            'time_until_next_run_minutes': round(batch_time_until_next, 1)
+            'can_run': batch.can_run,
+            'time_until_next_run_minutes': round(batch.seconds_remaining / 60, 1)
         }
         
         return jsonify(result)
@@ -255,71 +543,50 @@ def can_run_scrapers():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/scraper/trigger/<source>')
+@bp.route('/api/scraper/trigger/<source>')
 def trigger_scraper(source):
-    """Manually trigger a scraper (will check if 1 hour has passed)"""
+    """Manually trigger a scraper (will check if its cooldown has passed)"""
     try:
         if source not in ['linkedin', 'stepstone', 'glassdoor', 'all']:
             return jsonify({'error': 'Invalid source'}), 400
         
-        from app.scheduler import run_scraper_task, run_all_scrapers, check_last_run_time
+        from app.scheduler import request_scrape, start_scrape
         
         # Check timing before running
         if source == 'all':
             # Check if enough time has passed for batch run
-            with app.app_context():
-                sources = ['linkedin', 'stepstone', 'glassdoor']
-                latest_completion = None
-                
-                for src in sources:
-                    last_run = ScraperRun.query.filter_by(
-                        source=src,
-                        status='completed'
-                    ).order_by(ScraperRun.end_time.desc()).first()
-                    
-                    if last_run and last_run.end_time:
-                        if latest_completion is None or last_run.end_time > latest_completion:
-                            latest_completion = last_run.end_time
-                
-                if latest_completion:
-                    time_since_last = datetime.utcnow() - latest_completion
-                    if time_since_last.total_seconds() < 3600:
-                        remaining_minutes = (3600 - time_since_last.total_seconds()) / 60
-                        return jsonify({
-                            'message': 'Cannot run scrapers yet',
-                            'status': 'skipped',
-                            'reason': f'Less than 1 hour since last batch completion. Wait {remaining_minutes:.1f} more minutes.',
-                            'time_since_last_minutes': time_since_last.total_seconds() / 60
-                        }), 429
-            
-            # Run all scrapers
-            import threading
-            thread = threading.Thread(target=run_all_scrapers, daemon=True)
-            thread.start()
+            batch = check_batch()
+            if not batch.can_run:
+                remaining_minutes = batch.seconds_remaining / 60
+                return jsonify({
+                    'message': 'Cannot run scrapers yet',
+                    'status': 'skipped',
+                    'reason': f'Cooldown not over since last batch completion. Wait {remaining_minutes:.1f} more minutes.',
+                    'time_since_last_minutes': batch.seconds_since_last / 60,
+                    'time_until_next_run_minutes': round(remaining_minutes, 1)
+                }), 429
         else:
             # Check timing for individual scraper
-            if not check_last_run_time(source):
-                with app.app_context():
-                    last_run = ScraperRun.query.filter_by(
-                        source=source,
-                        status='completed'
-                    ).order_by(ScraperRun.end_time.desc()).first()
-                    
-                    if last_run and last_run.end_time:
-                        time_since_last = datetime.utcnow() - last_run.end_time
-                        remaining_minutes = (3600 - time_since_last.total_seconds()) / 60
-                        return jsonify({
-                            'message': f'Cannot run {source} scraper yet',
-                            'status': 'skipped',
-                            'reason': f'Less than 1 hour since last run. Wait {remaining_minutes:.1f} more minutes.',
-                            'time_since_last_minutes': time_since_last.total_seconds() / 60
-                        }), 429
-            
-            # Run individual scraper
-            import threading
-            thread = threading.Thread(target=lambda: run_scraper_task(source), daemon=True)
-            thread.start()
+            eligibility = check_source(source)
+            if not eligibility.can_run:
+                remaining_minutes = eligibility.seconds_remaining / 60
+                return jsonify({
+                    'message': f'Cannot run {source} scraper yet',
+                    'status': 'skipped',
+                    'reason': f'Cooldown not over since last run. Wait {remaining_minutes:.1f} more minutes.',
+                    'time_since_last_minutes': eligibility.seconds_since_last / 60,
+                    'time_until_next_run_minutes': round(remaining_minutes, 1)
+                }), 429
+        
+        if not owns_scrapers():
+            # Another worker runs the scheduler; it picks the request up
+            request_scrape(source)
+            return jsonify({
+                'message': f'Scraper queued for {source}',
+                'status': 'queued'
+            })
         
+        start_scrape(source)
         return jsonify({
             'message': f'Scraper triggered for {source}',
             'status': 'running'
@@ -329,4 +596,4 @@ def trigger_scraper(source):
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    get_app().run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,105 @@
+"""
+Job compaction
+Recomputes the canonical key of every stored job and merges rows that turn
+out to be the same posting (e.g. LinkedIn URLs that only differ in their
+tracking parameters).
+
+Usage:
+    python -m app.compact_jobs
+"""
+from app.job_keys import canonical_job_key
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')}
+
+
+def _forget_deleted_jobs(conn, job_ids):
+    """Drop dedup data of deleted jobs and re-point clusters they anchored"""
+    placeholders = ', '.join('?' * len(job_ids))
+    for table in ('job_signatures', 'job_lsh_buckets'):
+        if _table_columns(conn, table):
+            conn.exec_driver_sql(
+                f'DELETE FROM {table} WHERE job_id IN ({placeholders})', tuple(job_ids)
+            )
+    if 'cluster_id' in _table_columns(conn, 'jobs'):
+        new_anchors = conn.exec_driver_sql(
+            f'SELECT cluster_id, min(id) FROM jobs '
+            f'WHERE cluster_id IN ({placeholders}) GROUP BY cluster_id',
+            tuple(job_ids)
+        ).all()
+        if new_anchors:
+            conn.exec_driver_sql(
+                'UPDATE jobs SET cluster_id = ? WHERE cluster_id = ?',
+                [(anchor, old) for old, anchor in new_anchors]
+            )
+
+
+def compact_jobs(conn):
+    """
+    Backfill job_key for all jobs and merge duplicates
+
+    For every group of rows sharing a canonical key, the row seen first is
+    kept (with the latest last_seen of the group) and the others are deleted.
+
+    Args:
+        conn: SQLAlchemy connection inside a transaction
+
+    Returns:
+        Tuple of (jobs_scanned, duplicates_removed)
+    """
+    groups = {}
+    rows = conn.exec_driver_sql(
+        'SELECT id, source, job_url, first_seen, last_seen FROM jobs ORDER BY first_seen, id'
+    )
+    scanned = 0
+    for job_id, source, job_url, first_seen, last_seen in rows:
+        scanned += 1
+        key = canonical_job_key(source, job_url)
+        if key is None:
+            continue
+        groups.setdefault(key, []).append((job_id, last_seen))
+
+    survivors = []
+    duplicate_ids = []
+    for key, members in groups.items():
+        keep_id = members[0][0]
+        last_seen = max(seen for _, seen in members)
+        survivors.append({'id': keep_id, 'job_key': key, 'last_seen': last_seen})
+        duplicate_ids.extend(job_id for job_id, _ in members[1:])
+
+    for start in range(0, len(duplicate_ids), 500):
+        chunk = duplicate_ids[start:start + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        conn.exec_driver_sql(f'DELETE FROM jobs WHERE id IN ({placeholders})', tuple(chunk))
+        _forget_deleted_jobs(conn, chunk)
+
+    # Clear first so reassigning keys can never collide with a stale value
+    conn.exec_driver_sql('UPDATE jobs SET job_key = NULL')
+    if survivors:
+        conn.exec_driver_sql(
+            'UPDATE jobs SET job_key = ?, last_seen = ? WHERE id = ?',
+            [(row['job_key'], row['last_seen'], row['id']) for row in survivors]
+        )
+
+    return scanned, len(duplicate_ids)
+
+
+def main():
+    from app.app import app
+    from app.models import db
+
+    print("=" * 60)
+    print("Compacting duplicate jobs")
+    print("=" * 60)
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            scanned, removed = compact_jobs(conn)
+
+    print(f"✓ Scanned {scanned} jobs, merged {removed} duplicates")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Response compression for the JSON API
+Negotiates brotli (when the brotli package is installed) or gzip from the
+request's Accept-Encoding and compresses JSON responses of at least
+COMPRESS_MIN_SIZE bytes. Streamed responses (/api/export, /api/stream) are
+left alone.
+
+Responses with an ETag (see etag_from_runs in app/app.py) have their
+compressed bytes cached per (ETag, encoding), so an unchanged payload is
+compressed once rather than on every poll. Compressed responses carry the
+weak form of the ETag, as the bytes on the wire differ per encoding.
+
+Settings:
+    COMPRESS_MIN_SIZE       (default 1024 bytes)
+    COMPRESS_CACHE_ENTRIES  (default 64)
+"""
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_CACHE_ENTRIES = int(os.environ.get('COMPRESS_CACHE_ENTRIES', 64))
+
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_cache = OrderedDict()  # (etag, encoding) -> compressed bytes
+_cache_lock = threading.Lock()
+
+
+def available_encodings():
+    """Supported content codings, preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding(accept_encodings):
+    """Best supported coding the client accepts, or None for identity"""
+    encoding = accept_encodings.best_match(available_encodings())
+    if encoding and accept_encodings.quality(encoding) > 0:
+        return encoding
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _cached_compress(etag, data, encoding):
+    if etag is None:
+        return compress(data, encoding)
+    key = (etag, encoding)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    compressed = compress(data, encoding)
+    with _cache_lock:
+        _cache[key] = compressed
+        while len(_cache) > COMPRESS_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return compressed
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def compress_response(response):
+    """after_request hook: compress eligible responses in place"""
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None or (response.calculate_content_length() or 0) < COMPRESS_MIN_SIZE:
+        return response
+
+    etag, weak = response.get_etag()
+    response.set_data(_cached_compress(etag, response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Register response compression on a Flask app"""
+    app.after_request(compress_response)
@@ -0,0 +1,326 @@
+"""
+Cross-source near-duplicate detection
+The same role is often posted on LinkedIn, Stepstone and Glassdoor. Each new
+job gets a MinHash signature over its normalized title, company and
+location. Candidate matches are found through banded LSH buckets stored in
+the database, restricted to other sources, so a run only does work
+proportional to its own new jobs. Matching jobs share a cluster_id (the
+smallest job id in the cluster).
+
+Usage:
+    python -m app.dedup      # cluster all jobs that have no signature yet
+"""
+import hashlib
+import operator
+import re
+import unicodedata
+from array import array
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from app.models import db, Job, JobSignature, JobLshBucket
+
+# 64 x 32-bit hash values per shingle, taken from one SHAKE-128 digest
+NUM_PERMUTATIONS = 64
+BANDS = 12
+ROWS_PER_BAND = 5
+
+# Minimum estimated Jaccard similarity for two jobs to be the same posting
+SIMILARITY_THRESHOLD = 0.7
+
+# Buckets holding more jobs of other sources than this are too generic to
+# tell postings apart (e.g. "Embedded Software Engineer" in one city) and are
+# skipped, which keeps the candidate set of a job bounded.
+MAX_BUCKET_MEMBERS = 50
+
+# Company tokens are repeated so that the same title at a different employer
+# stays below the similarity threshold
+COMPANY_WEIGHT = 3
+
+# Jobs per clustering transaction / rows per IN query
+CHUNK_SIZE = 500
+
+# "(m/w/d)", "(all genders)", "(w/m/d)" ...
+_GENDER_TAG = re.compile(r'\((?:[mwdfx]\s*/\s*)+[mwdfx]\)|\(all genders?\)|\(gn\)', re.I)
+_NON_WORD = re.compile(r'[^a-z0-9+#]+')
+_COMPANY_SUFFIXES = {
+    'gmbh', 'ag', 'se', 'kg', 'co', 'mbh', 'ug', 'inc', 'ltd', 'llc', 'corp',
+    'corporation', 'limited', 'group', 'holding', 'gruppe',
+}
+
+
+def normalize_text(text):
+    """Lowercase, fold umlauts/accents and drop punctuation and gender tags"""
+    text = _GENDER_TAG.sub(' ', text or '').lower()
+    text = text.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss')
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _NON_WORD.sub(' ', text).split()
+
+
+def job_shingles(title, company, location):
+    """
+    Build the feature set compared between jobs
+
+    Title words, word pairs and the whole title carry most of the signal;
+    company tokens (without legal suffixes) and the first location token
+    keep different employers and cities apart.
+    """
+    title_tokens = normalize_text(title)
+    shingles = set(title_tokens)
+    if title_tokens:
+        shingles.add('t:' + ' '.join(title_tokens))
+    shingles.update(f'{a} {b}' for a, b in zip(title_tokens, title_tokens[1:]))
+    shingles.update(
+        f'c{copy}:{token}'
+        for token in normalize_text(company) if token not in _COMPANY_SUFFIXES
+        for copy in range(COMPANY_WEIGHT)
+    )
+    location_tokens = normalize_text(location)
+    if location_tokens:
+        shingles.add(f'l:{location_tokens[0]}')
+    return shingles
+
+
+def minhash_signature(shingles):
+    """Return the MinHash signature of a shingle set as a list of ints"""
+    if not shingles:
+        return None
+    hashes = [
+        array('I', hashlib.shake_128(shingle.encode('utf-8')).digest(4 * NUM_PERMUTATIONS))
+        for shingle in shingles
+    ]
+    return list(map(min, *hashes)) if len(hashes) > 1 else hashes[0].tolist()
+
+
+def lsh_buckets(signature):
+    """Return one band-qualified bucket id (signed 64-bit) per LSH band"""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            array('I', [band] + rows).tobytes(), digest_size=8
+        ).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return sum(map(operator.eq, signature_a, signature_b)) / NUM_PERMUTATIONS
+
+
+def _pack(signature):
+    return array('I', signature).tobytes()
+
+
+def _unpack(blob):
+    return array('I', blob).tolist()
+
+
+def _chunks(items):
+    items = list(items)
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+
+class _ClusterForest:
+    """Union-find over cluster ids; the root is always the smallest id"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, cluster_id):
+        root = cluster_id
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while cluster_id != root:
+            self.parent[cluster_id], cluster_id = root, self.parent[cluster_id]
+        return root
+
+    def union(self, cluster_ids):
+        roots = {self.find(cluster_id) for cluster_id in cluster_ids}
+        root = min(roots)
+        for other in roots:
+            self.parent[other] = root
+        return root
+
+
+def _candidate_buckets(session, source, buckets):
+    """
+    Map each shared bucket to its members from other sources, skipping
+    buckets with more than MAX_BUCKET_MEMBERS of them
+    """
+    members = {}
+    for chunk in _chunks(buckets):
+        oversized = set(session.scalars(
+            select(JobLshBucket.bucket)
+            .where(JobLshBucket.bucket.in_(chunk), JobLshBucket.source != source)
+            .group_by(JobLshBucket.bucket)
+            .having(func.count() > MAX_BUCKET_MEMBERS)
+        ))
+        usable = [bucket for bucket in chunk if bucket not in oversized]
+        if not usable:
+            continue
+        for bucket, job_id in session.execute(
+            select(JobLshBucket.bucket, JobLshBucket.job_id)
+            .where(JobLshBucket.bucket.in_(usable), JobLshBucket.source != source)
+        ):
+            members.setdefault(bucket, []).append(job_id)
+    return members
+
+
+def _cluster_source_jobs(session, source, jobs):
+    """Cluster new jobs of one source against stored jobs of the others"""
+    prepared = []
+    for job in jobs:
+        signature = minhash_signature(job_shingles(job.job_title, job.company, job.location))
+        if signature is not None:
+            prepared.append((job.id, signature, lsh_buckets(signature)))
+    if not prepared:
+        return 0
+
+    bucket_members = _candidate_buckets(
+        session, source, {bucket for _, _, buckets in prepared for bucket in buckets}
+    )
+
+    candidate_ids = {job_id for members in bucket_members.values() for job_id in members}
+    known = {}  # job id -> (signature, cluster id)
+    for chunk in _chunks(candidate_ids):
+        for job_id, blob, cluster_id in session.execute(
+            select(Job.id, JobSignature.signature, Job.cluster_id)
+            .join(JobSignature, JobSignature.job_id == Job.id)
+            .where(Job.id.in_(chunk))
+        ):
+            known[job_id] = (_unpack(blob), cluster_id or job_id)
+
+    forest = _ClusterForest()
+    joined = 0
+    for job_id, signature, buckets in prepared:
+        candidates = {
+            other for bucket in buckets for other in bucket_members.get(bucket, ())
+        }
+        clusters = {
+            known[other][1]
+            for other in candidates
+            if other in known and similarity(signature, known[other][0]) >= SIMILARITY_THRESHOLD
+        }
+        if clusters:
+            joined += 1
+            forest.union(clusters | {job_id})
+
+    # Existing clusters that were bridged by a new job fold into the smallest
+    new_ids = {job_id for job_id, _, _ in prepared}
+    merged = [
+        {'old_cluster': cluster_id, 'new_cluster': forest.find(cluster_id)}
+        for cluster_id in list(forest.parent)
+        if cluster_id not in new_ids and forest.find(cluster_id) != cluster_id
+    ]
+    if merged:
+        session.execute(
+            update(Job.__table__)
+            .where(Job.__table__.c.cluster_id == bindparam('old_cluster'))
+            .values(cluster_id=bindparam('new_cluster')),
+            merged
+        )
+
+    jobs = Job.__table__
+    session.execute(
+        update(jobs).where(jobs.c.id == bindparam('job_id'))
+        .values(cluster_id=bindparam('new_cluster')),
+        [{'job_id': job_id, 'new_cluster': forest.find(job_id)} for job_id in new_ids]
+    )
+    # Core inserts: these are plain rows, no ORM bookkeeping needed
+    session.execute(insert(JobSignature.__table__), [
+        {'job_id': job_id, 'signature': _pack(signature)}
+        for job_id, signature, _ in prepared
+    ])
+    session.execute(insert(JobLshBucket.__table__), [
+        {'bucket': bucket, 'source': source, 'job_id': job_id}
+        for job_id, _, buckets in prepared
+        for bucket in buckets
+    ])
+    return joined
+
+
+def cluster_new_jobs(job_ids):
+    """
+    Assign cluster ids to newly inserted jobs
+
+    Must run inside an application context; the caller commits. All writes
+    happen after the signatures are computed, so the write lock is only held
+    for the final statements.
+
+    Args:
+        job_ids: Ids of jobs that have no signature yet
+
+    Returns:
+        Number of jobs that joined an existing cluster
+    """
+    session = db.session
+    by_source = {}
+    for chunk in _chunks(job_ids):
+        for job in session.execute(
+            select(Job.id, Job.source, Job.job_title, Job.company, Job.location)
+            .where(Job.id.in_(chunk))
+        ):
+            by_source.setdefault(job.source, []).append(job)
+
+    # Sources are clustered one after the other, so later ones see the
+    # signatures stored for earlier ones
+    return sum(
+        _cluster_source_jobs(session, source, sorted(jobs, key=lambda job: job.id))
+        for source, jobs in sorted(by_source.items())
+    )
+
+
+def cluster_jobs(job_ids):
+    """
+    Cluster jobs in short transactions of CHUNK_SIZE jobs each.
+    Must run inside an application context.
+
+    Returns:
+        Number of jobs that joined an existing cluster
+    """
+    joined = 0
+    for chunk in _chunks(job_ids):
+        try:
+            joined += cluster_new_jobs(chunk)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return joined
+
+
+def cluster_unsigned_jobs():
+    """
+    Cluster every job that has no signature yet (e.g. jobs stored before
+    deduplication existed). Must run inside an application context.
+
+    Returns:
+        Tuple of (jobs_processed, jobs_joined)
+    """
+    job_ids = db.session.scalars(
+        select(Job.id).outerjoin(JobSignature, JobSignature.job_id == Job.id)
+        .where(JobSignature.job_id.is_(None))
+        .order_by(Job.id)
+    ).all()
+    return len(job_ids), cluster_jobs(job_ids)
+
+
+def main():
+    from app.app import app
+
+    print("=" * 60)
+    print("Clustering near-duplicate jobs")
+    print("=" * 60)
+
+    with app.app_context():
+        processed, joined = cluster_unsigned_jobs()
+
+    print(f"✓ Processed {processed} jobs, {joined} joined an existing cluster")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
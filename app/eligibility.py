@@ -0,0 +1,113 @@
+"""
+Scraper eligibility
+Decides whether a source (or the whole batch) may be scraped again: a source
+is eligible once its cooldown has passed since its last completed run.
+
+The last completion of every source comes from one grouped query over the
+(source, status, end_time) index and is kept in memory. _finish_run records
+new completions directly, and the cached values are re-read after
+ELIGIBILITY_CACHE_SECONDS so runs finished by another process show up too.
+/api/scraper/status, /api/scraper/can-run, /api/scraper/trigger and the
+scheduler all go through this module.
+
+Settings:
+    SCRAPER_COOLDOWN_SECONDS            (default 3600, also the batch cooldown)
+    SCRAPER_COOLDOWN_<SOURCE>_SECONDS   (per source, e.g. SCRAPER_COOLDOWN_LINKEDIN_SECONDS)
+    ELIGIBILITY_CACHE_SECONDS           (default 30)
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from app.models import db, ScraperRun
+
+SOURCES = ['linkedin', 'stepstone', 'glassdoor']
+
+DEFAULT_COOLDOWN_SECONDS = float(os.environ.get('SCRAPER_COOLDOWN_SECONDS', 3600))
+
+COOLDOWN_SECONDS = {
+    source: float(os.environ.get(f'SCRAPER_COOLDOWN_{source.upper()}_SECONDS',
+                                 DEFAULT_COOLDOWN_SECONDS))
+    for source in SOURCES
+}
+
+ELIGIBILITY_CACHE_SECONDS = float(os.environ.get('ELIGIBILITY_CACHE_SECONDS', 30))
+
+# seconds_since_last is None when there is no completed run yet
+Eligibility = namedtuple('Eligibility', 'can_run last_completed seconds_since_last seconds_remaining')
+
+_cache = {'completions': None, 'expires': 0.0}
+_cache_lock = threading.Lock()
+
+
+def _load_completions():
+    """End time of the last completed run of every source, in one query"""
+    rows = db.session.query(ScraperRun.source, db.func.max(ScraperRun.end_time)).filter(
+        ScraperRun.status == 'completed'
+    ).group_by(ScraperRun.source).all()
+    return dict(rows)
+
+
+def last_completions():
+    """
+    Return source -> end time of its last completed run (cached).
+    Must run inside an application context when the cache is cold.
+    """
+    with _cache_lock:
+        if _cache['completions'] is None or time.monotonic() >= _cache['expires']:
+            _cache['completions'] = _load_completions()
+            _cache['expires'] = time.monotonic() + ELIGIBILITY_CACHE_SECONDS
+        return dict(_cache['completions'])
+
+
+def record_completion(source, end_time):
+    """Note a run that just completed, without waiting for the next reload"""
+    with _cache_lock:
+        if _cache['completions'] is not None:
+            previous = _cache['completions'].get(source)
+            if previous is None or end_time > previous:
+                _cache['completions'][source] = end_time
+
+
+def invalidate_eligibility():
+    """Drop the cached completion times, e.g. after runs were deleted"""
+    with _cache_lock:
+        _cache['completions'] = None
+
+
+def _eligibility(last_completed, cooldown, now):
+    if last_completed is None:
+        return Eligibility(True, None, None, 0.0)
+    seconds_since = (now - last_completed).total_seconds()
+    remaining = max(cooldown - seconds_since, 0.0)
+    return Eligibility(remaining == 0, last_completed, seconds_since, remaining)
+
+
+def check_source(source, now=None, cooldown=None):
+    """Eligibility of one source against `cooldown` (default: its own cooldown)"""
+    now = now or datetime.utcnow()
+    if cooldown is None:
+        cooldown = COOLDOWN_SECONDS[source]
+    return _eligibility(last_completions().get(source), cooldown, now)
+
+
+def check_all(now=None):
+    """Eligibility of every source, keyed by source"""
+    now = now or datetime.utcnow()
+    completions = last_completions()
+    return {
+        source: _eligibility(completions.get(source), COOLDOWN_SECONDS[source], now)
+        for source in SOURCES
+    }
+
+
+def check_batch(now=None):
+    """
+    Eligibility of a run of all scrapers: the default cooldown must have
+    passed since the most recent completion of any source
+    """
+    now = now or datetime.utcnow()
+    completions = [end_time for end_time in last_completions().values() if end_time]
+    return _eligibility(max(completions, default=None), DEFAULT_COOLDOWN_SECONDS, now)
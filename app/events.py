@@ -0,0 +1,172 @@
+"""
+In-process event bus for the /api/stream Server-Sent Events channel
+save_jobs_to_db publishes the ids of newly inserted jobs and every finished
+scraper run is announced, so open dashboards refresh right after a commit
+instead of polling. Subscribers are per-connection queues; a subscriber
+that stops reading loses events rather than blocking the publisher.
+
+Under a multi-worker server only the scheduler leader (app/leader.py)
+publishes; the other workers run relay_committed_events(), which reads what
+the leader committed and publishes it to their own subscribers.
+
+Settings:
+    STREAM_KEEPALIVE_SECONDS    (default 25)
+    STREAM_RELAY_SECONDS        (default 1)
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import func, or_, select
+
+from app.models import db, Job, ScraperRun
+
+STREAM_KEEPALIVE_SECONDS = float(os.environ.get('STREAM_KEEPALIVE_SECONDS', 25))
+STREAM_RELAY_SECONDS = float(os.environ.get('STREAM_RELAY_SECONDS', 1))
+
+# Pending events per subscriber before new ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Reconnect delay sent to EventSource clients (milliseconds)
+RETRY_MILLISECONDS = 5000
+
+
+class EventBus:
+    """Fan-out of (event, data) pairs to subscriber queues"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        """Queue an event for every subscriber; never blocks"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                pass
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+bus = EventBus()
+
+
+def format_event(event, data):
+    """Encode one Server-Sent Events message"""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def event_stream(subscriber, source=None):
+    """
+    Yield SSE messages for a subscriber until the client disconnects
+
+    An idle connection only wakes up every STREAM_KEEPALIVE_SECONDS to send
+    a comment line, which also lets the server notice closed connections.
+
+    Args:
+        subscriber: Queue returned by bus.subscribe()
+        source: Only forward events of this source
+    """
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        while True:
+            try:
+                event, data = subscriber.get(timeout=STREAM_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if source is None or data.get('source') == source:
+                yield format_event(event, data)
+    finally:
+        bus.unsubscribe(subscriber)
+
+
+class CommittedEventReader:
+    """
+    Turns rows committed by another process into bus events
+
+    Follows the jobs table by id and the scraper runs that were still
+    running at the last poll, so every poll is a primary key range read.
+    """
+
+    def __init__(self):
+        self.last_job_id = None
+
+    def reset(self):
+        """Skip everything committed so far"""
+        self.last_job_id = db.session.scalar(select(func.coalesce(func.max(Job.id), 0)))
+        self.last_run_id = db.session.scalar(select(func.coalesce(func.max(ScraperRun.id), 0)))
+        self.running = set(db.session.scalars(
+            select(ScraperRun.id).where(ScraperRun.status == 'running')
+        ))
+
+    def poll(self):
+        """Publish the jobs and finished runs committed since the last poll"""
+        if self.last_job_id is None:
+            self.reset()
+            return
+
+        new_jobs = {}
+        for job_id, source, run_id in db.session.execute(
+            select(Job.id, Job.source, Job.first_seen_run_id)
+            .where(Job.id > self.last_job_id).order_by(Job.id)
+        ):
+            new_jobs.setdefault((source, run_id), []).append(job_id)
+            self.last_job_id = job_id
+        for (source, run_id), job_ids in new_jobs.items():
+            bus.publish('jobs', {'source': source, 'run_id': run_id, 'job_ids': job_ids})
+
+        for run in db.session.execute(
+            select(ScraperRun.id, ScraperRun.source, ScraperRun.status, ScraperRun.new_jobs)
+            .where(or_(ScraperRun.id > self.last_run_id, ScraperRun.id.in_(self.running)))
+            .order_by(ScraperRun.id)
+        ):
+            self.last_run_id = max(self.last_run_id, run.id)
+            if run.status == 'running':
+                self.running.add(run.id)
+                continue
+            self.running.discard(run.id)
+            bus.publish('run', {'source': run.source, 'run_id': run.id,
+                                'status': run.status, 'new_jobs': run.new_jobs})
+
+
+def relay_committed_events(app, should_relay):
+    """
+    Start a daemon thread publishing events committed by other processes
+
+    Polls every STREAM_RELAY_SECONDS, but only while this process has
+    stream subscribers and should_relay() is true (it is not the leader).
+    """
+    def relay():
+        reader = CommittedEventReader()
+        while True:
+            time.sleep(STREAM_RELAY_SECONDS)
+            try:
+                with app.app_context():
+                    if bus.subscriber_count and should_relay():
+                        reader.poll()
+                    else:
+                        # Nobody listening: start from scratch next time
+                        reader.last_job_id = None
+            except Exception as e:
+                print(f"Error relaying job events: {str(e)}")
+
+    threading.Thread(target=relay, name='event-relay', daemon=True).start()
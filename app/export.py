@@ -0,0 +1,122 @@
+"""
+Job history export
+Streams jobs as NDJSON or CSV for /api/export. Rows are read through a
+server-side cursor in batches of EXPORT_BATCH_SIZE and written one line at
+a time, so memory stays flat however many jobs are exported.
+
+CSV exports of a single source use the column layout of that scraper's
+save_to_csv(); columns the database does not store are left empty.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from app.models import db, Job
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ['id', 'source', 'job_title', 'company', 'location', 'job_url',
+                  'description', 'salary', 'job_type', 'remote_option', 'posted_date',
+                  'first_seen', 'last_seen', 'cluster_id']
+
+# Header of save_to_csv() of the scraper app/scraper_integration.py runs
+CSV_LAYOUTS = {
+    'linkedin': ['job_id', 'title', 'company', 'location', 'posted_date',
+                 'job_url', 'description', 'seniority_level', 'employment_type',
+                 'job_function', 'industries'],
+    'stepstone': ['title', 'company', 'location', 'posted_date', 'job_type',
+                  'remote_option', 'job_url', 'scraped_date'],
+    # Glassdoor writes the sorted keys of its job dictionaries
+    'glassdoor': ['company', 'job_title', 'job_url', 'location', 'rating',
+                  'salary', 'scraped_date'],
+}
+
+# Scraper field name -> value taken from a job row
+_SCRAPER_FIELDS = {
+    'title': lambda row: row.job_title,
+    'job_title': lambda row: row.job_title,
+    'company': lambda row: row.company,
+    'location': lambda row: row.location,
+    'posted_date': lambda row: row.posted_date,
+    'job_url': lambda row: row.job_url,
+    'description': lambda row: row.description,
+    'salary': lambda row: row.salary,
+    'job_type': lambda row: row.job_type,
+    'employment_type': lambda row: row.job_type,
+    'remote_option': lambda row: row.remote_option,
+    'scraped_date': lambda row: row.first_seen.strftime('%Y-%m-%d %H:%M:%S'),
+    # Listing id from the canonical key 'linkedin:<id>' (see app/job_keys.py)
+    'job_id': lambda row: row.job_key.split(':', 1)[1]
+    if row.job_key and row.job_key.count(':') == 1 else '',
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _export_rows(source=None, since=None):
+    """Yield job rows oldest first through a server-side cursor"""
+    query = select(*(Job.__table__.c[name] for name in EXPORT_COLUMNS + ['job_key']))
+    if source:
+        query = query.where(Job.source == source)
+    if since:
+        query = query.where(Job.first_seen >= since)
+    query = query.order_by(Job.first_seen, Job.id).execution_options(
+        stream_results=True, yield_per=EXPORT_BATCH_SIZE
+    )
+    yield from db.session.execute(query)
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        record = {name: getattr(row, name) for name in EXPORT_COLUMNS}
+        for name in ('first_seen', 'last_seen'):
+            record[name] = record[name].isoformat() if record[name] else None
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _csv_lines(rows, source):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    if source:
+        header = CSV_LAYOUTS[source]
+        values = [_SCRAPER_FIELDS.get(name, lambda row: '') for name in header]
+        yield line(header)
+        for row in rows:
+            yield line([value(row) for value in values])
+    else:
+        yield line(EXPORT_COLUMNS)
+        for row in rows:
+            yield line([getattr(row, name) for name in EXPORT_COLUMNS])
+
+
+def export_jobs(export_format, source=None, since=None):
+    """
+    Generate the lines of a job export
+
+    Must be consumed inside an application context (stream_with_context).
+
+    Args:
+        export_format: 'ndjson' or 'csv'
+        source: Optional source filter; selects the scraper CSV layout
+        since: Optional datetime, only jobs first seen at or after it
+
+    Yields:
+        One text line per job (plus the header line for CSV)
+    """
+    rows = _export_rows(source, since)
+    if export_format == 'csv':
+        return _csv_lines(rows, source)
+    return _ndjson_lines(rows)
@@ -0,0 +1,163 @@
+"""
+Faceted job filtering
+/api/jobs filters on location, company, job_type and remote_option (any
+number of values each) and returns, for every dimension, how many jobs
+carry each value.
+
+Unfiltered counts are read from job_facets, one row per (source,
+dimension, value) kept up to date by triggers on jobs, so they cost the
+number of distinct values rather than the size of the job history. A
+dimension's counts are narrowed by the filters on the *other* dimensions
+(selecting a company still lists every other company); those come from a
+GROUP BY over the jobs matched through the filter column indexes.
+
+Settings:
+    FACET_LIMIT     (default 50, values returned per dimension)
+"""
+import os
+
+from sqlalchemy import column, event, func, select, table
+
+from app.models import db, Job
+
+FACET_DIMENSIONS = ['location', 'company', 'job_type', 'remote_option']
+
+FACET_LIMIT = int(os.environ.get('FACET_LIMIT', 50))
+
+
+def _facet_triggers():
+    """One upsert / decrement per dimension; empty values are not counted"""
+    increment = """
+        INSERT INTO job_facets (source, dimension, value, count)
+        SELECT new.source, '{dimension}', new.{dimension}, 1
+        WHERE coalesce(new.{dimension}, '') != ''
+        ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + 1;
+    """
+    decrement = """
+        UPDATE job_facets SET count = count - 1
+        WHERE source = old.source AND dimension = '{dimension}' AND value = old.{dimension};
+    """
+    cleanup = 'DELETE FROM job_facets WHERE count <= 0;'
+
+    def body(*templates):
+        return ''.join(template.format(dimension=dimension)
+                       for template in templates for dimension in FACET_DIMENSIONS)
+
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS job_facets_insert AFTER INSERT ON jobs BEGIN'
+        f'{body(increment)} END',
+        f'CREATE TRIGGER IF NOT EXISTS job_facets_delete AFTER DELETE ON jobs BEGIN'
+        f'{body(decrement)} {cleanup} END',
+        # last_seen updates on every re-scraped job leave the counts alone
+        f"CREATE TRIGGER IF NOT EXISTS job_facets_update "
+        f"AFTER UPDATE OF source, {', '.join(FACET_DIMENSIONS)} ON jobs BEGIN"
+        f'{body(decrement, increment)} {cleanup} END',
+    ]
+
+
+FACET_INDEX_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_facets (
+        source VARCHAR(50) NOT NULL,
+        dimension VARCHAR(20) NOT NULL,
+        value VARCHAR(500) NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (source, dimension, value)
+    ) WITHOUT ROWID
+    """,
+    # Counts over all sources
+    'CREATE INDEX IF NOT EXISTS ix_job_facets_dimension ON job_facets (dimension, value)',
+] + _facet_triggers()
+
+job_facets = table(
+    'job_facets', column('source'), column('dimension'), column('value'), column('count')
+)
+
+
+def create_facet_index(conn):
+    """Create job_facets and its sync triggers (idempotent)"""
+    for ddl in FACET_INDEX_DDL:
+        conn.exec_driver_sql(ddl)
+
+
+def rebuild_facet_index(conn):
+    """Recount every facet from jobs, e.g. after creating the table on old data"""
+    conn.exec_driver_sql('DELETE FROM job_facets')
+    for dimension in FACET_DIMENSIONS:
+        conn.exec_driver_sql(f"""
+            INSERT INTO job_facets (source, dimension, value, count)
+            SELECT source, '{dimension}', {dimension}, count(*) FROM jobs
+            WHERE coalesce({dimension}, '') != '' GROUP BY source, {dimension}
+        """)
+
+
+@event.listens_for(Job.__table__, 'after_create')
+def _create_with_jobs_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        create_facet_index(connection)
+
+
+@event.listens_for(Job.__table__, 'before_drop')
+def _drop_with_jobs_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS job_facets')
+
+
+def filter_conditions(sources=(), filters=None, skip=None):
+    """
+    WHERE conditions for /api/jobs
+
+    Args:
+        sources: Sources to include (all when empty)
+        filters: Dictionary of dimension -> list of accepted values
+        skip: Dimension whose filter is left out (its own facet counts)
+    """
+    conditions = [Job.source.in_(sources)] if sources else []
+    for dimension, values in (filters or {}).items():
+        if values and dimension != skip:
+            conditions.append(Job.__table__.c[dimension].in_(values))
+    return conditions
+
+
+def _stored_counts(dimension, sources):
+    """Unfiltered counts of one dimension from job_facets"""
+    total = func.sum(job_facets.c.count)
+    query = select(job_facets.c.value, total).where(job_facets.c.dimension == dimension)
+    if sources:
+        query = query.where(job_facets.c.source.in_(sources))
+    return db.session.execute(
+        query.group_by(job_facets.c.value).order_by(total.desc(), job_facets.c.value)
+        .limit(FACET_LIMIT)
+    ).all()
+
+
+def _filtered_counts(dimension, conditions):
+    """Counts of one dimension over the jobs matching `conditions`"""
+    values = Job.__table__.c[dimension]
+    total = func.count()
+    return db.session.execute(
+        select(values, total).where(*conditions, func.coalesce(values, '') != '')
+        .group_by(values).order_by(total.desc(), values).limit(FACET_LIMIT)
+    ).all()
+
+
+def facet_counts(sources=(), filters=None):
+    """
+    Value counts of every facet dimension under the active filters
+
+    Must run inside an application context.
+
+    Returns:
+        Dictionary of dimension -> [{'value': ..., 'count': ...}], most
+        frequent first, at most FACET_LIMIT values each
+    """
+    filters = filters or {}
+    facets = {}
+    for dimension in FACET_DIMENSIONS:
+        narrowed = any(values for other, values in filters.items() if other != dimension)
+        if narrowed:
+            rows = _filtered_counts(dimension, filter_conditions(sources, filters, skip=dimension))
+        else:
+            rows = _stored_counts(dimension, sources)
+        facets[dimension] = [{'value': value, 'count': count} for value, count in rows]
+    return facets
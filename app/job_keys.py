@@ -0,0 +1,71 @@
+"""
+Canonical job keys
+Derives a stable per-source key for a job posting from its URL, so that the
+same posting is recognised even when the scraper returns it with different
+tracking parameters (LinkedIn refId/trackingId/position, etc.).
+"""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# linkedin.com/jobs/view/<slug>-<id> or /jobs/view/<id>
+LINKEDIN_VIEW_ID = re.compile(r'/jobs/view/(?:[^/?#]*-)?(\d+)(?:[/?#]|$)')
+LINKEDIN_CURRENT_JOB_ID = re.compile(r'[?&]currentJobId=(\d+)')
+
+# stepstone.de/stellenangebote--<title>--<id>-inline.html
+STEPSTONE_LISTING_ID = re.compile(r'/stellenangebote--.*--(\d+)(?:-[a-z]+)?\.html')
+
+# glassdoor.de/job-listing/<slug>-JV_...htm?jl=<id>
+GLASSDOOR_LISTING_ID = re.compile(r'[?&](?:jl|jobListingId)=(\d+)')
+
+ID_PATTERNS = {
+    'linkedin': (LINKEDIN_VIEW_ID, LINKEDIN_CURRENT_JOB_ID),
+    'stepstone': (STEPSTONE_LISTING_ID,),
+    'glassdoor': (GLASSDOOR_LISTING_ID,),
+}
+
+# Query parameters that only identify the search request, never the posting
+TRACKING_PARAMS = {
+    'refid', 'trackingid', 'position', 'pagenum', 'origin', 'refresh',
+    'src', 'cs', 'ao', 'guid', 'ea', 'pos', 'srs', 'vt', 'ctt', 'cb',
+    'searchorigin', 'suid', 'rltr', 'jobsearchid',
+}
+
+
+def _normalize_url(url):
+    """Strip scheme, fragment and tracking parameters from a URL"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith('utm_')
+    )
+    normalized = f"{host}{parts.path.rstrip('/')}"
+    if query:
+        normalized += '?' + urlencode(query)
+    return normalized
+
+
+def canonical_job_key(source, url):
+    """
+    Build the canonical key of a job posting
+
+    Args:
+        source: Source name ('linkedin', 'stepstone', 'glassdoor')
+        url: Job URL as returned by the scraper
+
+    Returns:
+        '<source>:<listing id>' when the site's listing id can be extracted,
+        '<source>:url:<normalized url>' otherwise, or None for an empty URL
+    """
+    if not url or not url.strip():
+        return None
+
+    for pattern in ID_PATTERNS.get(source, ()):
+        match = pattern.search(url)
+        if match:
+            return f'{source}:{match.group(1)}'
+
+    return f'{source}:url:{_normalize_url(url)}'[:255]
@@ -0,0 +1,114 @@
+"""
+Scheduler leader election
+Under a multi-worker server every worker imports the app, but only one
+process may run the scheduler and the scrapers. By default that is the
+scraper worker (worker.py) and the web processes only serve the API; with
+SCRAPER_MODE=inline the web workers elect one of themselves. The leader is
+the process holding an exclusive lock (flock) on a file next to the
+database. The lock
+is released by the kernel when the process exits, so another worker takes
+over within LEADER_RETRY_SECONDS if the leader dies or is recycled.
+
+Settings:
+    SCHEDULER_LOCK_PATH     (default: <database path>.scheduler.lock)
+    LEADER_RETRY_SECONDS    (default 15)
+"""
+import fcntl
+import os
+import threading
+import time
+
+LEADER_RETRY_SECONDS = float(os.environ.get('LEADER_RETRY_SECONDS', 15))
+
+# 'elected' stays False in a plain single-process start without election
+_state = {'lock_file': None, 'elected': False}
+_state_lock = threading.Lock()
+
+
+def lock_path(database_path):
+    return os.environ.get('SCHEDULER_LOCK_PATH') or f'{database_path}.scheduler.lock'
+
+
+def try_acquire_leadership(path):
+    """
+    Try to become the leader without blocking
+
+    Returns:
+        True if this process holds the lock (now or already)
+    """
+    with _state_lock:
+        if _state['lock_file'] is not None:
+            return True
+        lock_file = open(path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f'{os.getpid()}\n')
+        lock_file.flush()
+        _state['lock_file'] = lock_file
+        return True
+
+
+def is_leader():
+    with _state_lock:
+        return _state['lock_file'] is not None
+
+
+def owns_scrapers():
+    """
+    Whether scrapers may run in this process: it is the leader, or no
+    election takes place (single process, e.g. the tests)
+    """
+    with _state_lock:
+        return _state['lock_file'] is not None or not _state['elected']
+
+
+def serve_only():
+    """
+    Never run scrapers in this process: it only serves the API, and its
+    triggers are queued for the scraper worker or leader
+    """
+    with _state_lock:
+        _state['elected'] = True
+
+
+def release_leadership():
+    """Give up the lock (tests, orderly shutdown)"""
+    with _state_lock:
+        lock_file, _state['lock_file'] = _state['lock_file'], None
+    if lock_file is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+def elect_leader(path, on_elected, retry_seconds=None):
+    """
+    Call on_elected() once this process becomes the leader
+
+    Tries immediately; if another process holds the lock, a daemon thread
+    keeps retrying every retry_seconds.
+
+    Returns:
+        True if this process became the leader right away
+    """
+    with _state_lock:
+        _state['elected'] = True
+    if try_acquire_leadership(path):
+        on_elected()
+        return True
+
+    interval = LEADER_RETRY_SECONDS if retry_seconds is None else retry_seconds
+
+    def retry():
+        while True:
+            time.sleep(interval)
+            if try_acquire_leadership(path):
+                on_elected()
+                return
+
+    threading.Thread(target=retry, name='leader-election', daemon=True).start()
+    return False
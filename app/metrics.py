@@ -0,0 +1,310 @@
+"""
+Request and scraper metrics
+Counters and histograms exposed on /metrics in the Prometheus text format.
+
+Every thread updates its own shard of a metric, so recording a value never
+takes a lock; /metrics adds the shards up. Each request gets a latency
+observation per route, its SQL query count and time (from SQLAlchemy
+cursor events), and a Server-Timing header with the same numbers.
+Scraper runs record pages fetched, bytes downloaded, time spent fetching,
+parsing (the rest of the scrape) and saving, per source.
+
+Metrics live in the process that records them: under gunicorn each worker
+serves its own request metrics, and only the scheduler leader has scraper
+metrics.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from flask import request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SCRAPE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+REGISTRY = []
+
+
+class _Metric:
+    """Named metric whose values are kept per thread and summed on collection"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self):
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            # Only the first update of every thread takes the lock
+            with self._shards_lock:
+                self._shards.append(values)
+            return values
+
+    def _shard_items(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            yield from list(shard.items())
+
+    def _labels(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        values = self._shard()
+        values[labels] = values.get(labels, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for labels, value in self._shard_items():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self):
+        for labels, value in sorted(self.collect().items()):
+            yield f'{self.name}{self._labels(labels)} {_number(value)}'
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        values = self._shard()
+        # [count per bucket..., count above the last bucket, sum]
+        counts = values.get(labels)
+        if counts is None:
+            counts = values[labels] = [0] * (len(self.buckets) + 2)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-2] += 1
+        counts[-1] += value
+
+    def collect(self):
+        totals = {}
+        for labels, counts in self._shard_items():
+            total = totals.setdefault(labels, [0] * len(counts))
+            for index, count in enumerate(counts):
+                total[index] += count
+        return totals
+
+    def samples(self):
+        for labels, counts in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                yield f'{self.name}_bucket{self._labels(labels, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{self._labels(labels)} {_number(counts[-1])}'
+            yield f'{self.name}_count{self._labels(labels)} {cumulative}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics():
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by route',
+    ('method', 'route', 'status'))
+HTTP_REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL statements executed per request, by route',
+    ('route',), buckets=QUERY_COUNT_BUCKETS)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request, by route',
+    ('route',))
+
+SCRAPER_RUNS = Counter(
+    'scraper_runs_total', 'Finished scraper runs', ('source', 'status'))
+SCRAPER_RUN_SECONDS = Histogram(
+    'scraper_run_duration_seconds', 'Duration of scraper runs', ('source',),
+    buckets=SCRAPE_BUCKETS)
+SCRAPER_PAGES = Counter(
+    'scraper_pages_fetched_total', 'HTTP responses received by scrapers', ('source',))
+SCRAPER_BYTES = Counter(
+    'scraper_bytes_downloaded_total', 'Response body bytes downloaded by scrapers', ('source',))
+SCRAPER_FETCH_SECONDS = Counter(
+    'scraper_fetch_seconds_total', 'Time scrapers waited for HTTP responses', ('source',))
+SCRAPER_PARSE_SECONDS = Counter(
+    'scraper_parse_seconds_total', 'Time scrapers spent outside HTTP requests (parsing)',
+    ('source',))
+SCRAPER_PERSIST_SECONDS = Counter(
+    'scraper_persist_seconds_total', 'Time spent saving scraped jobs', ('source',))
+SCRAPER_JOBS = Counter(
+    'scraper_jobs_total', 'Jobs saved by scrapers, new or already known', ('source', 'new'))
+
+
+# Per-thread accounting of the request or scrape running on the thread
+_request = threading.local()
+_scrape = threading.local()
+
+
+def _before_request():
+    _request.start = time.perf_counter()
+    _request.queries = 0
+    _request.query_seconds = 0.0
+    _request.active = True
+
+
+def _after_request(response):
+    if not getattr(_request, 'active', False):
+        return response
+    _request.active = False
+    elapsed = time.perf_counter() - _request.start
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+    HTTP_REQUEST_SECONDS.observe((request.method, route, str(response.status_code)), elapsed)
+    HTTP_REQUEST_QUERIES.observe((route,), _request.queries)
+    HTTP_REQUEST_DB_SECONDS.observe((route,), _request.query_seconds)
+    response.headers.add(
+        'Server-Timing',
+        f'db;dur={_request.query_seconds * 1000:.2f};desc="{_request.queries} queries", '
+        f'app;dur={elapsed * 1000:.2f}'
+    )
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_request, 'active', False):
+        _request.query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_request, 'active', False):
+        _request.queries += 1
+        _request.query_seconds += time.perf_counter() - _request.query_start
+
+
+def init_metrics(app, engine):
+    """
+    Time every request of `app` and count the SQL statements it runs on `engine`
+
+    Register before other after_request hooks (Flask runs them in reverse),
+    so the timing covers them too.
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+_instrument_lock = threading.Lock()
+
+
+def instrument_requests():
+    """
+    Count the responses, bytes and wait time of `requests` calls made
+    inside track_scrape() (requests.get and sessions both go through
+    Session.send). Idempotent; calls outside a scrape are left alone.
+    """
+    import requests
+
+    with _instrument_lock:
+        send = requests.Session.send
+        if getattr(send, 'records_scraper_metrics', False):
+            return
+
+        @functools.wraps(send)
+        def timed_send(session, prepared, **kwargs):
+            source = getattr(_scrape, 'source', None)
+            # Redirects call send() again from inside send()
+            if source is None or _scrape.in_send:
+                return send(session, prepared, **kwargs)
+            _scrape.in_send = True
+            start = time.perf_counter()
+            try:
+                response = send(session, prepared, **kwargs)
+            finally:
+                _scrape.in_send = False
+                elapsed = time.perf_counter() - start
+                _scrape.fetch_seconds += elapsed
+                SCRAPER_FETCH_SECONDS.inc((source,), elapsed)
+            SCRAPER_PAGES.inc((source,))
+            if not kwargs.get('stream'):
+                SCRAPER_BYTES.inc((source,), len(response.content))
+            return response
+
+        timed_send.records_scraper_metrics = True
+        requests.Session.send = timed_send
+
+
+@contextmanager
+def track_scrape(source):
+    """
+    Attribute the HTTP requests made on this thread to `source`; the time
+    not spent waiting for responses is recorded as parse time
+
+    Yields:
+        Namespace whose fetch_seconds and parse_seconds are set on exit
+    """
+    timings = SimpleNamespace(fetch_seconds=0.0, parse_seconds=0.0)
+    _scrape.source = source
+    _scrape.in_send = False
+    _scrape.fetch_seconds = 0.0
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.fetch_seconds = _scrape.fetch_seconds
+        timings.parse_seconds = max(time.perf_counter() - start - _scrape.fetch_seconds, 0.0)
+        SCRAPER_PARSE_SECONDS.inc((source,), timings.parse_seconds)
+        _scrape.source = None
+
+
+@contextmanager
+def track_persist(source):
+    """Record the time spent saving a batch of scraped jobs"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SCRAPER_PERSIST_SECONDS.inc((source,), time.perf_counter() - start)
+
+
+def record_run(source, status, seconds):
+    SCRAPER_RUNS.inc((source, status))
+    SCRAPER_RUN_SECONDS.observe((source,), seconds)
+
+
+def record_jobs(source, total, new):
+    SCRAPER_JOBS.inc((source, 'true'), new)
+    SCRAPER_JOBS.inc((source, 'false'), total - new)
@@ -0,0 +1,217 @@
+"""
+Lightweight schema migrations for the SQLite database
+
+db.create_all() only creates missing tables, so changes to existing tables
+(new indexes, new columns) are applied here. The number of the last applied
+step is stored in PRAGMA user_version. Steps use plain DDL rather than the
+current models, so an old database can be walked through every version.
+"""
+from sqlalchemy import inspect
+from app.models import db
+from app.compact_jobs import compact_jobs
+from app.search import create_search_index, rebuild_search_index
+from app.facets import FACET_DIMENSIONS, create_facet_index, rebuild_facet_index
+from app.trends import create_rollups, rebuild_rollups
+
+
+def _column_names(conn, table):
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')}
+
+
+def _add_column(conn, table, column, ddl):
+    """Add a column unless it already exists"""
+    if column not in _column_names(conn, table):
+        conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+
+
+def _add_hot_path_indexes(conn):
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_jobs_source_new_first_seen '
+        'ON jobs (source, is_new_in_last_hour, first_seen)'
+    )
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_jobs_source_first_seen ON jobs (source, first_seen)'
+    )
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_jobs_first_seen ON jobs (first_seen)'
+    )
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_scraper_runs_source_status_end_time '
+        'ON scraper_runs (source, status, end_time)'
+    )
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_scraper_runs_source_start_time '
+        'ON scraper_runs (source, start_time)'
+    )
+
+
+def _add_first_seen_run_id(conn):
+    _add_column(conn, 'jobs', 'first_seen_run_id', 'INTEGER REFERENCES scraper_runs (id)')
+
+    # Carry the old per-row flag over: jobs flagged as new belong to the
+    # latest completed run of their source.
+    if 'is_new_in_last_hour' in _column_names(conn, 'jobs'):
+        conn.exec_driver_sql("""
+            UPDATE jobs SET first_seen_run_id = (
+                SELECT max(r.id) FROM scraper_runs r
+                WHERE r.source = jobs.source AND r.status = 'completed'
+            )
+            WHERE is_new_in_last_hour = 1 AND first_seen_run_id IS NULL
+        """)
+
+    conn.exec_driver_sql('DROP INDEX IF EXISTS ix_jobs_source_new_first_seen')
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_jobs_first_seen_run_first_seen '
+        'ON jobs (first_seen_run_id, first_seen)'
+    )
+
+
+def _add_job_key(conn):
+    _add_column(conn, 'jobs', 'job_key', 'VARCHAR(255)')
+    # Backfill keys and merge existing duplicates before enforcing uniqueness
+    scanned, removed = compact_jobs(conn)
+    print(f"   Computed keys for {scanned} jobs, merged {removed} duplicates")
+    conn.exec_driver_sql(
+        'CREATE UNIQUE INDEX IF NOT EXISTS ix_jobs_job_key ON jobs (job_key)'
+    )
+
+
+def _drop_job_url_unique(conn):
+    # job_key replaced the raw URL as the dedup key. The UNIQUE constraint on
+    # job_url only duplicated that index and rejects postings whose URLs
+    # collide once truncated to 1000 characters. SQLite cannot drop a table
+    # constraint, so the table is rebuilt without it.
+    unique_on_url = any(
+        unique and origin == 'u' and [
+            row[2] for row in conn.exec_driver_sql(f'PRAGMA index_info("{name}")')
+        ] == ['job_url']
+        for _, name, unique, origin, _ in conn.exec_driver_sql('PRAGMA index_list(jobs)')
+    )
+    if not unique_on_url:
+        return
+
+    columns = conn.exec_driver_sql('PRAGMA table_info(jobs)').all()
+    definitions = []
+    for _, name, type_, notnull, default, _ in columns:
+        definition = f'{name} {type_}'
+        if notnull:
+            definition += ' NOT NULL'
+        if default is not None:
+            definition += f' DEFAULT {default}'
+        definitions.append(definition)
+    primary_key = [row[1] for row in sorted(columns, key=lambda row: row[5]) if row[5]]
+    definitions.append(f"PRIMARY KEY ({', '.join(primary_key)})")
+    for row in conn.exec_driver_sql('PRAGMA foreign_key_list(jobs)'):
+        definitions.append(f'FOREIGN KEY({row[3]}) REFERENCES {row[2]} ({row[4]})')
+
+    index_ddl = [row[0] for row in conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = 'jobs' AND sql IS NOT NULL"
+    )]
+    names = ', '.join(row[1] for row in columns)
+
+    conn.exec_driver_sql(f"CREATE TABLE jobs_rebuild ({', '.join(definitions)})")
+    conn.exec_driver_sql(f'INSERT INTO jobs_rebuild ({names}) SELECT {names} FROM jobs')
+    conn.exec_driver_sql('DROP TABLE jobs')
+    conn.exec_driver_sql('ALTER TABLE jobs_rebuild RENAME TO jobs')
+    for ddl in index_ddl:
+        conn.exec_driver_sql(ddl)
+
+
+def _add_cluster_id(conn):
+    # Existing jobs are clustered on demand with `python -m app.dedup`;
+    # until then each one is its own cluster.
+    _add_column(conn, 'jobs', 'cluster_id', 'INTEGER')
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_jobs_cluster_id ON jobs (cluster_id)'
+    )
+
+
+def _add_search_index(conn):
+    create_search_index(conn)
+    rebuild_search_index(conn)
+
+
+def _add_job_facets(conn):
+    # Older rows have no remote option; the scrapers fill it in from now on
+    _add_column(conn, 'jobs', 'remote_option', 'VARCHAR(100)')
+    for dimension in FACET_DIMENSIONS:
+        conn.exec_driver_sql(
+            f'CREATE INDEX IF NOT EXISTS ix_jobs_{dimension} ON jobs ({dimension})'
+        )
+    create_facet_index(conn)
+    rebuild_facet_index(conn)
+
+
+def _add_job_rollups(conn):
+    create_rollups(conn)
+    rebuild_rollups(conn)
+
+
+def _add_run_timings(conn):
+    for column in ('fetch_seconds', 'parse_seconds', 'persist_seconds'):
+        _add_column(conn, 'scraper_runs', column, 'FLOAT')
+
+
+# (version, description, step) - append only, never renumber
+MIGRATIONS = [
+    (1, 'Add indexes for hot query paths', _add_hot_path_indexes),
+    (2, 'Track the scraper run that first saw each job', _add_first_seen_run_id),
+    (3, 'Deduplicate jobs by canonical job key', _add_job_key),
+    (4, 'Drop the unique constraint on job_url', _drop_job_url_unique),
+    (5, 'Add near-duplicate cluster ids', _add_cluster_id),
+    (6, 'Add the full-text search index', _add_search_index),
+    (7, 'Add the remote option column and job facet counts', _add_job_facets),
+    (8, 'Add hourly new job rollups', _add_job_rollups),
+    (9, 'Record where scraper runs spend their time', _add_run_timings),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Return the last migration applied to the connected database"""
+    return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+
+def run_migrations(engine=None):
+    """
+    Apply all pending migrations
+
+    Args:
+        engine: SQLAlchemy engine to migrate (defaults to the app's engine)
+
+    Returns:
+        The schema version after migrating
+    """
+    engine = engine or db.engine
+
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+
+        for number, description, step in MIGRATIONS:
+            if number <= version:
+                continue
+            print(f"🔧 Applying database migration {number}: {description}")
+            step(conn)
+            conn.exec_driver_sql(f'PRAGMA user_version = {number}')
+            version = number
+
+    return version
+
+
+def init_database():
+    """
+    Create the schema for a new database, or migrate an existing one.
+    Must be called inside an application context.
+    """
+    is_new_database = not inspect(db.engine).has_table('jobs')
+
+    db.create_all()
+
+    if is_new_database:
+        # Tables were just created from the current models
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(f'PRAGMA user_version = {LATEST_VERSION}')
+    else:
+        run_migrations()
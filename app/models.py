@@ -10,30 +10,72 @@ db = SQLAlchemy()
 class Job(db.Model):
     """Model for storing job listings"""
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # /api/jobs/<source>: jobs first seen by the last run, newest first
+        db.Index('ix_jobs_first_seen_run_first_seen', 'first_seen_run_id', 'first_seen'),
+        # /api/stats: per-source counts
+        db.Index('ix_jobs_source_first_seen', 'source', 'first_seen'),
+        # /api/stats last-hour window and /api/jobs/all ordering
+        db.Index('ix_jobs_first_seen', 'first_seen'),
+        # Deduplication on ingest
+        db.Index('ix_jobs_job_key', 'job_key', unique=True),
+        # Cross-source duplicate clusters
+        db.Index('ix_jobs_cluster_id', 'cluster_id'),
+        # /api/jobs facet filters, see app/facets.py
+        db.Index('ix_jobs_location', 'location'),
+        db.Index('ix_jobs_company', 'company'),
+        db.Index('ix_jobs_job_type', 'job_type'),
+        db.Index('ix_jobs_remote_option', 'remote_option'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     source = db.Column(db.String(50), nullable=False)  # 'linkedin', 'stepstone', 'glassdoor'
     job_title = db.Column(db.String(500))
     company = db.Column(db.String(500))
     location = db.Column(db.String(500))
-    job_url = db.Column(db.String(1000), unique=True)
+    job_url = db.Column(db.String(1000))
+    # Stable per-source posting id and dedup key, see app/job_keys.py
+    job_key = db.Column(db.String(255))
     description = db.Column(db.Text)
     salary = db.Column(db.String(200))
     job_type = db.Column(db.String(200))
+    remote_option = db.Column(db.String(100))  # e.g. 'Remote', 'Teilweise Home-Office'
     
     # Timestamps
     posted_date = db.Column(db.String(200))  # Original posted date from scraper
     first_seen = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # When we first scraped it
     last_seen = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Last time we saw it
     
-    # Track if this job was new in the last hourly run
-    is_new_in_last_hour = db.Column(db.Boolean, default=False)
+    # Scraper run that first inserted this job. A job is "new in the last
+    # hour" when this is the latest completed run of its source, so a run
+    # never has to reset flags on historical rows.
+    first_seen_run_id = db.Column(db.Integer, db.ForeignKey('scraper_runs.id'))
+    
+    # Near-duplicate cluster across sources (smallest job id in the cluster,
+    # NULL until the job has been clustered), see app/dedup.py
+    cluster_id = db.Column(db.Integer)
     
     def __repr__(self):
         return f'<Job {self.job_title} at {self.company} - {self.source}>'
     
-    def to_dict(self):
-        """Convert job to dictionary"""
+    def is_new_in_run(self, latest_run_ids):
+        """
+        Check whether this job was first seen by the latest run of its source
+        
+        Args:
+            latest_run_ids: Dictionary of source -> latest completed run id
+        """
+        return (self.first_seen_run_id is not None and
+                self.first_seen_run_id == latest_run_ids.get(self.source))
+    
+    def to_dict(self, latest_run_ids=None):
+        """
+        Convert job to dictionary
+        
+        Args:
+            latest_run_ids: Dictionary of source -> latest completed run id,
+                            used to fill in 'is_new_in_last_hour'
+        """
         return {
             'id': self.id,
             'source': self.source,
@@ -44,16 +86,24 @@ class Job(db.Model):
             'description': self.description,
             'salary': self.salary,
             'job_type': self.job_type,
+            'remote_option': self.remote_option,
             'posted_date': self.posted_date,
             'first_seen': self.first_seen.isoformat() if self.first_seen else None,
             'last_seen': self.last_seen.isoformat() if self.last_seen else None,
-            'is_new_in_last_hour': self.is_new_in_last_hour
+            'is_new_in_last_hour': self.is_new_in_run(latest_run_ids or {}),
+            'cluster_id': self.cluster_id
         }
 
 
 class ScraperRun(db.Model):
     """Model for tracking scraper execution history"""
     __tablename__ = 'scraper_runs'
+    __table_args__ = (
+        # Last completed run per source (check_last_run_time, can-run)
+        db.Index('ix_scraper_runs_source_status_end_time', 'source', 'status', 'end_time'),
+        # Most recent runs per source (/api/stats, /api/scraper/status)
+        db.Index('ix_scraper_runs_source_start_time', 'source', 'start_time'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     source = db.Column(db.String(50), nullable=False)
@@ -63,10 +113,27 @@ class ScraperRun(db.Model):
     jobs_found = db.Column(db.Integer, default=0)
     new_jobs = db.Column(db.Integer, default=0)  # New jobs in this run
     error_message = db.Column(db.Text)
+    # Where the run spent its time (see app/metrics.py)
+    fetch_seconds = db.Column(db.Float)  # waiting for HTTP responses
+    parse_seconds = db.Column(db.Float)  # rest of the scrape
+    persist_seconds = db.Column(db.Float)  # saving the jobs
     
     def __repr__(self):
         return f'<ScraperRun {self.source} at {self.start_time}>'
     
+    @classmethod
+    def latest_completed_ids(cls):
+        """
+        Get the id of the latest completed run for every source
+        
+        Returns:
+            Dictionary of source -> run id
+        """
+        rows = db.session.query(cls.source, db.func.max(cls.id)).filter(
+            cls.status == 'completed'
+        ).group_by(cls.source).all()
+        return dict(rows)
+    
     def to_dict(self):
         """Convert scraper run to dictionary"""
         return {
@@ -77,5 +144,43 @@ class ScraperRun(db.Model):
             'status': self.status,
             'jobs_found': self.jobs_found,
             'new_jobs': self.new_jobs,
-            'error_message': self.error_message
+            'error_message': self.error_message,
+            'fetch_seconds': self.fetch_seconds,
+            'parse_seconds': self.parse_seconds,
+            'persist_seconds': self.persist_seconds
         }
+
+
+class JobSignature(db.Model):
+    """MinHash signature of a job, used for near-duplicate detection"""
+    __tablename__ = 'job_signatures'
+    
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+
+class JobLshBucket(db.Model):
+    """LSH band bucket membership of a job signature"""
+    __tablename__ = 'job_lsh_buckets'
+    __table_args__ = (
+        # Removing the buckets of deleted jobs (app/compact_jobs.py)
+        db.Index('ix_job_lsh_buckets_job_id', 'job_id'),
+    )
+    
+    # Primary key (bucket, source, job_id) doubles as the candidate lookup
+    # index; candidates are always restricted to the other sources
+    bucket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    source = db.Column(db.String(50), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), primary_key=True)
+
+
+class ScrapeRequest(db.Model):
+    """
+    Manual scraper trigger received by a worker that is not the scheduler
+    leader; the leader picks it up and runs it (see app/leader.py)
+    """
+    __tablename__ = 'scrape_requests'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(50), nullable=False)  # a source or 'all'
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
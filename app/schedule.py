@@ -0,0 +1,192 @@
+"""
+Scraper schedule
+Describes when every source is scraped; init_scheduler() registers exactly
+one job per source from it.
+
+Each source runs once per slot of its interval. Slots start at `offset`
+seconds past the interval boundary (UTC), and a run is delayed by up to
+`jitter` seconds into its slot. A run that could not start on time is still
+started within `misfire_grace` seconds, missed runs are `coalesce`d into
+one, and at most `max_instances` runs of a source are active at once.
+
+`interval` is where a source starts: app/adaptive.py moves it between
+`min_interval` and `max_interval` so that a run finds about
+`target_new_jobs` new jobs.
+
+The built-in schedule below can be overridden by a YAML file and then by
+environment variables:
+
+    defaults:
+      interval: 3600
+      jitter: 60
+    sources:
+      stepstone: {offset: 600, interval: 7200}
+
+Settings:
+    SCHEDULE_FILE               (YAML file as above, needs PyYAML; unset by default)
+    SCHEDULE_<FIELD>            (default for every source, e.g. SCHEDULE_JITTER=30)
+    SCHEDULE_<SOURCE>_<FIELD>   (one source, e.g. SCHEDULE_GLASSDOOR_INTERVAL=7200)
+"""
+import math
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.util import normalize, timedelta_seconds
+
+SOURCES = ['linkedin', 'stepstone', 'glassdoor']
+
+SourceSchedule = namedtuple(
+    'SourceSchedule',
+    'source interval offset jitter misfire_grace coalesce max_instances '
+    'min_interval max_interval target_new_jobs'
+)
+
+FIELDS = SourceSchedule._fields[1:]
+
+DEFAULTS = {
+    'interval': 3600,
+    'jitter': 60,
+    'misfire_grace': 300,
+    'coalesce': True,
+    'max_instances': 1,
+    'min_interval': 1800,
+    'max_interval': 4 * 3600,
+    'target_new_jobs': 20,
+}
+
+# Staggered so the three sources do not fetch at the same time
+DEFAULT_OFFSETS = {'linkedin': 0, 'stepstone': 600, 'glassdoor': 1200}
+
+# Slots are counted from here, so hourly slots start at the top of the hour
+EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def _parse(field, value):
+    if field == 'coalesce':
+        if isinstance(value, str):
+            return value.strip().lower() in ('1', 'true', 'yes', 'on')
+        return bool(value)
+    if field == 'max_instances':
+        return int(value)
+    return float(value)
+
+
+def _validate(entry):
+    if not 0 < entry.min_interval <= entry.interval <= entry.max_interval:
+        raise ValueError(f'{entry.source}: interval must be between min_interval and max_interval')
+    # The interval can shrink to min_interval
+    if not 0 <= entry.offset < entry.min_interval:
+        raise ValueError(f'{entry.source}: offset must be shorter than min_interval')
+    if not 0 <= entry.jitter < entry.min_interval:
+        raise ValueError(f'{entry.source}: jitter must be shorter than min_interval')
+    if entry.target_new_jobs <= 0:
+        raise ValueError(f'{entry.source}: target_new_jobs must be positive')
+    if entry.misfire_grace <= 0:
+        raise ValueError(f'{entry.source}: misfire_grace must be positive')
+    if entry.max_instances < 1:
+        raise ValueError(f'{entry.source}: max_instances must be at least 1')
+
+
+def _read_file(path):
+    import yaml  # optional, only needed for SCHEDULE_FILE
+
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    unknown = set(config.get('sources') or {}) - set(SOURCES)
+    if unknown:
+        raise ValueError(f'unknown sources in {path}: {", ".join(sorted(unknown))}')
+    return config.get('defaults') or {}, config.get('sources') or {}
+
+
+def load_schedule(path=None, environ=None):
+    """
+    Build the schedule of every source
+
+    Args:
+        path: YAML file (defaults to SCHEDULE_FILE)
+        environ: Environment to read overrides from (defaults to os.environ)
+
+    Returns:
+        dict of source -> SourceSchedule
+
+    Raises:
+        ValueError: If a value is invalid
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get('SCHEDULE_FILE')
+    file_defaults, file_sources = _read_file(path) if path else ({}, {})
+
+    schedule = {}
+    for source in SOURCES:
+        values = dict(DEFAULTS, offset=DEFAULT_OFFSETS[source])
+        values.update(file_defaults)
+        values.update(file_sources.get(source) or {})
+        for field in FIELDS:
+            for name in (f'SCHEDULE_{field.upper()}', f'SCHEDULE_{source.upper()}_{field.upper()}'):
+                if environ.get(name):
+                    values[field] = environ[name]
+        unknown = set(values) - set(FIELDS)
+        if unknown:
+            raise ValueError(f'{source}: unknown settings {", ".join(sorted(unknown))}')
+        entry = SourceSchedule(source, **{field: _parse(field, values[field]) for field in FIELDS})
+        _validate(entry)
+        schedule[source] = entry
+    return schedule
+
+
+class SlotTrigger(IntervalTrigger):
+    """
+    IntervalTrigger firing once per slot of its interval
+
+    IntervalTrigger adds the interval to the previous, already jittered fire
+    time, so the jitter accumulates and runs drift through the hour. This
+    trigger starts from the slot after the previous run's slot instead.
+    """
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if previous_fire_time is None:
+            return super().get_next_fire_time(previous_fire_time, now)
+
+        elapsed = timedelta_seconds(previous_fire_time - self.start_date)
+        slot = math.floor(elapsed / self.interval_length) + 1
+        next_fire_time = self.start_date + self.interval * slot
+        if self.jitter is not None:
+            next_fire_time = self._apply_jitter(next_fire_time, self.jitter, now)
+        if not self.end_date or next_fire_time <= self.end_date:
+            return normalize(next_fire_time)
+
+
+def trigger_for(entry, interval=None):
+    """The APScheduler trigger of one source's schedule (at `interval`, if given)"""
+    return SlotTrigger(
+        seconds=interval or entry.interval,
+        start_date=EPOCH + timedelta(seconds=entry.offset),
+        timezone=timezone.utc,
+        jitter=entry.jitter or None,
+    )
+
+
+def schedule_matches(job, entry):
+    """Whether a (stored) job was built from `entry`, at any interval within its bounds"""
+    trigger = job.trigger
+    return (
+        isinstance(trigger, SlotTrigger)
+        and trigger.start_date == EPOCH + timedelta(seconds=entry.offset)
+        and (trigger.jitter or 0) == entry.jitter
+        and entry.min_interval <= trigger.interval_length <= entry.max_interval
+        and job.misfire_grace_time == int(entry.misfire_grace)
+        and job.coalesce == entry.coalesce
+        and job.max_instances == entry.max_instances
+    )
+
+
+def job_options(entry):
+    """Keyword arguments of scheduler.add_job() for one source"""
+    return {
+        'trigger': trigger_for(entry),
+        'misfire_grace_time': int(entry.misfire_grace),
+        'coalesce': entry.coalesce,
+        'max_instances': entry.max_instances,
+    }
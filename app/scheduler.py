@@ -1,71 +1,105 @@
 """
 Job Scheduler Module
 Schedules scrapers to run at regular intervals
+
+A batch runs the sources in parallel on a bounded thread pool, so it takes
+about as long as the slowest source. Each source has its own lock: a slow
+Stepstone run never blocks Glassdoor, while a second run of the same
+source is skipped. Database writes of concurrent runs are serialized in
+app/scraper_integration.py.
+
+Every source has one job, built from app/schedule.py. After each run its
+interval is adapted to the source's posting rate (app/adaptive.py).
+
+The jobs are kept in the database (JOBSTORE_TABLE, created by APScheduler),
+so a restart resumes the schedule. Instead of scraping everything on every
+start, plan_startup() only runs the sources whose last completed run is
+older than their interval.
+
+Settings:
+    SCRAPER_WORKERS     (default 3, sources scraped at the same time)
 """
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime, timedelta
+from apscheduler.triggers.interval import IntervalTrigger
+from concurrent.futures import ThreadPoolExecutor, wait
+from sqlalchemy import delete
+from datetime import datetime, timedelta, timezone
+import os
 import threading
-from app.scraper_integration import run_linkedin_scraper, run_stepstone_scraper, run_glassdoor_scraper
-from app.app import app
-from app.models import db, ScraperRun
+import time
+from app.app import get_app
+from app.eligibility import check_batch, check_source
+from app.models import db, ScrapeRequest
+from app.adaptive import adapt_job
+from app.schedule import job_options, load_schedule, schedule_matches
+
+SOURCES = ['linkedin', 'stepstone', 'glassdoor']
+
+SCRAPER_WORKERS = int(os.environ.get('SCRAPER_WORKERS', 3))
+
+# Locks to prevent concurrent runs of the same scraper
+scraper_locks = {source: threading.Lock() for source in SOURCES}
+
+_pool = {'executor': None}
+_pool_lock = threading.Lock()
+
+# The running scheduler and its schedule, for adapting the intervals
+_scheduler = {'instance': None, 'schedule': None}
+
+JOBSTORE_TABLE = 'apscheduler_jobs'
 
-# Lock to prevent concurrent scraper runs
-scraper_lock = threading.Lock()
+# Seconds between checks for scrapers triggered through other workers
+SCRAPE_REQUEST_POLL_SECONDS = 5
 
-# Track last successful run times for each source
-last_run_times = {
-    'linkedin': None,
-    'stepstone': None,
-    'glassdoor': None
-}
 
-def check_last_run_time(source):
+def check_last_run_time(source, cooldown=None):
     """
-    Check if at least 1 hour has passed since the last successful run
+    Check if the cooldown (1 hour by default) has passed since the last
+    successful run, see app/eligibility.py
     
     Args:
         source: 'linkedin', 'stepstone', or 'glassdoor'
+        cooldown: Seconds to require instead of the source's cooldown
     
     Returns:
         bool: True if enough time has passed, False otherwise
     """
-    with app.app_context():
-        # Get the last completed run from database
-        last_run = ScraperRun.query.filter_by(
-            source=source,
-            status='completed'
-        ).order_by(ScraperRun.end_time.desc()).first()
-        
-        if not last_run or not last_run.end_time:
-            # No previous run or no end time, allow to run
-            print(f"  ℹ️  No previous completed run found for {source}, allowing scraper to run")
-            return True
-        
-        time_since_last_run = datetime.utcnow() - last_run.end_time
-        time_since_seconds = time_since_last_run.total_seconds()
-        time_since_minutes = time_since_seconds / 60
-        
-        # Check if at least 1 hour (3600 seconds) has passed
-        if time_since_seconds < 3600:
-            remaining_minutes = (3600 - time_since_seconds) / 60
-            print(f"  ⏰ Last {source} run completed {time_since_minutes:.1f} minutes ago")
-            print(f"  ⛔ Less than 1 hour since last run. Skipping. (Wait {remaining_minutes:.1f} more minutes)")
-            return False
-        
-        print(f"  ✅ Last {source} run completed {time_since_minutes:.1f} minutes ago. Proceeding with new run.")
+    with get_app().app_context():
+        eligibility = check_source(source, cooldown=cooldown)
+    
+    if eligibility.last_completed is None:
+        # No previous run or no end time, allow to run
+        print(f"  ℹ️  No previous completed run found for {source}, allowing scraper to run")
         return True
+    
+    time_since_minutes = eligibility.seconds_since_last / 60
+    if not eligibility.can_run:
+        remaining_minutes = eligibility.seconds_remaining / 60
+        print(f"  ⏰ Last {source} run completed {time_since_minutes:.1f} minutes ago")
+        print(f"  ⛔ Cooldown not over since last run. Skipping. (Wait {remaining_minutes:.1f} more minutes)")
+        return False
+    
+    print(f"  ✅ Last {source} run completed {time_since_minutes:.1f} minutes ago. Proceeding with new run.")
+    return True
 
 
-def run_scraper_task(source):
+def run_scraper_task(source, cooldown=None):
     """
     Run a specific scraper task
     
     Args:
         source: 'linkedin', 'stepstone', or 'glassdoor'
+        cooldown: Seconds since the last completed run to require instead
+            of the source's cooldown
     """
-    # Prevent concurrent runs
-    if not scraper_lock.acquire(blocking=False):
+    if source not in scraper_locks:
+        print(f"Unknown source: {source}")
+        return
+    
+    # Prevent concurrent runs of this source
+    lock = scraper_locks[source]
+    if not lock.acquire(blocking=False):
         print(f"⏳ Scraper for {source} is already running, skipping...")
         return
     
@@ -75,140 +109,225 @@ def run_scraper_task(source):
         print(f"{'#'*60}\n")
         
         # Check if enough time has passed since last run
-        if not check_last_run_time(source):
+        if not check_last_run_time(source, cooldown):
             print(f"{'#'*60}\n")
             return
         
-        # Run the scraper
+        # Run the scraper (imported here, so loading the scheduler stays cheap)
+        from app import scraper_integration
+        
         if source == 'linkedin':
-            run_linkedin_scraper()
+            scraper_integration.run_linkedin_scraper()
         elif source == 'stepstone':
-            run_stepstone_scraper()
+            scraper_integration.run_stepstone_scraper()
         elif source == 'glassdoor':
-            run_glassdoor_scraper()
-        else:
-            print(f"Unknown source: {source}")
+            scraper_integration.run_glassdoor_scraper()
         
-        # Update last run time in memory
-        last_run_times[source] = datetime.utcnow()
+        adapt_interval(source)
             
     except Exception as e:
         print(f"Error in scheduled task for {source}: {str(e)}")
     finally:
-        scraper_lock.release()
+        lock.release()
+
+
+def adapt_interval(source):
+    """Move the job of `source` to the interval its posting rate calls for"""
+    scheduler, schedule = _scheduler['instance'], _scheduler['schedule']
+    if scheduler is None:
+        return None
+    with get_app().app_context():
+        return adapt_job(scheduler, schedule[source], f'{source}_scraper')
+
+
+def scraper_pool():
+    """The bounded thread pool batches run their sources on"""
+    with _pool_lock:
+        if _pool['executor'] is None:
+            _pool['executor'] = ThreadPoolExecutor(max_workers=SCRAPER_WORKERS,
+                                                   thread_name_prefix='scraper')
+        return _pool['executor']
 
 
 def run_all_scrapers():
     """
-    Run all scrapers in sequence with time checks
-    Only runs if at least 1 hour has passed since last completed run
+    Run all scrapers in parallel with time checks
+    Only runs if the batch cooldown has passed since the last completed run
     """
     print(f"\n{'#'*60}")
     print(f"Running all scrapers at {datetime.now()}")
     print(f"{'#'*60}\n")
     
-    with app.app_context():
-        # Check the last run time for all scrapers
-        sources = ['linkedin', 'stepstone', 'glassdoor']
+    with get_app().app_context():
+        batch = check_batch()
+    
+    # Check if the cooldown has passed since the most recent completed run
+    if batch.last_completed:
+        time_since_minutes = batch.seconds_since_last / 60
         
-        # Find the most recent completion time among all scrapers
-        latest_completion = None
-        for source in sources:
-            last_run = ScraperRun.query.filter_by(
-                source=source,
-                status='completed'
-            ).order_by(ScraperRun.end_time.desc()).first()
-            
-            if last_run and last_run.end_time:
-                if latest_completion is None or last_run.end_time > latest_completion:
-                    latest_completion = last_run.end_time
+        if not batch.can_run:
+            remaining_minutes = batch.seconds_remaining / 60
+            print(f"⏰ Last scraper batch completed {time_since_minutes:.1f} minutes ago")
+            print(f"⛔ Cooldown not over since last batch completion.")
+            print(f"   Skipping all scrapers. (Wait {remaining_minutes:.1f} more minutes)")
+            print(f"{'#'*60}\n")
+            return
         
-        # Check if at least 1 hour has passed since the last completed run
-        if latest_completion:
-            time_since_last = datetime.utcnow() - latest_completion
-            time_since_minutes = time_since_last.total_seconds() / 60
-            
-            if time_since_last.total_seconds() < 3600:
-                remaining_minutes = (3600 - time_since_last.total_seconds()) / 60
-                print(f"⏰ Last scraper batch completed {time_since_minutes:.1f} minutes ago")
-                print(f"⛔ Less than 1 hour since last batch completion.")
-                print(f"   Skipping all scrapers. (Wait {remaining_minutes:.1f} more minutes)")
-                print(f"{'#'*60}\n")
-                return
-            
-            print(f"✅ Last scraper batch completed {time_since_minutes:.1f} minutes ago.")
-            print(f"   Proceeding with new scraper batch.\n")
-    
-    # Run LinkedIn first (gets last 1 hour jobs)
-    run_scraper_task('linkedin')
+        print(f"✅ Last scraper batch completed {time_since_minutes:.1f} minutes ago.")
+        print(f"   Proceeding with new scraper batch.\n")
     
-    # Run Stepstone (gets last 24 hours, we track new ones)
-    run_scraper_task('stepstone')
-    
-    # Run Glassdoor (gets last 24 hours, we track new ones)
-    run_scraper_task('glassdoor')
+    # LinkedIn gets the last hour of jobs; Stepstone and Glassdoor the last
+    # 24 hours, of which we track the new ones
+    start = time.perf_counter()
+    wait([scraper_pool().submit(run_scraper_task, source) for source in SOURCES])
     
     print(f"\n{'#'*60}")
-    print(f"All scrapers batch completed at {datetime.now()}")
+    print(f"All scrapers batch completed at {datetime.now()} "
+          f"in {time.perf_counter() - start:.1f}s")
     print(f"{'#'*60}\n")
 
 
-def init_scheduler():
-    """Initialize and start the scheduler"""
-    scheduler = BackgroundScheduler()
+def start_scrape(source):
+    """Run one scraper (or 'all') in a background thread of this process"""
+    if source == 'all':
+        target = run_all_scrapers
+    else:
+        target = lambda: run_scraper_task(source)
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def request_scrape(source):
+    """Queue a manual trigger for the scheduler leader (see app/leader.py)"""
+    with get_app().app_context():
+        db.session.add(ScrapeRequest(source=source))
+        db.session.commit()
+
+
+def run_requested_scrapes():
+    """Start the scrapers that were triggered through other workers"""
+    with get_app().app_context():
+        sources = db.session.scalars(
+            delete(ScrapeRequest).returning(ScrapeRequest.source)
+        ).all()
+        db.session.commit()
+    
+    # The same trigger clicked in several tabs runs once
+    for source in dict.fromkeys(sources):
+        print(f"📨 Running scraper triggered through another worker: {source}")
+        start_scrape(source)
+
+
+def add_jobs(scheduler, schedule):
+    """
+    Add the job of every source and the trigger poll to `scheduler`
     
-    # Run all scrapers every hour at the top of the hour
-    # This ensures we capture:
+    A job restored from the job store is kept, with its adapted interval
+    and next run time, as long as it still matches the schedule.
+    """
+    # One job per source, from the schedule in app/schedule.py:
     # - LinkedIn: jobs from last 1 hour
     # - Stepstone: new jobs since last run (by comparing with previous 24h data)
     # - Glassdoor: new jobs since last run (by comparing with previous 24h data)
+    # A scheduled run starts less than an interval after the previous one
+    # finished, so it only skips a slot when a manual run just completed
+    for source, entry in schedule.items():
+        job = scheduler.get_job(f'{source}_scraper')
+        if job is not None and schedule_matches(job, entry):
+            continue
+        scheduler.add_job(
+            func=run_scraper_task,
+            args=[source],
+            kwargs={'cooldown': entry.interval / 2},
+            id=f'{source}_scraper',
+            name=f'{source.capitalize()} scraper',
+            replace_existing=True,
+            **job_options(entry)
+        )
     
+    # Manual triggers received by other workers
     scheduler.add_job(
-        func=run_all_scrapers,
-        trigger=CronTrigger(minute=0),  # Run at the start of every hour
-        id='hourly_scraper',
-        name='Hourly job scraper',
+        func=run_requested_scrapes,
+        trigger=IntervalTrigger(seconds=SCRAPE_REQUEST_POLL_SECONDS),
+        id='scrape_requests',
+        name='Triggered scrapers',
         replace_existing=True
     )
+
+
+def build_scheduler(schedule=None):
+    """
+    Create the scheduler with its jobs in memory, without starting it
     
-    # Optional: Run individual scrapers at different intervals if needed
-    # Uncomment these if you want more frequent updates for specific sources
-    
-    # LinkedIn every hour (at minute 0)
-    scheduler.add_job(
-        func=lambda: run_scraper_task('linkedin'),
-        trigger=CronTrigger(minute=0),
-        id='linkedin_scraper',
-        name='LinkedIn hourly scraper',
-        replace_existing=True
-    )
+    Args:
+        schedule: source -> SourceSchedule (defaults to load_schedule())
+    """
+    scheduler = BackgroundScheduler()
+    add_jobs(scheduler, schedule or load_schedule())
+    return scheduler
+
+
+def open_scheduler(schedule=None):
+    """
+    Start the scheduler paused, on the job store in the database
     
-    # Stepstone every hour (at minute 10)
-    scheduler.add_job(
-        func=lambda: run_scraper_task('stepstone'),
-        trigger=CronTrigger(minute=10),
-        id='stepstone_scraper',
-        name='Stepstone hourly scraper',
-        replace_existing=True
-    )
+    The jobs of the previous process are restored, so a restart (or a new
+    scheduler leader) resumes their schedule instead of starting over.
     
-    # Glassdoor every hour (at minute 20)
-    scheduler.add_job(
-        func=lambda: run_scraper_task('glassdoor'),
-        trigger=CronTrigger(minute=20),
-        id='glassdoor_scraper',
-        name='Glassdoor hourly scraper',
-        replace_existing=True
+    Args:
+        schedule: source -> SourceSchedule (defaults to load_schedule())
+    """
+    schedule = schedule or load_schedule()
+    with get_app().app_context():
+        engine = db.engine
+    scheduler = BackgroundScheduler(
+        jobstores={'default': SQLAlchemyJobStore(engine=engine, tablename=JOBSTORE_TABLE)}
     )
+    scheduler.start(paused=True)
+    add_jobs(scheduler, schedule)
+    _scheduler.update(instance=scheduler, schedule=schedule)
+    # Move to the intervals the run history calls for
+    for source in schedule:
+        adapt_interval(source)
+    return scheduler
+
+
+def plan_startup(scheduler, now=None):
+    """
+    Run the sources with stale data right away: those without a completed
+    run within their current interval. The others keep their next run.
     
-    scheduler.start()
+    Returns:
+        List of the sources started
+    """
+    stale = []
+    with get_app().app_context():
+        for source in SOURCES:
+            job = scheduler.get_job(f'{source}_scraper')
+            if job is not None and check_source(source, now, job.trigger.interval_length).can_run:
+                stale.append(source)
+    for source in stale:
+        scheduler.modify_job(f'{source}_scraper', next_run_time=datetime.now(timezone.utc))
+    return stale
+
+
+def init_scheduler():
+    """Initialize and start the scheduler, scraping only the stale sources now"""
+    scheduler = open_scheduler()
+    stale = plan_startup(scheduler)
+    scheduler.resume()
     
     print("\n" + "="*60)
     print("Scheduler initialized successfully!")
     print("="*60)
+    if stale:
+        print(f"\nStale data, scraping now: {', '.join(stale)}")
+    else:
+        print("\nAll sources are fresh, no scrape on startup")
     print("\nScheduled jobs:")
     for job in scheduler.get_jobs():
-        print(f"  - {job.name} (ID: {job.id})")
+        print(f"  - {job.name} (ID: {job.id}, every {job.trigger.interval_length / 60:g} min)")
         print(f"    Next run: {job.next_run_time}")
     print("="*60 + "\n")
     
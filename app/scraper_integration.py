@@ -1,251 +1,428 @@
 """
 Scraper Integration Module
 Integrates existing scrapers with the database
+
+LinkedIn is asked for the postings of the last hour (f_TPR), widened to
+cover the whole time since its last completed run started, so a late,
+failed or less frequent run loses nothing.
+
+Settings:
+    LINKEDIN_MAX_WINDOW_SECONDS   (default 604800, the widest LinkedIn window)
 """
+import importlib
 import sys
 import os
+import threading
+import time
 from datetime import datetime
-from app.app import app
+from sqlalchemy import insert, select, update
+from app.app import get_app
 from app.models import db, Job, ScraperRun
+from app.job_keys import canonical_job_key
+from app.dedup import cluster_jobs
+from app.stats import invalidate_stats
+from app.events import bus
+from app.eligibility import record_completion
+from app.metrics import instrument_requests, record_jobs, record_run, track_persist, track_scrape
+
+SCRAPER_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def _import_scraper(directory, module):
+    """
+    Import a scraper module from its directory (Linkedin, Stepstone, Glassdoor)
+    
+    Scrapers and their dependencies (requests, BeautifulSoup) are only
+    loaded when a scraper actually runs, not when this module is imported.
+    """
+    path = os.path.join(SCRAPER_ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    scraper = importlib.import_module(module)
+    instrument_requests()
+    return scraper
+
 
-# Add parent directories to path to import scrapers
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Linkedin'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Stepstone'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Glassdoor'))
+# Scrapers of different sources run in parallel (see app/scheduler.py), but
+# SQLite has a single writer. Their write transactions take turns on this
+# lock instead of racing for the database lock: an ingest reads before it
+# writes, and a deferred transaction that loses that race fails with
+# "database is locked" instead of waiting.
+write_lock = threading.RLock()
 
+LINKEDIN_SEARCH_URL = "https://www.linkedin.com/jobs/search/?f_TPR=r{seconds}&keywords=embedded%20hardware"
+LINKEDIN_MIN_WINDOW_SECONDS = 3600
+LINKEDIN_MAX_WINDOW_SECONDS = int(os.environ.get('LINKEDIN_MAX_WINDOW_SECONDS', 7 * 86400))
+# Postings can show up in search a little after they were published
+LINKEDIN_WINDOW_MARGIN_SECONDS = 300
 
-def save_jobs_to_db(jobs_data, source):
+# Rows per IN lookup / bulk statement in the bulk ingest path.
+# Keeps every statement well below SQLite's bound-parameter limit.
+INGEST_CHUNK_SIZE = 500
+
+# Work arrangements spelled out in a location ("Berlin (Hybrid)"), for
+# scrapers that have no remote option field of their own
+REMOTE_KEYWORDS = [('remote', 'Remote'), ('hybrid', 'Hybrid'), ('home-office', 'Home-Office')]
+
+
+def _remote_option(job_data):
+    """The scraper's remote option, else one recognized in the location"""
+    if job_data.get('remote_option'):
+        return job_data['remote_option']
+    location = (job_data.get('location') or '').lower()
+    for keyword, option in REMOTE_KEYWORDS:
+        if keyword in location:
+            return option
+    return ''
+
+
+def _job_row(job_data, source, now, run_id):
+    """
+    Build a jobs table row from a standardized job dictionary
+    
+    Args:
+        job_data: Job dictionary as produced by the run_*_scraper functions
+        source: Source name ('linkedin', 'stepstone', 'glassdoor')
+        now: Timestamp used for first_seen / last_seen
+        run_id: ScraperRun id recorded as the run that first saw the job
+    
+    Returns:
+        Dictionary of Job column values
+    """
+    def field(name, max_length=None):
+        value = job_data.get(name) or ''
+        return value[:max_length] if max_length else value
+    
+    return {
+        'source': source,
+        'job_key': canonical_job_key(source, field('job_url')),
+        'job_title': field('job_title', 500),
+        'company': field('company', 500),
+        'location': field('location', 500),
+        'job_url': field('job_url', 1000),
+        'description': field('description'),
+        'salary': field('salary', 200),
+        'job_type': field('job_type', 200),
+        'remote_option': _remote_option(job_data)[:100],
+        'posted_date': field('posted_date', 200),
+        'first_seen': now,
+        'last_seen': now,
+        'first_seen_run_id': run_id  # Marks the job as new in this run
+    }
+
+
+def _upsert_jobs_one_by_one(jobs_data, source, run_id):
+    """
+    Original ingest loop: one SELECT and one ORM object per scraped job.
+    Kept for comparison with the bulk path (see bench_ingest.py).
+    
+    Returns:
+        List of ids of the newly inserted jobs
+    """
+    new_jobs = []
+    
+    for job_data in jobs_data:
+        try:
+            row = _job_row(job_data, source, datetime.utcnow(), run_id)
+            if row['job_key'] is None:
+                print(f"Skipping job without URL: {row['job_title']}")
+                continue
+            
+            # Check if job already exists (by canonical key)
+            existing_job = Job.query.filter_by(job_key=row['job_key']).first()
+            
+            if existing_job:
+                # Update last_seen timestamp
+                existing_job.last_seen = datetime.utcnow()
+            else:
+                # Create new job entry
+                new_job = Job(**row)
+                db.session.add(new_job)
+                new_jobs.append(new_job)
+            
+        except Exception as e:
+            print(f"Error saving job: {str(e)}")
+            continue
+    
+    db.session.flush()
+    return [job.id for job in new_jobs]
+
+
+def _bulk_upsert_jobs(jobs_data, source, run_id):
+    """
+    Bulk ingest: look up existing job keys with one IN query per chunk, touch
+    last_seen on those with one UPDATE, and insert the rest with a single
+    executemany INSERT.
+    
+    Returns:
+        List of ids of the newly inserted jobs
+    """
+    now = datetime.utcnow()
+    
+    # Deduplicate the batch by job key; the first occurrence wins, just like
+    # the one-by-one loop where later copies find the pending row via autoflush.
+    rows = {}
+    for job_data in jobs_data:
+        try:
+            row = _job_row(job_data, source, now, run_id)
+        except Exception as e:
+            print(f"Error saving job: {str(e)}")
+            continue
+        if row['job_key'] is None:
+            print(f"Skipping job without URL: {row['job_title']}")
+            continue
+        rows.setdefault(row['job_key'], row)
+    
+    keys = list(rows)
+    new_job_ids = []
+    
+    for start in range(0, len(keys), INGEST_CHUNK_SIZE):
+        chunk = keys[start:start + INGEST_CHUNK_SIZE]
+        
+        existing_keys = set(db.session.scalars(
+            select(Job.job_key).where(Job.job_key.in_(chunk))
+        ))
+        
+        if existing_keys:
+            db.session.execute(
+                update(Job)
+                .where(Job.job_key.in_(existing_keys))
+                .values(last_seen=now)
+                .execution_options(synchronize_session=False)
+            )
+        
+        new_rows = [rows[key] for key in chunk if key not in existing_keys]
+        if new_rows:
+            new_job_ids.extend(db.session.scalars(insert(Job).returning(Job.id), new_rows))
+    
+    return new_job_ids
+
+
+def _cluster_new_jobs(job_ids):
+    """
+    Incremental near-duplicate detection for the jobs inserted by this run.
+    Runs after the ingest is committed, in short transactions of its own, so
+    a failure never loses the ingest itself. Each chunk reads before it
+    writes, so it takes write_lock like the ingest.
+    """
+    try:
+        with write_lock:
+            joined = cluster_jobs(job_ids)
+        if joined:
+            print(f"  🔗 {joined} new jobs matched postings from other sources")
+    except Exception as e:
+        print(f"Error clustering new jobs: {str(e)}")
+
+
+def save_jobs_to_db(jobs_data, source, run_id=None, bulk=True):
     """
     Save jobs to database and track new jobs
     
+    Only the rows in this batch are written: new jobs are inserted with
+    first_seen_run_id=run_id and existing jobs get their last_seen touched.
+    Once committed, the ids of the new jobs are published on the event bus
+    (/api/stream) and the jobs are clustered with near-duplicates from other
+    sources.
+    
     Args:
         jobs_data: List of job dictionaries
         source: Source name ('linkedin', 'stepstone', 'glassdoor')
+        run_id: Id of the ScraperRun performing this ingest
+        bulk: Use the chunked bulk ingest path (default). False falls back
+              to the original per-job query loop.
     
     Returns:
         Tuple of (total_jobs, new_jobs)
     """
-    with app.app_context():
-        new_jobs_count = 0
+    with get_app().app_context():
         total_jobs = len(jobs_data)
         
-        # First, mark all existing jobs from this source as not new
-        Job.query.filter_by(source=source).update({'is_new_in_last_hour': False})
+        with track_persist(source), write_lock:
+            if bulk:
+                new_job_ids = _bulk_upsert_jobs(jobs_data, source, run_id)
+            else:
+                new_job_ids = _upsert_jobs_one_by_one(jobs_data, source, run_id)
+            
+            db.session.commit()
+        invalidate_stats()
+        record_jobs(source, total_jobs, len(new_job_ids))
         
-        for job_data in jobs_data:
-            try:
-                # Check if job already exists (by URL)
-                existing_job = Job.query.filter_by(job_url=job_data.get('job_url')).first()
-                
-                if existing_job:
-                    # Update last_seen timestamp
-                    existing_job.last_seen = datetime.utcnow()
-                    # Don't mark as new since it already existed
-                    existing_job.is_new_in_last_hour = False
-                else:
-                    # Create new job entry
-                    new_job = Job(
-                        source=source,
-                        job_title=job_data.get('job_title', '')[:500],
-                        company=job_data.get('company', '')[:500],
-                        location=job_data.get('location', '')[:500],
-                        job_url=job_data.get('job_url', '')[:1000],
-                        description=job_data.get('description', ''),
-                        salary=job_data.get('salary', '')[:200],
-                        job_type=job_data.get('job_type', '')[:200],
-                        posted_date=job_data.get('posted_date', '')[:200],
-                        first_seen=datetime.utcnow(),
-                        last_seen=datetime.utcnow(),
-                        is_new_in_last_hour=True  # Mark as new
-                    )
-                    db.session.add(new_job)
-                    new_jobs_count += 1
-                
-            except Exception as e:
-                print(f"Error saving job: {str(e)}")
-                continue
+        if new_job_ids:
+            bus.publish('jobs', {'source': source, 'run_id': run_id, 'job_ids': new_job_ids})
+            _cluster_new_jobs(new_job_ids)
         
+        return total_jobs, len(new_job_ids)
+
+
+def _start_run(source):
+    """Record a running ScraperRun for `source` (inside an app context)"""
+    scraper_run = ScraperRun(
+        source=source,
+        start_time=datetime.utcnow(),
+        status='running'
+    )
+    with write_lock:
+        db.session.add(scraper_run)
         db.session.commit()
-        return total_jobs, new_jobs_count
+    invalidate_stats()
+    return scraper_run
 
 
-def run_linkedin_scraper():
-    """Run LinkedIn scraper and save to database"""
+def _finish_run(scraper_run, total=0, new=0, error=None):
+    """Mark a ScraperRun completed (or failed with `error`) and commit"""
+    scraper_run.end_time = datetime.utcnow()
+    if error is None:
+        scraper_run.status = 'completed'
+        scraper_run.jobs_found = total
+        scraper_run.new_jobs = new
+    else:
+        scraper_run.status = 'failed'
+        scraper_run.error_message = error
+    with write_lock:
+        db.session.commit()
+    invalidate_stats()
+    record_run(scraper_run.source, scraper_run.status,
+               (scraper_run.end_time - scraper_run.start_time).total_seconds())
+    if error is None:
+        record_completion(scraper_run.source, scraper_run.end_time)
+    bus.publish('run', {'source': scraper_run.source, 'run_id': scraper_run.id,
+                        'status': scraper_run.status, 'new_jobs': scraper_run.new_jobs})
+
+
+def _run_scraper(source, name, scrape):
+    """
+    Record a ScraperRun around one scrape and save its jobs
+    
+    Args:
+        source: Source name
+        name: Display name for the log
+        scrape: Function returning the scraped jobs in the standardized format
+    
+    Returns:
+        True if the run completed
+    """
     print(f"\n{'='*50}")
-    print(f"Running LinkedIn Scraper - {datetime.now()}")
+    print(f"Running {name} Scraper - {datetime.now()}")
     print(f"{'='*50}\n")
     
-    with app.app_context():
+    with get_app().app_context():
         # Create scraper run entry
-        scraper_run = ScraperRun(
-            source='linkedin',
-            start_time=datetime.utcnow(),
-            status='running'
-        )
-        db.session.add(scraper_run)
-        db.session.commit()
+        scraper_run = _start_run(source)
         
         try:
-            from linkedin_job_scraper import LinkedInJobScraper
-            
-            # LinkedIn URL for last 1 hour jobs
-            url = "https://www.linkedin.com/jobs/search/?f_TPR=r3600&keywords=embedded%20hardware"
-            
-            scraper = LinkedInJobScraper(url)
-            scraper.scrape_jobs()
-            
-            # Convert to standardized format
-            jobs_data = []
-            for job in scraper.jobs:
-                jobs_data.append({
-                    'job_title': job.get('title', ''),
-                    'company': job.get('company', ''),
-                    'location': job.get('location', ''),
-                    'job_url': job.get('link', ''),
-                    'description': job.get('description', ''),
-                    'salary': job.get('salary', ''),
-                    'job_type': job.get('job_type', ''),
-                    'posted_date': job.get('posted_date', '')
-                })
+            with track_scrape(source) as timings:
+                jobs_data = scrape()
             
             # Save to database
-            total, new = save_jobs_to_db(jobs_data, 'linkedin')
+            persist_start = time.perf_counter()
+            total, new = save_jobs_to_db(jobs_data, source, scraper_run.id)
             
-            # Update scraper run
-            scraper_run.end_time = datetime.utcnow()
-            scraper_run.status = 'completed'
-            scraper_run.jobs_found = total
-            scraper_run.new_jobs = new
-            db.session.commit()
+            # Update scraper run (the timings are set only now, so the
+            # session has nothing to autoflush outside write_lock before)
+            scraper_run.fetch_seconds = timings.fetch_seconds
+            scraper_run.parse_seconds = timings.parse_seconds
+            scraper_run.persist_seconds = time.perf_counter() - persist_start
+            _finish_run(scraper_run, total, new)
             
-            print(f"\nLinkedIn Scraper completed: {total} jobs found, {new} new jobs")
+            print(f"\n{name} Scraper completed: {total} jobs found, {new} new jobs "
+                  f"(fetch {timings.fetch_seconds:.1f}s, parse {timings.parse_seconds:.1f}s, "
+                  f"save {scraper_run.persist_seconds:.1f}s)")
             return True
             
         except Exception as e:
-            print(f"Error running LinkedIn scraper: {str(e)}")
-            scraper_run.end_time = datetime.utcnow()
-            scraper_run.status = 'failed'
-            scraper_run.error_message = str(e)
-            db.session.commit()
+            print(f"Error running {name} scraper: {str(e)}")
+            _finish_run(scraper_run, error=str(e))
             return False
 
 
+def linkedin_window_seconds(now=None):
+    """
+    Seconds of postings to ask LinkedIn for (inside an app context): the
+    time since the last completed LinkedIn run started, at least an hour
+    """
+    now = now or datetime.utcnow()
+    last_start = db.session.query(db.func.max(ScraperRun.start_time)).filter(
+        ScraperRun.source == 'linkedin',
+        ScraperRun.status == 'completed'
+    ).scalar()
+    if last_start is None:
+        return LINKEDIN_MIN_WINDOW_SECONDS
+    seconds = (now - last_start).total_seconds() + LINKEDIN_WINDOW_MARGIN_SECONDS
+    return int(min(max(seconds, LINKEDIN_MIN_WINDOW_SECONDS), LINKEDIN_MAX_WINDOW_SECONDS))
+
+
+def run_linkedin_scraper():
+    """Run LinkedIn scraper and save to database"""
+    def scrape():
+        LinkedInJobScraper = _import_scraper('Linkedin', 'linkedin_job_scraper').LinkedInJobScraper
+        
+        # LinkedIn URL for the jobs since the last run (at least 1 hour)
+        seconds = linkedin_window_seconds()
+        print(f"LinkedIn window: last {seconds / 3600:.1f} hours")
+        url = LINKEDIN_SEARCH_URL.format(seconds=seconds)
+        
+        scraper = LinkedInJobScraper(url)
+        scraper.scrape_jobs()
+        
+        # Convert to standardized format
+        return [{
+            'job_title': job.get('title', ''),
+            'company': job.get('company', ''),
+            'location': job.get('location', ''),
+            'job_url': job.get('job_url', ''),
+            'description': job.get('description', ''),
+            'salary': job.get('salary', ''),
+            'job_type': job.get('job_type', ''),
+            'posted_date': job.get('posted_date', '')
+        } for job in scraper.jobs]
+    
+    return _run_scraper('linkedin', 'LinkedIn', scrape)
+
+
 def run_stepstone_scraper():
     """Run Stepstone scraper and save to database"""
-    print(f"\n{'='*50}")
-    print(f"Running Stepstone Scraper - {datetime.now()}")
-    print(f"{'='*50}\n")
-    
-    with app.app_context():
-        # Create scraper run entry
-        scraper_run = ScraperRun(
-            source='stepstone',
-            start_time=datetime.utcnow(),
-            status='running'
-        )
-        db.session.add(scraper_run)
-        db.session.commit()
+    def scrape():
+        StepstoneScraper = _import_scraper('Stepstone', 'stepstone_scraper').StepstoneScraper
         
-        try:
-            from stepstone_scraper import StepstoneScraper
-            
-            scraper = StepstoneScraper()
-            scraper.scrape_all_pages(max_pages=5)  # Scrape first 5 pages
-            
-            # Convert to standardized format
-            jobs_data = []
-            for job in scraper.jobs:
-                jobs_data.append({
-                    'job_title': job.get('title', ''),
-                    'company': job.get('company', ''),
-                    'location': job.get('location', ''),
-                    'job_url': job.get('url', ''),
-                    'description': job.get('description', ''),
-                    'salary': job.get('salary', ''),
-                    'job_type': job.get('employment_type', ''),
-                    'posted_date': job.get('posted_date', '')
-                })
-            
-            # Save to database
-            total, new = save_jobs_to_db(jobs_data, 'stepstone')
-            
-            # Update scraper run
-            scraper_run.end_time = datetime.utcnow()
-            scraper_run.status = 'completed'
-            scraper_run.jobs_found = total
-            scraper_run.new_jobs = new
-            db.session.commit()
-            
-            print(f"\nStepstone Scraper completed: {total} jobs found, {new} new jobs")
-            return True
-            
-        except Exception as e:
-            print(f"Error running Stepstone scraper: {str(e)}")
-            scraper_run.end_time = datetime.utcnow()
-            scraper_run.status = 'failed'
-            scraper_run.error_message = str(e)
-            db.session.commit()
-            return False
+        scraper = StepstoneScraper()
+        scraper.scrape_all_pages(max_pages=5)  # Scrape first 5 pages
+        
+        # Convert to standardized format
+        return [{
+            'job_title': job.get('title', ''),
+            'company': job.get('company', ''),
+            'location': job.get('location', ''),
+            'job_url': job.get('url', ''),
+            'description': job.get('description', ''),
+            'salary': job.get('salary', ''),
+            'job_type': job.get('employment_type', ''),
+            'remote_option': job.get('remote_option', ''),
+            'posted_date': job.get('posted_date', '')
+        } for job in scraper.jobs]
+    
+    return _run_scraper('stepstone', 'Stepstone', scrape)
 
 
 def run_glassdoor_scraper():
     """Run Glassdoor scraper and save to database"""
-    print(f"\n{'='*50}")
-    print(f"Running Glassdoor Scraper - {datetime.now()}")
-    print(f"{'='*50}\n")
-    
-    with app.app_context():
-        # Create scraper run entry
-        scraper_run = ScraperRun(
-            source='glassdoor',
-            start_time=datetime.utcnow(),
-            status='running'
-        )
-        db.session.add(scraper_run)
-        db.session.commit()
+    def scrape():
+        scrape_glassdoor_jobs = _import_scraper('Glassdoor', 'glassdoor_scraper').scrape_glassdoor_jobs
         
-        try:
-            from glassdoor_scraper import scrape_glassdoor_jobs
-            
-            # Glassdoor URL for embedded hardware jobs in last 24 hours
-            url = "https://www.glassdoor.de/Job/embedded-hardware-jobs-SRCH_KO0,17.htm?fromAge=1"
-            
-            jobs = scrape_glassdoor_jobs(url)
-            
-            # Jobs are already in correct format
-            jobs_data = []
-            for job in jobs:
-                jobs_data.append({
-                    'job_title': job.get('title', ''),
-                    'company': job.get('company', ''),
-                    'location': job.get('location', ''),
-                    'job_url': job.get('url', ''),
-                    'description': job.get('description', ''),
-                    'salary': job.get('salary', ''),
-                    'job_type': job.get('job_type', ''),
-                    'posted_date': job.get('posted_date', '')
-                })
-            
-            # Save to database
-            total, new = save_jobs_to_db(jobs_data, 'glassdoor')
-            
-            # Update scraper run
-            scraper_run.end_time = datetime.utcnow()
-            scraper_run.status = 'completed'
-            scraper_run.jobs_found = total
-            scraper_run.new_jobs = new
-            db.session.commit()
-            
-            print(f"\nGlassdoor Scraper completed: {total} jobs found, {new} new jobs")
-            return True
-            
-        except Exception as e:
-            print(f"Error running Glassdoor scraper: {str(e)}")
-            scraper_run.end_time = datetime.utcnow()
-            scraper_run.status = 'failed'
-            scraper_run.error_message = str(e)
-            db.session.commit()
-            return False
+        # Glassdoor URL for embedded hardware jobs in last 24 hours
+        url = "https://www.glassdoor.de/Job/embedded-hardware-jobs-SRCH_KO0,17.htm?fromAge=1"
+        
+        return [{
+            'job_title': job.get('title', ''),
+            'company': job.get('company', ''),
+            'location': job.get('location', ''),
+            'job_url': job.get('url', ''),
+            'description': job.get('description', ''),
+            'salary': job.get('salary', ''),
+            'job_type': job.get('job_type', ''),
+            'posted_date': job.get('posted_date', '')
+        } for job in scrape_glassdoor_jobs(url)]
+    
+    return _run_scraper('glassdoor', 'Glassdoor', scrape)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,161 @@
+"""
+Full-text search over collected jobs
+An FTS5 index (jobs_fts) over job titles, companies and descriptions, kept
+in sync with the jobs table by triggers. It is created together with the
+jobs table (db.create_all) and by migration 6 for existing databases.
+"""
+import html
+import re
+
+from sqlalchemy import event, text
+
+from app.models import db, Job
+
+# External-content index: the text lives in jobs only, jobs_fts stores the
+# inverted index. remove_diacritics folds "München" and "Munchen" together.
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        job_title, company, description,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, job_title, company, description)
+        VALUES (new.id, new.job_title, new.company, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company, description)
+        VALUES ('delete', old.id, old.job_title, old.company, old.description);
+    END
+    """,
+    # Only changes to indexed columns touch the index, so the last_seen
+    # update of every re-scraped job stays cheap
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update
+    AFTER UPDATE OF job_title, company, description ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company, description)
+        VALUES ('delete', old.id, old.job_title, old.company, old.description);
+        INSERT INTO jobs_fts (rowid, job_title, company, description)
+        VALUES (new.id, new.job_title, new.company, new.description);
+    END
+    """,
+]
+
+# bm25() column weights: a hit in the title counts most
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+SNIPPET_TOKENS = 16
+MAX_PER_PAGE = 100
+
+# Placeholders for the highlight markers, replaced after HTML-escaping
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+
+def create_search_index(conn):
+    """Create jobs_fts and its sync triggers (idempotent)"""
+    for ddl in SEARCH_INDEX_DDL:
+        conn.exec_driver_sql(ddl)
+
+
+def rebuild_search_index(conn):
+    """Re-index every row of jobs, e.g. after creating the index on old data"""
+    conn.exec_driver_sql("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
+
+@event.listens_for(Job.__table__, 'after_create')
+def _create_with_jobs_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        create_search_index(connection)
+
+
+@event.listens_for(Job.__table__, 'before_drop')
+def _drop_with_jobs_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS jobs_fts')
+
+
+def build_match_query(query):
+    """
+    Turn user input into an FTS5 MATCH expression
+
+    Every whitespace-separated term is quoted, so input like "C++" or
+    "STM32-H7" never raises an FTS5 syntax error; all terms must match.
+    A trailing '*' keeps prefix search ("embed*").
+
+    Returns:
+        MATCH expression, or None when the input has no terms
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*').replace('"', '""')
+        if re.search(r'\w', term):
+            terms.append(f'"{term}"' + ('*' if prefix else ''))
+    return ' '.join(terms) or None
+
+
+def _highlight(snippet):
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_jobs(query, source=None, page=1, per_page=20):
+    """
+    Rank jobs matching `query` with BM25
+
+    Must run inside an application context.
+
+    Args:
+        query: Search terms as typed by the user
+        source: Optional source filter
+        page: 1-based page number
+        per_page: Results per page (at most MAX_PER_PAGE)
+
+    Returns:
+        Tuple of (total_matches, list of result dictionaries). Each result
+        has an HTML-escaped 'snippet' with <mark> around the matched terms.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return 0, []
+
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    params = {
+        'match': match,
+        'source': source,
+        'limit': per_page,
+        'offset': (max(page, 1) - 1) * per_page,
+    }
+    source_filter = 'AND jobs.source = :source' if source else ''
+
+    total = db.session.execute(text(f"""
+        SELECT count(*) FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH :match {source_filter}
+    """), params).scalar()
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    rows = db.session.execute(text(f"""
+        SELECT jobs.id, jobs.source, jobs.job_title, jobs.company, jobs.location,
+               jobs.job_url, jobs.posted_date, jobs.first_seen, jobs.cluster_id,
+               snippet(jobs_fts, -1, '{_MARK_START}', '{_MARK_END}', '…',
+                       {SNIPPET_TOKENS}) AS snippet,
+               bm25(jobs_fts, {weights}) AS rank
+        FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH :match {source_filter}
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """), params).mappings().all()
+
+    results = []
+    for row in rows:
+        result = dict(row)
+        result['snippet'] = _highlight(row['snippet'])
+        # Raw SQL returns SQLite's text timestamp; match to_dict's isoformat
+        result['first_seen'] = row['first_seen'].replace(' ', 'T') if row['first_seen'] else None
+        results.append(result)
+    return total, results
@@ -0,0 +1,91 @@
+"""
+Fast read path for the list endpoints
+Job and scraper run listings select plain column tuples with SQLAlchemy
+Core instead of hydrating ORM objects, and are encoded with orjson when it
+is installed (stdlib json otherwise). The JSON has the same keys and values
+as Job.to_dict() / ScraperRun.to_dict() through jsonify: sorted keys and
+ISO 8601 timestamps.
+
+See bench_serialize.py for the throughput of both paths.
+"""
+import json
+from datetime import datetime
+
+from flask import current_app
+
+from app.models import Job, ScraperRun
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Keys of Job.to_dict(); 'is_new_in_last_hour' is derived, not a column
+JOB_FIELDS = ['id', 'source', 'job_title', 'company', 'location', 'job_url',
+              'description', 'salary', 'job_type', 'remote_option', 'posted_date',
+              'first_seen', 'last_seen', 'is_new_in_last_hour', 'cluster_id']
+
+RUN_FIELDS = ['id', 'source', 'start_time', 'end_time', 'status', 'jobs_found',
+              'new_jobs', 'error_message', 'fetch_seconds', 'parse_seconds',
+              'persist_seconds']
+
+# Columns every job query needs for is_new_in_last_hour
+_JOB_BASE_COLUMNS = {'source', 'first_seen_run_id'}
+
+
+def job_columns(fields=JOB_FIELDS, extra=()):
+    """Job columns to select for `fields`, plus the ones named in `extra`"""
+    wanted = set(fields) | _JOB_BASE_COLUMNS | set(extra)
+    return [
+        Job.__table__.c[name] for name in JOB_FIELDS + ['first_seen_run_id']
+        if name in wanted and name != 'is_new_in_last_hour'
+    ]
+
+
+def job_dicts(rows, latest_run_ids, fields=JOB_FIELDS):
+    """
+    Build Job.to_dict()-shaped dictionaries from rows of job_columns()
+
+    Datetimes are left as they are; dumps() encodes them as ISO 8601.
+    """
+    columns = [field for field in fields if field != 'is_new_in_last_hour']
+    derive_new = 'is_new_in_last_hour' in fields
+    jobs = []
+    for row in rows:
+        values = row._mapping
+        job = {field: values[field] for field in columns}
+        if derive_new:
+            run_id = values['first_seen_run_id']
+            job['is_new_in_last_hour'] = (run_id is not None and
+                                          run_id == latest_run_ids.get(values['source']))
+        jobs.append(job)
+    return jobs
+
+
+def run_columns():
+    return [ScraperRun.__table__.c[name] for name in RUN_FIELDS]
+
+
+def run_dicts(rows):
+    """Build ScraperRun.to_dict()-shaped dictionaries from rows of run_columns()"""
+    return [dict(row._mapping) for row in rows]
+
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Encode `payload` as JSON bytes with sorted keys, like jsonify"""
+    if orjson is not None:
+        # orjson writes naive datetimes exactly like isoformat()
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, default=_encode_default, sort_keys=True,
+                       separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """jsonify() replacement for payloads built from Core rows"""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
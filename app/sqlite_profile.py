@@ -0,0 +1,78 @@
+"""
+SQLite engine profile
+Connection-level PRAGMAs and pool settings so that API reads and scraper
+writes can share one database file without blocking each other.
+
+Every setting can be overridden through environment variables:
+    SQLITE_JOURNAL_MODE     (default WAL)
+    SQLITE_SYNCHRONOUS      (default NORMAL)
+    SQLITE_BUSY_TIMEOUT_MS  (default 30000)
+    SQLITE_MMAP_SIZE        (bytes, default 256 MiB)
+    SQLITE_CACHE_SIZE       (pages, or KiB when negative; default -65536 = 64 MiB)
+    SQLITE_POOL_SIZE        (default 10)
+    SQLITE_MAX_OVERFLOW     (default 20)
+    SQLITE_POOL_TIMEOUT     (seconds, default 30)
+"""
+import os
+from sqlalchemy import event
+
+# PRAGMA name -> (environment variable, default)
+SQLITE_PRAGMA_SETTINGS = {
+    # Readers never block the writer and the writer never blocks readers
+    'journal_mode': ('SQLITE_JOURNAL_MODE', 'WAL'),
+    # Safe with WAL; only the last transactions may roll back on power loss
+    'synchronous': ('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    # Wait for a competing writer instead of failing with "database is locked"
+    'busy_timeout': ('SQLITE_BUSY_TIMEOUT_MS', '30000'),
+    'mmap_size': ('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    'cache_size': ('SQLITE_CACHE_SIZE', '-65536'),
+}
+
+
+def sqlite_pragmas_from_env():
+    """
+    Build the PRAGMA profile from the environment
+
+    Returns:
+        Dictionary of PRAGMA name -> value
+    """
+    return {
+        name: os.environ.get(env_var, default)
+        for name, (env_var, default) in SQLITE_PRAGMA_SETTINGS.items()
+    }
+
+
+def sqlite_engine_options():
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for the shared SQLite file
+
+    Returns:
+        Dictionary suitable for app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    """
+    return {
+        # One connection per API thread plus the scraper threads
+        'pool_size': int(os.environ.get('SQLITE_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('SQLITE_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('SQLITE_POOL_TIMEOUT', 30)),
+    }
+
+
+def apply_sqlite_profile(engine, pragmas):
+    """
+    Run the PRAGMA profile on every new DBAPI connection of `engine`
+
+    Args:
+        engine: SQLAlchemy engine bound to a SQLite database
+        pragmas: Dictionary of PRAGMA name -> value
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,111 @@
+"""
+Dashboard statistics
+/api/stats is polled by every open dashboard. The numbers come from two
+queries (one grouped aggregate over jobs, one over scraper runs) and are
+kept in an in-process cache that is dropped whenever a scraper run starts
+or finishes. A short TTL bounds the drift of the rolling last-hour count.
+
+Settings:
+    STATS_CACHE_SECONDS     (default 30)
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, union_all
+
+from app.models import db, Job, ScraperRun
+
+SOURCES = ['linkedin', 'stepstone', 'glassdoor']
+
+STATS_CACHE_SECONDS = float(os.environ.get('STATS_CACHE_SECONDS', 30))
+
+_cache = {'stats': None, 'expires': 0.0}
+_cache_lock = threading.Lock()
+
+
+def _job_counts(since):
+    """Total and first-seen-since counts per source (covering index scan)"""
+    rows = db.session.execute(
+        select(
+            Job.source,
+            func.count(),
+            func.coalesce(func.sum(Job.first_seen >= since), 0)
+        ).group_by(Job.source)
+    ).all()
+    return {source: (total, recent) for source, total, recent in rows}
+
+
+def _last_runs():
+    """
+    Latest run and latest completed run of every source, in one query
+
+    Returns:
+        Dictionary of source -> (latest run, latest completed run)
+    """
+    # With max() in the query, SQLite takes bare columns from the max row
+    latest_started = select(ScraperRun.id).group_by(ScraperRun.source).having(
+        ScraperRun.start_time == func.max(ScraperRun.start_time)
+    )
+    latest_completed = select(func.max(ScraperRun.id)).where(
+        ScraperRun.status == 'completed'
+    ).group_by(ScraperRun.source)
+    run_ids = union_all(latest_started, latest_completed)
+
+    runs = ScraperRun.query.filter(ScraperRun.id.in_(run_ids)).all()
+
+    last_runs = {}
+    for run in runs:
+        latest, completed = last_runs.get(run.source, (None, None))
+        if latest is None or (run.start_time, run.id) > (latest.start_time, latest.id):
+            latest = run
+        if run.status == 'completed' and (completed is None or run.id > completed.id):
+            completed = run
+        last_runs[run.source] = (latest, completed)
+    return last_runs
+
+
+def compute_stats():
+    """
+    Build the /api/stats payload
+
+    '<source>_last_hour' is the number of jobs first seen by the latest
+    completed run of the source, which that run recorded as new_jobs.
+    """
+    now = datetime.utcnow()
+    counts = _job_counts(now - timedelta(hours=1))
+    last_runs = _last_runs()
+
+    stats = {
+        'total_jobs': sum(total for total, _ in counts.values()),
+        'new_jobs_last_hour': sum(recent for _, recent in counts.values()),
+    }
+    for source in SOURCES:
+        latest, completed = last_runs.get(source, (None, None))
+        stats[f'{source}_jobs'] = counts.get(source, (0, 0))[0]
+        stats[f'{source}_last_hour'] = (completed.new_jobs or 0) if completed else 0
+    stats['last_runs'] = {
+        source: last_runs[source][0].to_dict() if source in last_runs else None
+        for source in SOURCES
+    }
+    stats['last_updated'] = now.isoformat()
+    return stats
+
+
+def get_stats():
+    """
+    Return the cached /api/stats payload, recomputing it when stale.
+    Must run inside an application context.
+    """
+    with _cache_lock:
+        if _cache['stats'] is None or time.monotonic() >= _cache['expires']:
+            _cache['stats'] = compute_stats()
+            _cache['expires'] = time.monotonic() + STATS_CACHE_SECONDS
+        return _cache['stats']
+
+
+def invalidate_stats():
+    """Drop the cached payload, e.g. when a scraper run starts or finishes"""
+    with _cache_lock:
+        _cache['stats'] = None
@@ -0,0 +1,182 @@
+"""
+Posting volume over time
+job_rollups counts new jobs per source and hour (first_seen, UTC), in
+total and per company and per location. Triggers on jobs keep it current
+in the same transaction that inserts or deletes the jobs, so /api/trends
+reads a few rollup rows per hour instead of the job history.
+
+Settings:
+    TRENDS_MAX_DAYS     (default 365)
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import column, event, func, select, table
+
+from app.models import db, Job
+
+SOURCES = ['linkedin', 'stepstone', 'glassdoor']
+
+TRENDS_MAX_DAYS = int(os.environ.get('TRENDS_MAX_DAYS', 365))
+
+# '' / '' rows hold the totals of a source and hour
+ROLLUP_DIMENSIONS = ['', 'company', 'location']
+
+# Length of the prefix of the hour key that identifies a bucket
+BUCKETS = {
+    'hour': 13,  # 2025-11-11T16
+    'day': 10,   # 2025-11-11
+}
+
+_HOUR = "strftime('%Y-%m-%dT%H:00:00', {row}.first_seen)"
+
+
+def _rollup_triggers():
+    def value(dimension, row):
+        return f"coalesce({row}.{dimension}, '')" if dimension else "''"
+
+    def increment(dimension):
+        return f"""
+        INSERT INTO job_rollups (dimension, value, source, hour, new_jobs)
+        SELECT '{dimension}', {value(dimension, 'new')}, new.source, {_HOUR.format(row='new')}, 1
+        WHERE true
+        ON CONFLICT (dimension, value, source, hour) DO UPDATE SET new_jobs = new_jobs + 1;
+        """
+
+    def decrement(dimension):
+        return f"""
+        UPDATE job_rollups SET new_jobs = new_jobs - 1
+        WHERE dimension = '{dimension}' AND value = {value(dimension, 'old')}
+          AND source = old.source AND hour = {_HOUR.format(row='old')};
+        """
+
+    cleanup = 'DELETE FROM job_rollups WHERE new_jobs <= 0;'
+    increments = ''.join(increment(dimension) for dimension in ROLLUP_DIMENSIONS)
+    decrements = ''.join(decrement(dimension) for dimension in ROLLUP_DIMENSIONS)
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS job_rollups_insert AFTER INSERT ON jobs BEGIN'
+        f'{increments} END',
+        f'CREATE TRIGGER IF NOT EXISTS job_rollups_delete AFTER DELETE ON jobs BEGIN'
+        f'{decrements} {cleanup} END',
+        'CREATE TRIGGER IF NOT EXISTS job_rollups_update '
+        'AFTER UPDATE OF source, first_seen, company, location ON jobs BEGIN'
+        f'{decrements}{increments} {cleanup} END',
+    ]
+
+
+ROLLUP_DDL = [
+    # Primary key order serves /api/trends: one range read per series
+    """
+    CREATE TABLE IF NOT EXISTS job_rollups (
+        dimension VARCHAR(20) NOT NULL,
+        value VARCHAR(500) NOT NULL,
+        source VARCHAR(50) NOT NULL,
+        hour VARCHAR(19) NOT NULL,
+        new_jobs INTEGER NOT NULL,
+        PRIMARY KEY (dimension, value, source, hour)
+    ) WITHOUT ROWID
+    """,
+] + _rollup_triggers()
+
+job_rollups = table(
+    'job_rollups', column('dimension'), column('value'), column('source'),
+    column('hour'), column('new_jobs')
+)
+
+
+def create_rollups(conn):
+    """Create job_rollups and its sync triggers (idempotent)"""
+    for ddl in ROLLUP_DDL:
+        conn.exec_driver_sql(ddl)
+
+
+def rebuild_rollups(conn):
+    """Recount job_rollups from jobs, e.g. after creating it on old data"""
+    conn.exec_driver_sql('DELETE FROM job_rollups')
+    hour = _HOUR.format(row='jobs')
+    for dimension in ROLLUP_DIMENSIONS:
+        value = f"coalesce({dimension}, '')" if dimension else "''"
+        conn.exec_driver_sql(f"""
+            INSERT INTO job_rollups (dimension, value, source, hour, new_jobs)
+            SELECT '{dimension}', {value}, source, {hour}, count(*) FROM jobs
+            GROUP BY {value}, source, {hour}
+        """)
+
+
+@event.listens_for(Job.__table__, 'after_create')
+def _create_with_jobs_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        create_rollups(connection)
+
+
+@event.listens_for(Job.__table__, 'before_drop')
+def _drop_with_jobs_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS job_rollups')
+
+
+def _bucket_starts(since, until, bucket):
+    step = timedelta(hours=1) if bucket == 'hour' else timedelta(days=1)
+    start = since.replace(minute=0, second=0, microsecond=0)
+    if bucket == 'day':
+        start = start.replace(hour=0)
+    while start <= until:
+        yield start.isoformat()[:BUCKETS[bucket]]
+        start += step
+
+
+def get_trends(days=30, bucket='day', sources=None, company=None, location=None, now=None):
+    """
+    New jobs per source and hour or day over the last `days` days
+
+    Must run inside an application context. Only job_rollups is read.
+
+    Args:
+        days: Length of the window, 1 to TRENDS_MAX_DAYS
+        bucket: 'hour' or 'day'
+        sources: Sources to include (default: all)
+        company, location: Only count jobs of this company / location
+                           (at most one of them)
+
+    Returns:
+        Dictionary with the window and one list of {'start', 'new_jobs'}
+        per source, zeros included, oldest bucket first
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Invalid bucket '{bucket}'")
+    if not 1 <= days <= TRENDS_MAX_DAYS:
+        raise ValueError(f'days must be between 1 and {TRENDS_MAX_DAYS}')
+    if company and location:
+        raise ValueError('Filter by company or by location, not both')
+    sources = sources or SOURCES
+    if company:
+        dimension, value = 'company', company
+    elif location:
+        dimension, value = 'location', location
+    else:
+        dimension, value = '', ''
+
+    now = now or datetime.utcnow()
+    since = now - timedelta(days=days)
+    start = func.substr(job_rollups.c.hour, 1, BUCKETS[bucket])
+    rows = db.session.execute(
+        select(job_rollups.c.source, start, func.sum(job_rollups.c.new_jobs))
+        .where(job_rollups.c.dimension == dimension, job_rollups.c.value == value,
+               job_rollups.c.source.in_(sources),
+               job_rollups.c.hour >= since.strftime('%Y-%m-%dT%H:00:00'))
+        .group_by(job_rollups.c.source, start)
+    ).all()
+    counts = {(source, bucket_start): total for source, bucket_start, total in rows}
+
+    starts = list(_bucket_starts(since, now, bucket))
+    return {
+        'bucket': bucket,
+        'since': since.isoformat(),
+        'until': now.isoformat(),
+        'series': {
+            source: [{'start': bucket_start + (':00:00' if bucket == 'hour' else ''),
+                      'new_jobs': counts.get((source, bucket_start), 0)}
+                     for bucket_start in starts]
+            for source in sources
+        },
+    }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for save_jobs_to_db
+Compares the bulk ingest path against the original one-query-per-job loop
+on synthetic job batches.
+
+Usage:
+    python bench_ingest.py                  # 10k and 100k jobs
+    python bench_ingest.py --sizes 1000 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Point the app at a throwaway database before it is imported
+BENCH_DIR = tempfile.mkdtemp(prefix='job_hunter_bench_')
+os.environ['DATABASE_PATH'] = os.path.join(BENCH_DIR, 'bench.db')
+
+from app.app import app
+from app.models import db, Job
+from app.scraper_integration import save_jobs_to_db
+
+
+def make_jobs(count, offset=0):
+    """Generate synthetic scraped jobs with unique URLs"""
+    return [
+        {
+            'job_title': f'Embedded Hardware Engineer {i}',
+            'company': f'Company {i % 500}',
+            'location': f'City {i % 50}',
+            'job_url': f'https://www.example.com/jobs/view/{i}',
+            'description': 'Design and bring-up of embedded boards. ' * 10,
+            'salary': '',
+            'job_type': 'Full-time',
+            'posted_date': '2025-11-11'
+        }
+        for i in range(offset, offset + count)
+    ]
+
+
+def reset_db():
+    """Start every measurement from an empty schema"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def time_ingest(jobs, bulk):
+    start = time.perf_counter()
+    total, new = save_jobs_to_db(jobs, 'linkedin', bulk=bulk)
+    return time.perf_counter() - start, total, new
+
+
+def bench(size, bulk):
+    """
+    Two passes per mode: a cold ingest of `size` new jobs, then a re-scrape
+    where half the batch already exists.
+    """
+    reset_db()
+    first = make_jobs(size)
+    second = make_jobs(size, offset=size // 2)
+
+    cold, total, new = time_ingest(first, bulk)
+    assert (total, new) == (size, size), (total, new)
+
+    warm, total, new = time_ingest(second, bulk)
+    assert (total, new) == (size, size - size // 2), (total, new)
+
+    with app.app_context():
+        assert Job.query.count() == size + size // 2
+
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("save_jobs_to_db benchmark")
+    print("=" * 60)
+    print(f"{'jobs':>8}  {'mode':<6} {'cold (s)':>10} {'rescrape (s)':>13} {'jobs/s':>10}")
+
+    for size in args.sizes:
+        results = {}
+        for mode, bulk in (('loop', False), ('bulk', True)):
+            cold, warm = bench(size, bulk)
+            results[mode] = cold + warm
+            rate = size * 2 / (cold + warm)
+            print(f"{size:>8}  {mode:<6} {cold:>10.2f} {warm:>13.2f} {rate:>10.0f}")
+        print(f"{'':>8}  speedup: {results['loop'] / results['bulk']:.1f}x")
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
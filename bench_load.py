@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Load test: Flask development server vs. gunicorn
+Starts each server on a seeded throwaway database (scheduler disabled) and
+measures requests per second of concurrent clients polling the dashboard
+endpoints.
+
+Usage:
+    python bench_load.py                        # 16 clients, 10 s per server
+    python bench_load.py --clients 32 --seconds 20 --workers 4
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = tempfile.mkdtemp(prefix='job_hunter_bench_')
+DATABASE_PATH = os.path.join(BENCH_DIR, 'bench.db')
+
+URLS = ['/api/stats', '/api/jobs/linkedin', '/api/jobs/all?limit=50',
+        '/api/scraper/status', '/api/scraper/can-run']
+
+DEV_SERVER = """
+import sys
+from app.app import app
+app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True, use_reloader=False)
+"""
+
+
+def seed_database(jobs=3000):
+    os.environ['DATABASE_PATH'] = DATABASE_PATH
+    from sqlalchemy import insert
+    from app.app import app
+    from app.models import db, Job, ScraperRun
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        now = datetime.utcnow()
+        runs = []
+        for source in ('linkedin', 'stepstone', 'glassdoor'):
+            run = ScraperRun(source=source, start_time=now - timedelta(minutes=5),
+                             end_time=now, status='completed', jobs_found=jobs // 3)
+            db.session.add(run)
+            runs.append(run)
+        db.session.commit()
+        db.session.execute(insert(Job), [{
+            'source': runs[i % 3].source,
+            'job_title': f'Embedded Software Engineer {i}',
+            'company': f'Company {i % 200}',
+            'location': 'Munich',
+            'job_url': f'https://example.com/jobs/{i}',
+            'job_key': f'{runs[i % 3].source}:{i}',
+            'description': 'Firmware for STM32 and Zephyr RTOS. ' * 10,
+            'first_seen': now - timedelta(seconds=i),
+            'last_seen': now,
+            'first_seen_run_id': runs[i % 3].id if i < 150 else None,
+        } for i in range(jobs)])
+        db.session.commit()
+
+
+def start_server(kind, port, workers):
+    env = dict(os.environ, DATABASE_PATH=DATABASE_PATH, SCHEDULER_ENABLED='0',
+               WEB_CONCURRENCY=str(workers), BIND=f'127.0.0.1:{port}')
+    if kind == 'dev':
+        command = [sys.executable, '-c', DEV_SERVER, str(port)]
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                   '--access-logfile', '/dev/null', 'wsgi:app']
+    server = subprocess.Popen(command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/stats', timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+def run_load(port, clients, seconds):
+    """Requests per second and error count of `clients` polling threads"""
+    counts, errors = [0] * clients, [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        session = requests.Session()
+        i = index
+        while time.perf_counter() < deadline:
+            response = session.get(f'http://127.0.0.1:{port}{URLS[i % len(URLS)]}',
+                                   headers={'Accept-Encoding': 'gzip'})
+            if response.status_code == 200:
+                counts[index] += 1
+            else:
+                errors[index] += 1
+            i += 1
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start), sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() * 2 + 1, 8))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Load test")
+    print("=" * 60)
+    print(f"{args.clients} clients, {args.seconds:.0f} s per server, {os.cpu_count()} CPUs")
+    seed_database()
+
+    results = {}
+    for kind, port in (('dev', 5101), ('gunicorn', 5102)):
+        server = start_server(kind, port, args.workers)
+        try:
+            run_load(port, args.clients, 1)  # warm up
+            results[kind] = run_load(port, args.clients, args.seconds)
+        finally:
+            server.terminate()
+            server.wait()
+        label = 'flask dev server' if kind == 'dev' else f'gunicorn ({args.workers} workers)'
+        rps, errors = results[kind]
+        print(f"{label:<24} {rps:>8.0f} req/s  ({errors} errors)")
+
+    print(f"speedup: {results['gunicorn'][0] / results['dev'][0]:.1f}x")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark for /api/search
+Compares the FTS5 index against a LIKE '%term%' scan over titles, companies
+and descriptions on a synthetic job table.
+
+Usage:
+    python bench_search.py                  # 100k jobs
+    python bench_search.py --size 10000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Point the app at a throwaway database before it is imported
+BENCH_DIR = tempfile.mkdtemp(prefix='job_hunter_bench_')
+os.environ['DATABASE_PATH'] = os.path.join(BENCH_DIR, 'bench.db')
+
+from sqlalchemy import insert, or_
+
+from app.app import app
+from app.models import db, Job
+from app.search import search_jobs
+
+TERMS = ['FPGA', 'STM32', 'Zephyr', 'Yocto', 'Verilog']
+
+WORDS = ('embedded firmware hardware board bring-up drivers linux rtos testing '
+         'schematic layout signal integrity microcontroller automotive safety '
+         'power electronics sensors protocol debugging validation').split()
+
+
+def make_rows(count, seed=42):
+    """Synthetic jobs; every search term appears in a small share of rows"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        words = rng.choices(WORDS, k=60)
+        if i % 50 == 0:
+            words.insert(rng.randrange(60), rng.choice(TERMS))
+        rows.append({
+            'source': ('linkedin', 'stepstone', 'glassdoor')[i % 3],
+            'job_title': f'{rng.choice(WORDS).title()} Engineer',
+            'company': f'Company {i % 700}',
+            'location': 'Munich',
+            'job_url': f'https://www.example.com/jobs/view/{i}',
+            'job_key': f'linkedin:{i}',
+            'description': ' '.join(words),
+        })
+    return rows
+
+
+def seed_database(size):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        rows = make_rows(size)
+        for start in range(0, size, 5000):
+            db.session.execute(insert(Job), rows[start:start + 5000])
+        db.session.commit()
+
+
+def like_search(term, limit=20):
+    pattern = f'%{term}%'
+    query = Job.query.filter(or_(
+        Job.job_title.like(pattern), Job.company.like(pattern), Job.description.like(pattern)
+    ))
+    return query.count(), query.order_by(Job.first_seen.desc()).limit(limit).all()
+
+
+def fts_search(term, limit=20):
+    return search_jobs(term, per_page=limit)
+
+
+def time_search(search, repeat):
+    """Average seconds per query over all TERMS"""
+    with app.app_context():
+        counts = {term: search(term)[0] for term in TERMS}  # warm up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for term in TERMS:
+                search(term)
+        elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(TERMS)), counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Search benchmark")
+    print("=" * 60)
+    print(f"Seeding {args.size} jobs...")
+    seed_database(args.size)
+
+    like, like_counts = time_search(like_search, args.repeat)
+    fts, fts_counts = time_search(fts_search, args.repeat)
+    # LIKE also matches substrings (e.g. 'FPGA' in 'FPGAs'), FTS whole tokens
+    print(f"{'matches':<10} LIKE {like_counts}")
+    print(f"{'':<10} FTS5 {fts_counts}")
+
+    print(f"{'mode':<6} {'ms/query':>10}")
+    print(f"{'like':<6} {like * 1000:>10.2f}")
+    print(f"{'fts5':<6} {fts * 1000:>10.2f}")
+    print(f"speedup: {like / fts:.1f}x")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
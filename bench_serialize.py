@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the list endpoint read path
+Compares loading and encoding job rows as ORM objects (to_dict + jsonify)
+against Core column tuples encoded with stdlib json and with orjson.
+
+Usage:
+    python bench_serialize.py                   # 1k and 10k rows
+    python bench_serialize.py --sizes 50000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before it is imported
+BENCH_DIR = tempfile.mkdtemp(prefix='job_hunter_bench_')
+os.environ['DATABASE_PATH'] = os.path.join(BENCH_DIR, 'bench.db')
+
+from flask import jsonify
+from sqlalchemy import insert
+
+from app import serialization
+from app.app import app
+from app.models import db, Job, ScraperRun
+from app.serialization import job_columns, job_dicts, json_response
+
+
+def seed_database(size):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        now = datetime.utcnow()
+        rows = [{
+            'source': ('linkedin', 'stepstone', 'glassdoor')[i % 3],
+            'job_title': f'Embedded Software Engineer {i} (m/w/d)',
+            'company': f'Company {i % 700} GmbH',
+            'location': 'Munich, Bavaria, Germany',
+            'job_url': f'https://www.example.com/jobs/view/{i}',
+            'job_key': f'linkedin:{i}',
+            'description': 'Firmware for STM32 and Zephyr RTOS. ' * 20,
+            'salary': '70.000 € - 85.000 €',
+            'job_type': 'Full-time',
+            'posted_date': '1 hour ago',
+            'first_seen': now - timedelta(seconds=i),
+            'last_seen': now,
+        } for i in range(size)]
+        for start in range(0, size, 5000):
+            db.session.execute(insert(Job), rows[start:start + 5000])
+        db.session.commit()
+
+
+def orm_path(size):
+    latest_run_ids = ScraperRun.latest_completed_ids()
+    jobs = Job.query.order_by(Job.first_seen.desc()).limit(size).all()
+    return jsonify({'count': len(jobs), 'jobs': [job.to_dict(latest_run_ids) for job in jobs]})
+
+
+def core_path(size):
+    latest_run_ids = ScraperRun.latest_completed_ids()
+    rows = db.session.execute(
+        db.select(*job_columns()).order_by(Job.first_seen.desc()).limit(size)
+    ).all()
+    jobs = job_dicts(rows, latest_run_ids)
+    return json_response({'count': len(jobs), 'jobs': jobs})
+
+
+def time_path(path, size, repeat):
+    """Best seconds per call over `repeat` runs, each with a fresh session"""
+    best = None
+    for _ in range(repeat + 1):  # the first call warms up
+        with app.test_request_context():
+            start = time.perf_counter()
+            body = path(size).get_data()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    orjson = serialization.orjson
+
+    print("=" * 60)
+    print("Serialization benchmark")
+    print("=" * 60)
+    print(f"{'rows':>7} {'path':<12} {'ms':>9} {'rows/s':>10} {'bytes':>10}")
+    for size in args.sizes:
+        seed_database(size)
+        paths = [('orm+jsonify', orm_path, orjson), ('core+json', core_path, None)]
+        if orjson is not None:
+            paths.append(('core+orjson', core_path, orjson))
+        baseline = None
+        for name, path, encoder in paths:
+            serialization.orjson = encoder
+            seconds, size_bytes = time_path(path, size, args.repeat)
+            baseline = baseline or seconds
+            print(f"{size:>7} {name:<12} {seconds * 1000:>9.1f} {size / seconds:>10.0f} "
+                  f"{size_bytes:>10}  ({baseline / seconds:.1f}x)")
+        serialization.orjson = orjson
+    if orjson is None:
+        print("orjson is not installed; only the stdlib encoder was measured")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Imports each entry module in a fresh interpreter with `python -X importtime`
+and reports its cumulative import time, the wall time of the process and
+which heavy dependencies it pulled in. create_app() is timed separately on
+a new and on an already migrated database.
+
+Usage:
+    python bench_startup.py                 # 5 runs per module, best time
+    python bench_startup.py --runs 10 --budget-ms 400
+        (exits with status 1 if importing app.app takes longer than the budget)
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = ['app.models', 'app.app', 'app.scheduler', 'app.scraper_integration', 'wsgi']
+
+# Dependencies no web request needs
+HEAVY_MODULES = ['apscheduler', 'bs4', 'requests', 'selenium', 'lxml']
+
+REPORT_HEAVY = """
+import sys
+print('loaded:' + ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+CREATE_APP = """
+import time
+start = time.perf_counter()
+from app.app import create_app
+create_app()
+print(time.perf_counter() - start)
+"""
+
+
+def run_python(args, database_path):
+    env = dict(os.environ, DATABASE_PATH=database_path)
+    return subprocess.run([sys.executable] + args, cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def measure_import(module, database_path):
+    """Cumulative import time (ms), process wall time (ms) and heavy modules loaded"""
+    code = f'import {module}' + REPORT_HEAVY.format(heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    result = run_python(['-X', 'importtime', '-c', code], database_path)
+    wall = (time.perf_counter() - start) * 1000
+
+    cumulative = None
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1]) / 1000
+    heavy = [line for line in result.stdout.splitlines() if line.startswith('loaded:')]
+    heavy = heavy[-1][len('loaded:'):]
+    return cumulative, wall, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='fail if importing app.app takes longer')
+    args = parser.parse_args()
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix='job_hunter_bench_'), 'bench.db')
+
+    print("=" * 72)
+    print("Startup benchmark")
+    print("=" * 72)
+    print(f"best of {args.runs} runs, times in ms")
+    print(f"{'module':<26} {'import':>9} {'process':>9}  heavy dependencies loaded")
+
+    results = {}
+    for module in MODULES:
+        runs = [measure_import(module, database_path) for _ in range(args.runs)]
+        cumulative = min(run[0] for run in runs)
+        wall = min(run[1] for run in runs)
+        results[module] = cumulative
+        print(f"{module:<26} {cumulative:>9.1f} {wall:>9.1f}  {runs[0][2] or '-'}")
+
+    fresh = os.path.join(tempfile.mkdtemp(prefix='job_hunter_bench_'), 'fresh.db')
+    new_database = float(run_python(['-c', CREATE_APP], fresh).stdout.strip().splitlines()[-1])
+    migrated = min(float(run_python(['-c', CREATE_APP], fresh).stdout.strip().splitlines()[-1])
+                   for _ in range(args.runs))
+    print(f"{'create_app() new db':<26} {new_database * 1000:>9.1f}")
+    print(f"{'create_app() migrated db':<26} {migrated * 1000:>9.1f}")
+    print("=" * 72)
+
+    if args.budget_ms is not None and results['app.app'] > args.budget_ms:
+        print(f"❌ importing app.app took {results['app.app']:.1f} ms "
+              f"(budget {args.budget_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
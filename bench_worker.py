@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Scraper isolation benchmark
+Measures the latency of /api/stats while a scraper parses HTML: first with
+nothing running, then with the scrape in a thread of the web process (as
+before the scraper worker, SCRAPER_MODE=inline), then with the scrape in a
+process of its own (the scraper worker, the default).
+
+The scrape is synthetic so no site is contacted: BeautifulSoup with
+html.parser over generated result pages for the whole measurement, then a
+regular ScraperRun saving the parsed jobs.
+
+Usage:
+    python bench_worker.py                  # 10 s per phase
+    python bench_worker.py --seconds 20 --pages 10
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from bench_load import DATABASE_PATH, seed_database
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Dev server that starts a scrape thread on SIGUSR1
+INLINE_SERVER = """
+import signal, sys, threading
+from app.app import app
+from bench_worker import scrape
+seconds, pages = float(sys.argv[2]), int(sys.argv[3])
+signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(
+    target=scrape, args=(seconds, pages), daemon=True).start())
+app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True, use_reloader=False)
+"""
+
+WORKER = """
+import sys
+from bench_worker import scrape
+print('scraping', flush=True)
+scrape(float(sys.argv[1]), int(sys.argv[2]))
+"""
+
+
+def result_page(page, jobs=100):
+    cards = ''.join(
+        f'<article class="job" data-id="{page}-{i}"><h2><a href="/stellenangebote--{page}-{i}.html">'
+        f'Embedded Software Engineer {i}</a></h2><div class="meta">'
+        f'<span class="company">Company {i % 40}</span><span class="location">Munich</span>'
+        f'<span class="type">Full-time</span></div>'
+        f'<p class="teaser">{"Firmware for STM32 and Zephyr RTOS, board bring-up. " * 8}</p></article>'
+        for i in range(jobs)
+    )
+    return f'<html><head><title>Jobs</title></head><body><main>{cards}</main></body></html>'
+
+
+def scrape(seconds, pages):
+    """Parse result pages for `seconds`, then save the jobs as a Stepstone run"""
+    from bs4 import BeautifulSoup
+    from app.scraper_integration import _run_scraper
+
+    html = [result_page(page) for page in range(pages)]
+
+    def parse():
+        jobs = {}
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for page in html:
+                soup = BeautifulSoup(page, 'html.parser')
+                for card in soup.select('article.job'):
+                    link = card.h2.a
+                    jobs[link['href']] = {
+                        'job_title': link.get_text(strip=True),
+                        'company': card.select_one('.company').get_text(strip=True),
+                        'location': card.select_one('.location').get_text(strip=True),
+                        'job_url': 'https://www.stepstone.de' + link['href'],
+                        'description': card.select_one('.teaser').get_text(strip=True),
+                    }
+        return list(jobs.values())
+
+    _run_scraper('stepstone', 'Synthetic Stepstone', parse)
+
+
+def measure(port, seconds):
+    """Latencies (ms) of back-to-back /api/stats requests for `seconds`"""
+    session = requests.Session()
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = session.get(f'http://127.0.0.1:{port}/api/stats')
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{label:<28} {len(latencies):>7} {statistics.median(latencies):>8.2f} "
+          f"{quantiles[94]:>8.2f} {quantiles[98]:>8.2f} {latencies[-1]:>8.1f}")
+    return quantiles[98]
+
+
+def wait_for_server(port, server):
+    for _ in range(100):
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/stats', timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--pages', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("/api/stats latency during a scrape")
+    print("=" * 72)
+    seed_database()
+    env = dict(os.environ, DATABASE_PATH=DATABASE_PATH, SCHEDULER_ENABLED='0')
+    port = 5103
+    server = subprocess.Popen(
+        [sys.executable, '-c', INLINE_SERVER, str(port), str(args.seconds), str(args.pages)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server(port, server)
+        measure(port, 1)  # warm up
+        print(f"{'ms, ' + str(int(args.seconds)) + ' s per phase':<28} {'requests':>7} "
+              f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        report('no scrape', measure(port, args.seconds))
+
+        server.send_signal(signal.SIGUSR1)
+        inline = report('scrape in web process', measure(port, args.seconds))
+        time.sleep(2)  # let the run save its jobs
+
+        worker = subprocess.Popen([sys.executable, '-c', WORKER, str(args.seconds), str(args.pages)],
+                                  cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+        while worker.stdout.readline().strip() != 'scraping':
+            pass
+        separate = report('scrape in worker process', measure(port, args.seconds))
+        worker.communicate()
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"p99 {inline / separate:.1f}x lower with the scraper worker")
+    print("=" * 72)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
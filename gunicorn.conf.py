@@ -0,0 +1,56 @@
+"""
+gunicorn settings for production
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The master starts the scraper worker (worker.py) unless SCRAPER_MODE is
+'external' or 'inline'.
+
+Settings:
+    BIND                (default 0.0.0.0:5000)
+    WEB_CONCURRENCY     (default 2 x CPUs + 1, at most 8)
+    GUNICORN_THREADS    (default 8)
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+# Threaded workers: an open /api/stream connection holds one thread
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Import the app once in the master, so migrations and schema setup run once
+preload_app = True
+
+accesslog = '-'
+
+
+def when_ready(server):
+    from worker import SCRAPER_MODE, start_worker_process
+
+    if SCRAPER_MODE == 'process':
+        server.scraper_worker = start_worker_process()
+
+
+def on_exit(server):
+    process = getattr(server, 'scraper_worker', None)
+    if process is not None and process.is_alive():
+        process.terminate()
+        process.join(10)
+
+
+def post_fork(server, worker):
+    # Pooled SQLite connections must not be shared with the master
+    from app.app import get_app
+    from app.models import db
+
+    with get_app().app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    from wsgi import start_background_services
+
+    start_background_services()
@@ -1,15 +1,10 @@
 """
 Main application entry point
-Starts the Flask app with scheduler
+Starts the Flask development server with the scheduler.
+For production use several workers: gunicorn -c gunicorn.conf.py wsgi:app
 """
-from app.app import app
-from app.scheduler import init_scheduler, run_initial_scrape
-import threading
-
-
-def start_scheduler():
-    """Start the background scheduler"""
-    init_scheduler()
+from wsgi import app, start_background_services
+from worker import SCRAPER_MODE, start_worker_process
 
 
 if __name__ == '__main__':
@@ -17,19 +12,16 @@ if __name__ == '__main__':
     print("Starting Job Hunter Application")
     print("="*60 + "\n")
     
-    # Start scheduler in background thread
-    scheduler_thread = threading.Thread(target=start_scheduler, daemon=True)
-    scheduler_thread.start()
-    
-    # Run initial scrape on startup to populate database immediately
-    # This ensures the container has jobs right away instead of waiting for hourly schedule
+    # Start the scheduler in the scraper worker process (or, with
+    # SCRAPER_MODE=inline, in this one), unless another process already owns
+    # it. Sources whose data is stale (e.g. a new container) are scraped
+    # right away, fresh ones wait for their next scheduled run.
     print("\n" + "="*60)
-    print("🚀 Running initial scrape to populate database...")
+    print("🚀 Starting the scheduler...")
     print("="*60 + "\n")
-    
-    # Run initial scrape in background thread so it doesn't block app startup
-    initial_scrape_thread = threading.Thread(target=run_initial_scrape, daemon=True)
-    initial_scrape_thread.start()
+    if SCRAPER_MODE == 'process':
+        start_worker_process()
+    start_background_services()
     
     print("\n" + "="*60)
     print("🚀 Application is starting...")
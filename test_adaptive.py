@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Adaptive polling tests
+Checks the weighted arrival rate estimated from the run history, the
+intervals derived from it, the rescheduling of the source jobs and the
+LinkedIn time window that covers the gap since the last completed run.
+
+Run with pytest or directly: python test_adaptive.py
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import insert
+
+from app import scheduler, scraper_integration
+from app.adaptive import adapt_job, adapted_interval, arrival_rate, ewma_rate
+from app.app import app
+from app.models import db, ScraperRun
+from app.schedule import load_schedule
+from app.scraper_integration import linkedin_window_seconds
+from test_concurrency import patched
+
+NOW = datetime(2025, 11, 11, 16, 0)
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def seed_runs(source, new_jobs, hours=1, status='completed', end=NOW):
+    """One run every `hours` with the given new job counts, the last ending at `end`"""
+    rows = []
+    for i, new in enumerate(reversed(new_jobs)):
+        start = end - timedelta(hours=hours * i, minutes=5)
+        rows.append({'source': source, 'status': status, 'new_jobs': new,
+                     'start_time': start, 'end_time': start + timedelta(minutes=5)})
+    with app.app_context():
+        db.session.execute(insert(ScraperRun), rows)
+        db.session.commit()
+
+
+def rate(source):
+    with app.app_context():
+        return arrival_rate(source)
+
+
+def test_rate_weights_recent_runs():
+    runs = [SimpleNamespace(start_time=NOW + timedelta(hours=i), new_jobs=new)
+            for i, new in enumerate([0, 0, 0, 36, 36])]
+    # 36 jobs per hour lately, but the quiet hours still count
+    assert 0 < ewma_rate(runs) < 36 / 3600
+    assert ewma_rate(runs, alpha=1) == 36 / 3600
+    assert ewma_rate(runs[:1]) is None
+
+    reset_db()
+    seed_runs('linkedin', [50, 120, 120, 120])
+    seed_runs('stepstone', [10, 10, 10], hours=2)
+    seed_runs('glassdoor', [5, 0, 0, 0])
+    seed_runs('glassdoor', [500], status='failed')  # ignored
+    assert abs(rate('linkedin') - 120 / 3600) < 0.01
+    assert abs(rate('stepstone') - 10 / 7200) < 1e-9
+    assert rate('glassdoor') == 0
+
+
+def test_intervals_follow_the_rate_within_bounds():
+    schedule = load_schedule(environ={})
+    entry = schedule['stepstone']  # 20 new jobs per run, 30 min to 4 h
+    assert adapted_interval(entry, None) == 3600
+    assert adapted_interval(entry, 10 / 3600) == 7200
+    assert adapted_interval(entry, 200 / 3600) == 1800
+    assert adapted_interval(entry, 0) == 4 * 3600
+    assert adapted_interval(entry, 20 / 3700) == 3600  # rounded to 5 minutes
+
+
+def test_jobs_are_rescheduled():
+    reset_db()
+    seed_runs('linkedin', [120, 120, 120])
+    seed_runs('stepstone', [20, 20, 20], hours=2)
+    schedule = load_schedule(environ={})
+    background = scheduler.build_scheduler(schedule)
+    with app.app_context():
+        intervals = {source: adapt_job(background, entry, f'{source}_scraper')
+                     for source, entry in schedule.items()}
+    assert intervals == {'linkedin': 1800, 'stepstone': 7200, 'glassdoor': 3600}
+    for source, interval in intervals.items():
+        job = background.get_job(f'{source}_scraper')
+        assert job.trigger.interval_length == interval
+        assert job.kwargs == {'cooldown': interval / 2}
+        # The source keeps its offset into the slot
+        assert job.trigger.start_date.minute == {'linkedin': 0, 'stepstone': 10, 'glassdoor': 20}[source]
+
+
+def test_runs_adapt_their_interval():
+    reset_db()
+    schedule = load_schedule(environ={})
+    background = scheduler.build_scheduler(schedule)
+    scheduler._scheduler.update(instance=background, schedule=schedule)
+    try:
+        with patched(scheduler, check_last_run_time=lambda source, cooldown=None: True), \
+                patched(scraper_integration, run_glassdoor_scraper=lambda: seed_runs(
+                    'glassdoor', [0, 0], end=datetime.utcnow())):
+            scheduler.run_scraper_task('glassdoor')
+    finally:
+        scheduler._scheduler.update(instance=None, schedule=None)
+    assert background.get_job('glassdoor_scraper').trigger.interval_length == 4 * 3600
+
+
+def test_linkedin_window_covers_the_gap():
+    reset_db()
+    with app.app_context():
+        assert linkedin_window_seconds(NOW) == 3600
+        seed_runs('linkedin', [5], end=NOW - timedelta(hours=3))
+        seed_runs('linkedin', [5], status='failed', end=NOW - timedelta(hours=1))
+        # From the start of the last completed run, plus a margin
+        assert linkedin_window_seconds(NOW) == 3 * 3600 + 5 * 60 + 300
+        assert linkedin_window_seconds(NOW - timedelta(hours=3)) == 3600
+        assert linkedin_window_seconds(NOW + timedelta(days=30)) == 7 * 86400
+
+    urls = []
+
+    class FakeScraper:
+        def __init__(self, url):
+            urls.append(url)
+            self.jobs = []
+
+        def scrape_jobs(self):
+            pass
+
+    fake_import = lambda directory, module: SimpleNamespace(LinkedInJobScraper=FakeScraper)
+    with patched(scraper_integration, _import_scraper=fake_import):
+        assert scraper_integration.run_linkedin_scraper()
+    seconds = int(urls[0].split('f_TPR=r')[1].split('&')[0])
+    expected = (datetime.utcnow() - (NOW - timedelta(hours=3, minutes=5))).total_seconds()
+    assert abs(seconds - min(expected + 300, 7 * 86400)) < 60
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing adaptive polling")
+    print("=" * 60)
+    for test in (test_rate_weights_recent_runs,
+                 test_intervals_follow_the_rate_within_bounds,
+                 test_jobs_are_rescheduled,
+                 test_runs_adapt_their_interval,
+                 test_linkedin_window_covers_the_gap):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All adaptive polling tests passed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Compression tests
+Checks Accept-Encoding negotiation, the minimum size, that streams are left
+alone, and that unchanged ETag'd payloads are compressed only once.
+
+Run with pytest or directly: python test_compression.py
+"""
+import gzip
+import json
+import os
+import tempfile
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from werkzeug.http import parse_accept_header
+
+from app import compression
+from app.app import app
+from app.models import db
+from app.scraper_integration import _finish_run, _start_run, save_jobs_to_db
+
+
+def seed():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        run = _start_run('linkedin')
+        save_jobs_to_db([
+            {'job_title': f'Firmware Engineer {i}', 'company': 'ACME', 'location': 'Munich',
+             'job_url': f'https://www.linkedin.com/jobs/view/{i}',
+             'description': 'Bring-up of STM32 boards running Zephyr. ' * 30}
+            for i in range(20)
+        ], 'linkedin', run_id=run.id)
+        _finish_run(run, total=20, new=20)
+    compression.clear_cache()
+
+
+def get(url, encoding=None, etag=None):
+    headers = {}
+    if encoding is not None:
+        headers['Accept-Encoding'] = encoding
+    if etag is not None:
+        headers['If-None-Match'] = etag
+    return app.test_client().get(url, headers=headers)
+
+
+def test_gzip_is_negotiated():
+    seed()
+    plain = get('/api/jobs/linkedin')
+    assert 'Content-Encoding' not in plain.headers
+
+    response = get('/api/jobs/linkedin', 'gzip, deflate')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    body = gzip.decompress(response.get_data())
+    assert json.loads(body) == plain.get_json()
+    assert len(response.get_data()) < len(body) / 5
+    assert response.headers['ETag'] == 'W/' + plain.headers['ETag']
+
+    assert 'Content-Encoding' not in get('/api/jobs/linkedin', 'gzip;q=0, identity').headers
+
+
+def test_brotli_is_preferred_when_installed():
+    accept = parse_accept_header('gzip, br')
+    brotli = compression.brotli
+    try:
+        compression.brotli = None
+        assert compression.choose_encoding(accept) == 'gzip'
+        compression.brotli = object()
+        assert compression.choose_encoding(accept) == 'br'
+        assert compression.choose_encoding(parse_accept_header('gzip;q=1, br;q=0.5')) == 'gzip'
+    finally:
+        compression.brotli = brotli
+
+
+def test_small_and_streamed_responses_are_not_compressed():
+    seed()
+    response = get('/api/scraper/can-run', 'gzip')
+    assert len(response.get_data()) < compression.COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+    assert 'Content-Encoding' not in get('/api/export', 'gzip').headers
+
+
+def test_unchanged_payload_is_compressed_once():
+    seed()
+    calls = []
+    compress = compression.compress
+    compression.compress = lambda data, encoding: calls.append(encoding) or compress(data, encoding)
+    try:
+        first = get('/api/jobs/linkedin', 'gzip')
+        second = get('/api/jobs/linkedin', 'gzip')
+        assert second.get_data() == first.get_data()
+        assert calls == ['gzip']
+
+        # The weak ETag of a compressed response still revalidates
+        assert get('/api/jobs/linkedin', 'gzip', first.headers['ETag']).status_code == 304
+
+        # A new run changes the ETag, so the payload is compressed again
+        with app.app_context():
+            _finish_run(_start_run('stepstone'))
+        get('/api/jobs/linkedin', 'gzip')
+        assert calls == ['gzip', 'gzip']
+    finally:
+        compression.compress = compress
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing response compression")
+    print("=" * 60)
+    for test in (test_gzip_is_negotiated,
+                 test_brotli_is_preferred_when_installed,
+                 test_small_and_streamed_responses_are_not_compressed,
+                 test_unchanged_payload_is_compressed_once):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All compression tests passed!")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Concurrency tests for the SQLite engine profile
+Shows that dashboard API reads keep being served while a scraper ingest
+holds the write transaction, and that the scrapers of a batch run in
+parallel without colliding on the single SQLite writer.
+
+Run with pytest or directly: python test_concurrency.py
+"""
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import insert, text
+
+from app import scheduler, scraper_integration
+from app.app import app
+from app.models import db, Job, ScraperRun
+from app.scraper_integration import _run_scraper, save_jobs_to_db
+from app.stats import invalidate_stats
+
+# A dashboard poll must never wait this long for the writer
+MAX_READ_SECONDS = 1.0
+
+
+def make_jobs(count, offset=0):
+    return [
+        {
+            'job_title': f'FPGA Engineer {i}',
+            'company': f'Company {i % 100}',
+            'location': 'Berlin',
+            'job_url': f'https://example.com/concurrency/{i}',
+            'description': 'Bring-up of embedded Linux boards. ' * 20,
+        }
+        for i in range(offset, offset + count)
+    ]
+
+
+def reset_db(initial_jobs=500):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    save_jobs_to_db(make_jobs(initial_jobs), 'linkedin')
+
+
+def timed_get(client, url):
+    start = time.perf_counter()
+    response = client.get(url)
+    return response, time.perf_counter() - start
+
+
+def test_connections_use_wal():
+    with app.app_context():
+        mode = db.session.execute(text('PRAGMA journal_mode')).scalar()
+        synchronous = db.session.execute(text('PRAGMA synchronous')).scalar()
+    assert mode.lower() == 'wal'
+    assert synchronous == 1  # NORMAL
+
+
+def test_reads_proceed_while_write_transaction_is_open():
+    """Readers are not blocked by an uncommitted large ingest"""
+    reset_db()
+    written = threading.Event()
+    reads_done = threading.Event()
+
+    def writer():
+        with app.app_context():
+            rows = [
+                dict(source='stepstone', job_title=job['job_title'], company=job['company'],
+                     location=job['location'], job_url=job['job_url'],
+                     description=job['description'])
+                for job in make_jobs(20000, offset=100000)
+            ]
+            db.session.execute(insert(Job), rows)
+            db.session.flush()
+            written.set()
+            # Hold the write transaction open until the readers are done
+            reads_done.wait(timeout=30)
+            db.session.commit()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    assert written.wait(timeout=60)
+
+    client = app.test_client()
+    try:
+        for url in ('/api/stats', '/api/jobs/linkedin', '/api/jobs/all'):
+            response, elapsed = timed_get(client, url)
+            assert response.status_code == 200, response.get_json()
+            assert elapsed < MAX_READ_SECONDS, f'{url} took {elapsed:.2f}s'
+
+        # Readers see the last committed snapshot, not the pending rows
+        assert client.get('/api/stats').get_json()['stepstone_jobs'] == 0
+    finally:
+        reads_done.set()
+        thread.join()
+
+    # The writer bypassed save_jobs_to_db, which drops the cached stats
+    invalidate_stats()
+    assert client.get('/api/stats').get_json()['stepstone_jobs'] == 20000
+
+
+def test_polling_during_bulk_ingest():
+    """API polls keep succeeding for the whole duration of a large ingest"""
+    reset_db()
+    client = app.test_client()
+    latencies = []
+
+    ingest = threading.Thread(
+        target=save_jobs_to_db, args=(make_jobs(50000, offset=200000), 'glassdoor')
+    )
+    ingest.start()
+    while ingest.is_alive():
+        response, elapsed = timed_get(client, '/api/stats')
+        assert response.status_code == 200, response.get_json()
+        latencies.append(elapsed)
+    ingest.join()
+
+    assert latencies, 'Ingest finished before any read was issued'
+    assert max(latencies) < MAX_READ_SECONDS, f'slowest read {max(latencies):.2f}s'
+
+
+@contextmanager
+def patched(target, **attributes):
+    """Temporarily replace attributes of a module"""
+    saved = {name: getattr(target, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(target, name, value)
+
+
+@contextmanager
+def sleeping_scrapers(seconds):
+    """Replace the scrapers with ones sleeping `seconds[source]`; yields the runs"""
+    runs = []
+
+    def fake(source):
+        def run():
+            runs.append((source, time.perf_counter()))
+            time.sleep(seconds[source])
+        return run
+
+    fakes = {f'run_{source}_scraper': fake(source) for source in scheduler.SOURCES}
+    with patched(scheduler, check_last_run_time=lambda source, cooldown=None: True), \
+            patched(scraper_integration, **fakes):
+        yield runs
+
+
+def test_batch_runs_sources_in_parallel():
+    reset_db(initial_jobs=0)
+    with sleeping_scrapers({'linkedin': 0.3, 'stepstone': 0.6, 'glassdoor': 0.3}) as runs:
+        start = time.perf_counter()
+        scheduler.run_all_scrapers()
+        elapsed = time.perf_counter() - start
+    assert sorted(source for source, _ in runs) == sorted(scheduler.SOURCES)
+    # About the slowest source, not the 1.2s sum
+    assert 0.6 <= elapsed < 1.0, elapsed
+
+
+def test_per_source_locks():
+    with sleeping_scrapers({'linkedin': 0.3, 'stepstone': 0.3, 'glassdoor': 0.3}) as runs:
+        threads = [threading.Thread(target=scheduler.run_scraper_task, args=(source,))
+                   for source in ('stepstone', 'stepstone', 'glassdoor')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    # The second Stepstone run is skipped, Glassdoor is not blocked
+    assert sorted(source for source, _ in runs) == ['glassdoor', 'stepstone']
+
+
+def test_parallel_runs_save_and_record_timings():
+    reset_db(initial_jobs=0)
+    errors = []
+
+    def scrape(offset):
+        def run():
+            time.sleep(0.05)
+            return make_jobs(300, offset)
+        return run
+
+    def run(source, offset):
+        if not _run_scraper(source, source, scrape(offset)):
+            errors.append(source)
+
+    threads = [threading.Thread(target=run, args=(source, i * 1000))
+               for i, source in enumerate(scheduler.SOURCES)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    with app.app_context():
+        assert db.session.query(Job).count() == 900
+        scraper_runs = db.session.query(ScraperRun).all()
+    assert sorted(run.source for run in scraper_runs) == sorted(scheduler.SOURCES)
+    for scraper_run in scraper_runs:
+        assert scraper_run.status == 'completed' and scraper_run.new_jobs == 300
+        assert scraper_run.parse_seconds >= 0.05
+        assert scraper_run.fetch_seconds == 0.0
+        assert scraper_run.persist_seconds > 0
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing concurrent reads during ingest")
+    print("=" * 60)
+    for test in (test_connections_use_wal,
+                 test_reads_proceed_while_write_transaction_is_open,
+                 test_polling_during_bulk_ingest,
+                 test_batch_runs_sources_in_parallel,
+                 test_per_source_locks,
+                 test_parallel_runs_save_and_record_timings):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All concurrency tests passed!")
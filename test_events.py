@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Event stream tests
+Checks that committed jobs and finished runs are pushed to /api/stream
+subscribers, filtered by source, and that closed streams unsubscribe.
+
+Run with pytest or directly: python test_events.py
+"""
+import json
+import os
+import tempfile
+import time
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from app import events
+from app.app import app
+from app.events import bus
+from app.models import db
+from app.scraper_integration import _finish_run, _start_run, save_jobs_to_db
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def make_jobs(ids):
+    return [{'job_title': f'Embedded Engineer {i}', 'company': 'ACME', 'location': 'Munich',
+             'job_url': f'https://example.com/events/{i}'} for i in ids]
+
+
+def parse(message):
+    """(event, data) of an SSE message"""
+    fields = dict(line.split(': ', 1) for line in message.strip().splitlines())
+    return fields['event'], json.loads(fields['data'])
+
+
+def open_stream(**params):
+    response = app.test_client().get('/api/stream', query_string=params)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    messages = (chunk.decode() for chunk in response.response)
+    assert next(messages).startswith('retry:')
+    return response, messages
+
+
+def test_new_jobs_and_runs_are_pushed():
+    reset_db()
+    response, messages = open_stream()
+
+    with app.app_context():
+        run = _start_run('linkedin')
+        save_jobs_to_db(make_jobs(range(3)), 'linkedin', run_id=run.id)
+        save_jobs_to_db(make_jobs(range(3)), 'linkedin', run_id=run.id)  # nothing new
+        _finish_run(run, total=3, new=3)
+
+    event, data = parse(next(messages))
+    assert event == 'jobs'
+    assert data['source'] == 'linkedin' and len(data['job_ids']) == 3
+    event, data = parse(next(messages))
+    assert event == 'run'
+    assert data == {'source': 'linkedin', 'run_id': run.id, 'status': 'completed', 'new_jobs': 3}
+    response.close()
+
+
+def test_source_filter_and_keepalive():
+    reset_db()
+    keepalive = events.STREAM_KEEPALIVE_SECONDS
+    events.STREAM_KEEPALIVE_SECONDS = 0.05
+    try:
+        response, messages = open_stream(source='stepstone')
+        save_jobs_to_db(make_jobs(range(2)), 'linkedin')
+        assert next(messages) == ': keepalive\n\n'
+        save_jobs_to_db(make_jobs(range(10, 12)), 'stepstone')
+        assert parse(next(messages))[1]['source'] == 'stepstone'
+        response.close()
+    finally:
+        events.STREAM_KEEPALIVE_SECONDS = keepalive
+
+    assert app.test_client().get('/api/stream?source=monster').status_code == 400
+
+
+def test_closed_streams_unsubscribe():
+    before = bus.subscriber_count
+    response, messages = open_stream()
+    assert bus.subscriber_count == before + 1
+    response.close()
+    assert bus.subscriber_count == before
+
+
+def test_slow_subscribers_do_not_block_publishers():
+    subscriber = bus.subscribe()
+    try:
+        start = time.perf_counter()
+        for i in range(events.SUBSCRIBER_QUEUE_SIZE * 2):
+            bus.publish('jobs', {'source': 'linkedin', 'job_ids': [i]})
+        assert time.perf_counter() - start < 1
+        assert subscriber.qsize() == events.SUBSCRIBER_QUEUE_SIZE
+    finally:
+        bus.unsubscribe(subscriber)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing the event stream")
+    print("=" * 60)
+    for test in (test_new_jobs_and_runs_are_pushed,
+                 test_source_filter_and_keepalive,
+                 test_closed_streams_unsubscribe,
+                 test_slow_subscribers_do_not_block_publishers):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All event stream tests passed!")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Export tests
+Checks the NDJSON and CSV layouts of /api/export, its filters, and that
+memory use does not grow with the number of exported jobs.
+
+Run with pytest or directly: python test_export.py
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import insert
+
+from app.app import app
+from app.export import CSV_LAYOUTS
+from app.models import db, Job
+
+START = datetime(2025, 11, 11, 8, 0)
+
+
+def seed(count=6):
+    """count jobs alternating between LinkedIn and Stepstone, one minute apart"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        rows = []
+        for i in range(count):
+            source = ('linkedin', 'stepstone')[i % 2]
+            rows.append({
+                'source': source,
+                'job_title': f'Firmware Engineer {i}',
+                'company': 'ACME, Inc.',
+                'location': 'Munich',
+                'job_url': f'https://www.linkedin.com/jobs/view/{1000 + i}',
+                'job_key': f'{source}:{1000 + i}',
+                'description': 'Line one\nline "two"',
+                'job_type': 'Full-time',
+                'first_seen': START + timedelta(minutes=i),
+                'last_seen': START + timedelta(minutes=i),
+            })
+        for start in range(0, count, 5000):
+            db.session.execute(insert(Job), rows[start:start + 5000])
+        db.session.commit()
+
+
+def export(**params):
+    response = app.test_client().get('/api/export', query_string=params)
+    return response.status_code, response.headers, response.get_data(as_text=True)
+
+
+def test_ndjson_export():
+    seed()
+    status, headers, body = export()
+    assert status == 200
+    assert headers['Content-Type'] == 'application/x-ndjson'
+    records = [json.loads(line) for line in body.splitlines()]
+    assert [record['job_title'] for record in records] == \
+        [f'Firmware Engineer {i}' for i in range(6)]
+    assert records[0]['first_seen'] == '2025-11-11T08:00:00'
+    assert records[0]['description'] == 'Line one\nline "two"'
+
+
+def test_csv_uses_scraper_layouts():
+    seed()
+    status, headers, body = export(format='csv', source='linkedin')
+    assert status == 200 and headers['Content-Type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert list(rows[0]) == CSV_LAYOUTS['linkedin']
+    assert rows[0]['job_id'] == '1000'
+    assert rows[0]['title'] == 'Firmware Engineer 0'
+    assert rows[0]['employment_type'] == 'Full-time'
+    assert rows[0]['description'] == 'Line one\nline "two"'
+    assert rows[0]['seniority_level'] == ''
+
+    rows = list(csv.DictReader(io.StringIO(export(format='csv', source='stepstone')[2])))
+    assert list(rows[0]) == CSV_LAYOUTS['stepstone']
+    assert rows[0]['scraped_date'] == '2025-11-11 08:01:00'
+    assert len(rows) == 3
+
+
+def test_filters_and_validation():
+    seed()
+    since = (START + timedelta(minutes=3)).isoformat()
+    records = [json.loads(line) for line in export(since=since)[2].splitlines()]
+    assert [record['id'] for record in records] == [4, 5, 6]
+    assert len(export(source='stepstone', since=since)[2].splitlines()) == 2
+
+    assert export(format='xml')[0] == 400
+    assert export(source='monster')[0] == 400
+    assert export(since='yesterday')[0] == 400
+
+
+def peak_export_memory(count):
+    seed(count)
+    tracemalloc.start()
+    response = app.test_client().get('/api/export', query_string={'format': 'csv'})
+    lines = sum(1 for _ in response.response)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert lines == count + 1
+    return peak
+
+
+def test_memory_does_not_grow_with_table_size():
+    small = peak_export_memory(2000)
+    large = peak_export_memory(20000)
+    assert large < small * 2, (small, large)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing job export")
+    print("=" * 60)
+    for test in (test_ndjson_export,
+                 test_csv_uses_scraper_layouts,
+                 test_filters_and_validation,
+                 test_memory_does_not_grow_with_table_size):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All export tests passed!")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Facet tests
+Checks that job_facets follows the jobs table, that /api/jobs combines
+multi-value filters and returns facet counts narrowed by the other
+dimensions, and that no facet query scans the job history.
+
+Run with pytest or directly: python test_facets.py
+"""
+import os
+import tempfile
+from collections import Counter
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import delete, update
+
+from app.app import app
+from app.facets import FACET_DIMENSIONS, rebuild_facet_index
+from app.models import db, Job
+from app.scraper_integration import save_jobs_to_db
+from test_query_plans import capture_queries, explain
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def job(i, company, location, job_type='Full-time', remote_option=''):
+    return {'job_title': f'Embedded Engineer {i}', 'company': company, 'location': location,
+            'job_type': job_type, 'remote_option': remote_option,
+            'job_url': f'https://example.com/facets/{i}'}
+
+
+def seed():
+    reset_db()
+    save_jobs_to_db([
+        job(1, 'Bosch', 'Munich', remote_option='Remote'),
+        job(2, 'Bosch', 'Stuttgart'),
+        job(3, 'Infineon', 'Munich', job_type='Contract'),
+        job(4, 'Siemens', 'Berlin (Hybrid)'),
+    ], 'linkedin')
+    save_jobs_to_db([
+        job(5, 'Bosch', 'Munich', remote_option='Teilweise Home-Office'),
+        job(6, 'Infineon', 'Dresden', remote_option='Vor Ort'),
+    ], 'stepstone')
+
+
+def stored_facets():
+    with app.app_context():
+        return {tuple(row[:3]): row[3] for row in db.session.execute(
+            db.text('SELECT source, dimension, value, count FROM job_facets')
+        )}
+
+
+def recounted_facets():
+    """What job_facets should hold, counted from scratch"""
+    with app.app_context():
+        jobs = db.session.execute(db.select(Job)).scalars().all()
+        return dict(Counter(
+            (job.source, dimension, getattr(job, dimension))
+            for job in jobs for dimension in FACET_DIMENSIONS if getattr(job, dimension)
+        ))
+
+
+def get_jobs(**params):
+    response = app.test_client().get('/api/jobs', query_string=params)
+    return response.status_code, response.get_json()
+
+
+def counts(data, dimension):
+    return {facet['value']: facet['count'] for facet in data['facets'][dimension]}
+
+
+def test_facet_counts_follow_the_jobs_table():
+    seed()
+    assert stored_facets() == recounted_facets()
+    assert stored_facets()[('linkedin', 'remote_option', 'Hybrid')] == 1  # from the location
+
+    with app.app_context():
+        db.session.execute(update(Job).where(Job.company == 'Siemens').values(company='Bosch'))
+        db.session.execute(delete(Job).where(Job.location == 'Dresden'))
+        # Re-scraping only touches last_seen and leaves the counts alone
+        db.session.execute(update(Job).values(last_seen=db.func.current_timestamp()))
+        db.session.commit()
+    facets = stored_facets()
+    assert facets == recounted_facets()
+    assert ('linkedin', 'company', 'Siemens') not in facets
+    assert facets[('linkedin', 'company', 'Bosch')] == 3
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE job_facets SET count = 99")
+            rebuild_facet_index(conn)
+    assert stored_facets() == facets
+
+
+def test_multi_value_filters():
+    seed()
+    status, data = get_jobs(company=['Bosch', 'Infineon'], location='Munich')
+    assert status == 200
+    assert sorted(j['job_title'][-1] for j in data['jobs']) == ['1', '3', '5']
+    assert data['filters'] == {'company': ['Bosch', 'Infineon'], 'location': ['Munich']}
+
+    data = get_jobs(source='stepstone', remote_option=['Vor Ort', 'Remote'])[1]
+    assert [j['company'] for j in data['jobs']] == ['Infineon']
+    assert get_jobs(source='monster')[0] == 400
+
+
+def test_facets_are_narrowed_by_the_other_dimensions():
+    seed()
+    data = get_jobs()[1]
+    assert data['count'] == 6
+    assert counts(data, 'company') == {'Bosch': 3, 'Infineon': 2, 'Siemens': 1}
+    assert counts(data, 'location')['Munich'] == 3
+    assert list(counts(data, 'company')) == ['Bosch', 'Infineon', 'Siemens']  # most frequent first
+
+    data = get_jobs(company='Bosch')[1]
+    # Every company stays selectable; the other dimensions only count Bosch jobs
+    assert counts(data, 'company') == {'Bosch': 3, 'Infineon': 2, 'Siemens': 1}
+    assert counts(data, 'location') == {'Munich': 2, 'Stuttgart': 1}
+    assert counts(data, 'remote_option') == {'Remote': 1, 'Teilweise Home-Office': 1}
+
+    data = get_jobs(source='linkedin', location='Munich')[1]
+    assert counts(data, 'company') == {'Bosch': 1, 'Infineon': 1}
+    assert counts(data, 'job_type') == {'Full-time': 1, 'Contract': 1}
+
+
+def test_cursor_pages_skip_facets():
+    seed()
+    first = get_jobs(company='Bosch', limit=2)[1]
+    assert first['next_cursor'] and 'facets' in first
+    second = get_jobs(company='Bosch', limit=2, cursor=first['next_cursor'])[1]
+    assert 'facets' not in second and second['next_cursor'] is None
+    assert {j['id'] for j in first['jobs']} | {j['id'] for j in second['jobs']} == \
+        {j['id'] for j in get_jobs(company='Bosch')[1]['jobs']}
+
+
+def test_facet_queries_never_scan_jobs():
+    seed()
+    client = app.test_client()
+    # Dimensions without filters on the other dimensions read job_facets
+    for params, stored in (({}, 4), ({'source': 'linkedin'}, 4),
+                           ({'company': ['Bosch', 'Siemens']}, 1),
+                           ({'location': 'Munich', 'remote_option': 'Remote'}, 0)):
+        queries = capture_queries(lambda: client.get('/api/jobs', query_string=params))
+        assert len([statement for statement, _ in queries if 'job_facets' in statement]) == stored
+        for statement, parameters in queries:
+            for detail in explain(statement, parameters):
+                assert not (detail.startswith('SCAN') and 'INDEX' not in detail), (statement, detail)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing job facets")
+    print("=" * 60)
+    for test in (test_facet_counts_follow_the_jobs_table,
+                 test_multi_value_filters,
+                 test_facets_are_narrowed_by_the_other_dimensions,
+                 test_cursor_pages_skip_facets,
+                 test_facet_queries_never_scan_jobs):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All facet tests passed!")
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Ingest tests
+Checks the counts returned by save_jobs_to_db and how newly discovered jobs
+are tracked per scraper run.
+
+Run with pytest or directly: python test_ingest.py
+"""
+import os
+import tempfile
+import time
+from datetime import datetime
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from app.app import app
+from app.models import db, Job, ScraperRun, JobSignature, JobLshBucket
+from app.scraper_integration import save_jobs_to_db
+from app.job_keys import canonical_job_key
+from app.compact_jobs import compact_jobs
+from app.dedup import (
+    cluster_unsigned_jobs, job_shingles, lsh_buckets, minhash_signature,
+    normalize_text, similarity, SIMILARITY_THRESHOLD
+)
+
+
+def make_jobs(ids, source_prefix='https://example.com/jobs/'):
+    return [
+        {
+            'job_title': f'Embedded Engineer {i}',
+            'company': 'ACME',
+            'location': 'Munich',
+            'job_url': f'{source_prefix}{i}',
+        }
+        for i in ids
+    ]
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def complete_run(source, jobs_data, bulk=True):
+    """Ingest a batch the way run_*_scraper does and return (run_id, total, new)"""
+    with app.app_context():
+        run = ScraperRun(source=source, start_time=datetime.utcnow(), status='running')
+        db.session.add(run)
+        db.session.commit()
+        run_id = run.id
+
+    total, new = save_jobs_to_db(jobs_data, source, run_id, bulk=bulk)
+
+    with app.app_context():
+        run = db.session.get(ScraperRun, run_id)
+        run.status = 'completed'
+        run.end_time = datetime.utcnow()
+        run.jobs_found, run.new_jobs = total, new
+        db.session.commit()
+    return run_id, total, new
+
+
+def test_bulk_and_loop_return_same_counts():
+    batch = make_jobs([1, 2, 3, 3]) + [{'job_title': None, 'job_url': 'https://example.com/jobs/9'}]
+    rescrape = make_jobs([2, 3, 4, 5])
+
+    results = {}
+    for bulk in (False, True):
+        reset_db()
+        first = save_jobs_to_db(batch, 'linkedin', bulk=bulk)
+        second = save_jobs_to_db(rescrape, 'linkedin', bulk=bulk)
+        with app.app_context():
+            stored = Job.query.count()
+        results[bulk] = (first, second, stored)
+
+    assert results[True] == results[False] == ((5, 4), (4, 2), 6)
+
+
+def test_new_jobs_belong_to_latest_run():
+    reset_db()
+    client = app.test_client()
+
+    first_run, _, new = complete_run('stepstone', make_jobs([1, 2, 3]))
+    assert new == 3
+    second_run, _, new = complete_run('stepstone', make_jobs([2, 3, 4]))
+    assert new == 1
+
+    data = client.get('/api/jobs/stepstone').get_json()
+    assert [job['job_url'] for job in data['jobs']] == ['https://example.com/jobs/4']
+    assert data['jobs'][0]['is_new_in_last_hour'] is True
+
+    stats = client.get('/api/stats').get_json()
+    assert stats['stepstone_jobs'] == 4
+    assert stats['stepstone_last_hour'] == 1
+    assert stats['linkedin_last_hour'] == 0
+
+    # Rows from the first run keep the run that first saw them
+    with app.app_context():
+        runs = dict(db.session.query(Job.job_url, Job.first_seen_run_id).all())
+    assert runs['https://example.com/jobs/1'] == first_run
+    assert runs['https://example.com/jobs/4'] == second_run
+
+
+def test_failed_run_keeps_previous_new_jobs():
+    reset_db()
+    complete_run('glassdoor', make_jobs([1, 2]))
+    with app.app_context():
+        db.session.add(ScraperRun(source='glassdoor', status='failed',
+                                  start_time=datetime.utcnow(), end_time=datetime.utcnow()))
+        db.session.commit()
+
+    data = app.test_client().get('/api/jobs/glassdoor').get_json()
+    assert data['count'] == 2
+
+
+LINKEDIN_URL = ('https://www.linkedin.com/jobs/view/hardware-electrical-engineer-at-'
+                'motorola-solutions-4316644258?position={position}&pageNum=0'
+                '&refId={ref}&trackingId={tracking}')
+
+
+def test_canonical_keys():
+    assert canonical_job_key('linkedin', LINKEDIN_URL.format(
+        position=2, ref='VPJNkZNihOJKxR3g9LYbkQ%3D%3D', tracking='RMY7x8oQMK1isQkuTfGvyg%3D%3D'
+    )) == 'linkedin:4316644258'
+    assert canonical_job_key(
+        'linkedin', 'https://de.linkedin.com/jobs/view/4316644258/'
+    ) == 'linkedin:4316644258'
+    assert canonical_job_key(
+        'stepstone',
+        'https://www.stepstone.de/stellenangebote--EdgeOps-Engineer-all-genders-'
+        'Berlin-Munich-SKD-SE--13318387-inline.html'
+    ) == 'stepstone:13318387'
+    assert canonical_job_key(
+        'glassdoor',
+        'https://www.glassdoor.de/job-listing/entwickler-mwd-schmitt-engineering-'
+        'JV_IC2622109_KO0,51_KE52,71.htm?jl=1009935010815'
+    ) == 'glassdoor:1009935010815'
+    # Unknown layouts fall back to the URL without tracking parameters
+    assert canonical_job_key('glassdoor', 'https://example.com/a?utm_source=x&id=5') == \
+        canonical_job_key('glassdoor', 'http://www.example.com/a/?id=5&refId=abc')
+    assert canonical_job_key('linkedin', '') is None
+
+
+def test_tracking_parameters_do_not_create_duplicates():
+    first = [{'job_title': 'Hardware Engineer', 'job_url': LINKEDIN_URL.format(
+        position=1, ref='aaa', tracking='bbb')}]
+    second = [{'job_title': 'Hardware Engineer', 'job_url': LINKEDIN_URL.format(
+        position=7, ref='ccc', tracking='ddd')}]
+
+    for bulk in (True, False):
+        reset_db()
+        assert save_jobs_to_db(first, 'linkedin', bulk=bulk) == (1, 1)
+        assert save_jobs_to_db(second, 'linkedin', bulk=bulk) == (1, 0)
+        with app.app_context():
+            assert Job.query.count() == 1
+
+
+def test_urls_colliding_after_truncation_are_kept():
+    # Distinct postings whose URLs only differ beyond the stored 1000 characters
+    padding = 'x' * 1000
+    batch = [
+        {'job_title': 'Hardware Engineer', 'job_url':
+            f'https://www.linkedin.com/jobs/search/?q={padding}&currentJobId={job_id}'}
+        for job_id in (11, 12)
+    ]
+
+    reset_db()
+    assert save_jobs_to_db(batch, 'linkedin') == (2, 2)
+    with app.app_context():
+        assert sorted(job.job_key for job in Job.query) == ['linkedin:11', 'linkedin:12']
+
+
+def test_compaction_merges_existing_duplicates():
+    reset_db()
+    with app.app_context():
+        for position, day in ((1, 10), (2, 11), (3, 12)):
+            db.session.add(Job(
+                source='linkedin', job_title='Hardware Engineer',
+                job_url=LINKEDIN_URL.format(position=position, ref=day, tracking=day),
+                first_seen=datetime(2025, 11, day), last_seen=datetime(2025, 11, day)
+            ))
+        db.session.add(Job(source='stepstone', job_title='Other',
+                           job_url='https://www.stepstone.de/stellenangebote--X--1-inline.html',
+                           first_seen=datetime(2025, 11, 1), last_seen=datetime(2025, 11, 1)))
+        db.session.commit()
+
+        with db.engine.begin() as conn:
+            assert compact_jobs(conn) == (4, 2)
+
+        jobs = Job.query.order_by(Job.id).all()
+        assert [job.job_key for job in jobs] == ['linkedin:4316644258', 'stepstone:1']
+        # The first sighting survives with the latest last_seen of its group
+        assert jobs[0].first_seen == datetime(2025, 11, 10)
+        assert jobs[0].last_seen == datetime(2025, 11, 12)
+
+
+def posting(source, job_id, title='Embedded Software Engineer (m/w/d)',
+            company='Siemens AG', location='München, Bayern'):
+    """A scraped job; the same role differs only in URL between boards"""
+    return {'job_title': title, 'company': company, 'location': location,
+            'job_url': f'https://example.com/{source}/{job_id}'}
+
+
+def clusters_by_url():
+    with app.app_context():
+        return dict(db.session.query(Job.job_url, Job.cluster_id).all())
+
+
+def test_normalize_text():
+    assert normalize_text('Hardware-Entwickler (m/w/d) – Müller GmbH') == \
+        ['hardware', 'entwickler', 'mueller', 'gmbh']
+    assert normalize_text('C++ Engineer (all genders)') == ['c++', 'engineer']
+    assert normalize_text(None) == []
+
+
+def test_job_shingles_ignore_formatting_differences():
+    assert job_shingles('Embedded Software Engineer (m/w/d)', 'Siemens AG', 'München, Bayern') == \
+        job_shingles('Embedded Software Engineer', 'SIEMENS', 'Muenchen')
+    assert job_shingles('', '', '') == set()
+
+
+def test_minhash_similarity():
+    def signature(title, company='Siemens', location='Munich'):
+        return minhash_signature(job_shingles(title, company, location))
+
+    same = signature('FPGA Design Engineer')
+    assert similarity(same, signature('FPGA Design Engineer (w/m/d)')) == 1.0
+    assert lsh_buckets(same) == lsh_buckets(signature('FPGA Design Engineer'))
+
+    other_employer = signature('FPGA Design Engineer', company='Bosch')
+    assert similarity(same, other_employer) < SIMILARITY_THRESHOLD
+    unrelated = signature('Sales Manager', company='Allianz', location='Hamburg')
+    assert similarity(same, unrelated) < 0.2
+    assert not set(lsh_buckets(same)) & set(lsh_buckets(unrelated))
+    assert minhash_signature(set()) is None
+
+
+def test_same_posting_is_clustered_across_sources():
+    reset_db()
+    save_jobs_to_db([posting('linkedin', 1),
+                     # Same source, same role: a separate listing, never merged
+                     posting('linkedin', 2)], 'linkedin')
+    save_jobs_to_db([posting('stepstone', 1, title='Embedded Software Engineer (w/m/d)',
+                             company='Siemens', location='Muenchen'),
+                     # Same title at a different employer
+                     posting('stepstone', 2, company='Rohde & Schwarz')], 'stepstone')
+
+    clusters = clusters_by_url()
+    linkedin_1, linkedin_2 = (clusters[f'https://example.com/linkedin/{i}'] for i in (1, 2))
+    stepstone_1, stepstone_2 = (clusters[f'https://example.com/stepstone/{i}'] for i in (1, 2))
+    with app.app_context():
+        first_id = db.session.query(db.func.min(Job.id)).scalar()
+
+    # The stepstone copy matches both linkedin listings, which folds the
+    # two linkedin clusters into the one anchored at the smallest job id
+    assert linkedin_1 == linkedin_2 == stepstone_1 == first_id
+    assert stepstone_2 not in (first_id, None)
+
+
+def test_same_source_jobs_are_not_clustered():
+    reset_db()
+    save_jobs_to_db([posting('glassdoor', 1), posting('glassdoor', 2)], 'glassdoor')
+    save_jobs_to_db([posting('glassdoor', 3)], 'glassdoor')
+
+    assert len(set(clusters_by_url().values())) == 3
+
+
+def test_collapse_by_cluster():
+    reset_db()
+    complete_run('linkedin', [posting('linkedin', 1), posting('linkedin', 2, company='Bosch')])
+    complete_run('stepstone', [posting('stepstone', 1), posting('stepstone', 2, title='Sales Manager')])
+    client = app.test_client()
+
+    data = client.get('/api/jobs/all?collapse=cluster').get_json()
+    assert data['count'] == 3
+    sizes = {job['job_url']: job['cluster_size'] for job in data['jobs']}
+    assert sizes == {'https://example.com/linkedin/1': 2,
+                     'https://example.com/linkedin/2': 1,
+                     'https://example.com/stepstone/2': 1}
+    assert client.get('/api/jobs/all').get_json()['count'] == 4
+
+    # Within one run the earliest job of each cluster represents it
+    data = client.get('/api/jobs/stepstone?collapse=cluster').get_json()
+    assert sorted(job['job_url'] for job in data['jobs']) == \
+        ['https://example.com/stepstone/1', 'https://example.com/stepstone/2']
+
+    assert client.get('/api/jobs/all?collapse=source').status_code == 400
+
+
+def test_cluster_unsigned_jobs():
+    reset_db()
+    with app.app_context():
+        for source in ('linkedin', 'glassdoor'):
+            db.session.add(Job(source=source, job_title='Hardware Engineer', company='Bosch',
+                               location='Stuttgart', job_url=f'https://example.com/{source}'))
+        db.session.add(Job(source='glassdoor', job_title=None, job_url='https://example.com/empty'))
+        db.session.commit()
+
+        assert cluster_unsigned_jobs() == (3, 1)
+        assert JobSignature.query.count() == 2
+
+    clusters = clusters_by_url()
+    assert clusters['https://example.com/linkedin'] == clusters['https://example.com/glassdoor']
+
+
+def test_compaction_reanchors_clusters():
+    reset_db()
+    with app.app_context():
+        # The linkedin row with the smallest id anchors the cluster but is a
+        # later re-sighting of the posting, so compaction deletes it
+        for position, day in ((1, 12), (2, 10)):
+            db.session.add(Job(
+                source='linkedin', job_title='Hardware Engineer', company='Bosch',
+                job_url=LINKEDIN_URL.format(position=position, ref=day, tracking=day),
+                first_seen=datetime(2025, 11, day), last_seen=datetime(2025, 11, day)
+            ))
+        db.session.add(Job(source='stepstone', job_title='Hardware Engineer', company='Bosch',
+                           job_url='https://www.stepstone.de/stellenangebote--X--1-inline.html'))
+        db.session.commit()
+        assert cluster_unsigned_jobs() == (3, 1)
+        anchor = db.session.query(db.func.min(Job.id)).scalar()
+
+        with db.engine.begin() as conn:
+            assert compact_jobs(conn) == (3, 1)
+
+        assert db.session.get(Job, anchor) is None
+        assert JobSignature.query.filter_by(job_id=anchor).count() == 0
+        assert JobLshBucket.query.filter_by(job_id=anchor).count() == 0
+        remaining = Job.query.order_by(Job.id).all()
+        assert [job.cluster_id for job in remaining] == [remaining[0].id] * 2
+
+
+def test_clustering_cost_does_not_grow_with_history():
+    def generic_jobs(source, ids):
+        # Boards list many near-identical titles; same-source rows must not
+        # become candidates and crowded buckets must not be scanned
+        return [posting(source, i, title=f'Embedded Software Engineer {i % 3}',
+                        company=f'Company {i % 20}') for i in ids]
+
+    timings = []
+    for history in (1000, 8000):
+        reset_db()
+        save_jobs_to_db(generic_jobs('stepstone', range(history)), 'stepstone')
+        save_jobs_to_db(generic_jobs('linkedin', range(history)), 'linkedin')
+
+        start = time.perf_counter()
+        assert save_jobs_to_db(generic_jobs('linkedin', range(history, history + 200)),
+                               'linkedin') == (200, 200)
+        timings.append(time.perf_counter() - start)
+
+    small, large = timings
+    assert large < 2 * small + 0.1, f'{small:.2f}s with 1k stored jobs, {large:.2f}s with 8k'
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing job ingest")
+    print("=" * 60)
+    for test in (test_bulk_and_loop_return_same_counts,
+                 test_new_jobs_belong_to_latest_run,
+                 test_failed_run_keeps_previous_new_jobs,
+                 test_canonical_keys,
+                 test_tracking_parameters_do_not_create_duplicates,
+                 test_urls_colliding_after_truncation_are_kept,
+                 test_compaction_merges_existing_duplicates,
+                 test_normalize_text,
+                 test_job_shingles_ignore_formatting_differences,
+                 test_minhash_similarity,
+                 test_same_posting_is_clustered_across_sources,
+                 test_same_source_jobs_are_not_clustered,
+                 test_collapse_by_cluster,
+                 test_cluster_unsigned_jobs,
+                 test_compaction_reanchors_clusters,
+                 test_clustering_cost_does_not_grow_with_history):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All ingest tests passed!")
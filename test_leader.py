@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Leader election tests
+Checks that only one process holds the scheduler lock, that another one
+takes over when it exits, that triggers received by other workers are
+queued for the leader, and that those workers relay committed events.
+
+Run with pytest or directly: python test_leader.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import insert
+
+from app import leader, scheduler
+from app.app import app
+from app.eligibility import invalidate_eligibility
+from app.events import bus, CommittedEventReader
+from app.models import db, Job, ScraperRun, ScrapeRequest
+
+# Holds the lock until stdin is closed
+HOLD_LOCK = """
+import fcntl, sys
+lock_file = open(sys.argv[1], 'a+')
+fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+print('locked', flush=True)
+sys.stdin.read()
+"""
+
+
+def reset_db():
+    invalidate_eligibility()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def restore_leader_state():
+    leader.release_leadership()
+    leader._state['elected'] = False
+
+
+def test_second_process_takes_over_from_leader():
+    path = os.path.join(tempfile.mkdtemp(), 'jobs.db.scheduler.lock')
+    holder = subprocess.Popen([sys.executable, '-c', HOLD_LOCK, path],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == 'locked'
+        elected = threading.Event()
+        assert not leader.elect_leader(path, elected.set, retry_seconds=0.05)
+        assert not leader.is_leader() and not leader.owns_scrapers()
+        assert not elected.wait(0.3)
+
+        holder.stdin.close()  # the leader exits
+        holder.wait()
+        assert elected.wait(5)
+        assert leader.is_leader() and leader.owns_scrapers()
+        assert open(path).read().strip() == str(os.getpid())
+    finally:
+        if holder.poll() is None:
+            holder.kill()
+        restore_leader_state()
+
+
+def test_single_process_without_election_owns_scrapers():
+    assert leader.owns_scrapers()
+
+
+def test_triggers_on_other_workers_are_queued_for_leader():
+    reset_db()
+    started = []
+    start_scrape = scheduler.start_scrape
+    scheduler.start_scrape = started.append
+    leader._state['elected'] = True  # lost the election
+    try:
+        client = app.test_client()
+        for source in ('linkedin', 'linkedin', 'all'):
+            response = client.get(f'/api/scraper/trigger/{source}')
+            assert response.get_json()['status'] == 'queued'
+        assert started == []
+
+        # The leader starts each requested scraper once and empties the queue
+        scheduler.run_requested_scrapes()
+        assert started == ['linkedin', 'all']
+        with app.app_context():
+            assert ScrapeRequest.query.count() == 0
+    finally:
+        scheduler.start_scrape = start_scrape
+        restore_leader_state()
+
+
+def test_committed_events_are_relayed():
+    reset_db()
+    subscriber = bus.subscribe()
+    try:
+        with app.app_context():
+            reader = CommittedEventReader()
+            reader.poll()  # starts after what is already committed
+
+            # Rows written by the leader process
+            now = datetime.utcnow()
+            with db.engine.begin() as conn:
+                run_id = conn.execute(insert(ScraperRun).values(
+                    source='glassdoor', start_time=now, status='running'
+                )).inserted_primary_key[0]
+                conn.execute(insert(Job), [
+                    {'source': 'glassdoor', 'job_title': f'Job {i}', 'job_key': f'glassdoor:{i}',
+                     'first_seen': now, 'last_seen': now, 'first_seen_run_id': run_id}
+                    for i in range(3)
+                ])
+            reader.poll()
+            event, data = subscriber.get_nowait()
+            assert event == 'jobs' and data['source'] == 'glassdoor' and len(data['job_ids']) == 3
+            assert subscriber.empty()  # the run is still running
+
+            with db.engine.begin() as conn:
+                conn.execute(ScraperRun.__table__.update().values(
+                    status='completed', end_time=now, new_jobs=3
+                ))
+            reader.poll()
+            assert subscriber.get_nowait() == ('run', {
+                'source': 'glassdoor', 'run_id': run_id, 'status': 'completed', 'new_jobs': 3
+            })
+            reader.poll()
+            assert subscriber.empty()
+    finally:
+        bus.unsubscribe(subscriber)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing scheduler leader election")
+    print("=" * 60)
+    for test in (test_second_process_takes_over_from_leader,
+                 test_single_process_without_election_owns_scrapers,
+                 test_triggers_on_other_workers_are_queued_for_leader,
+                 test_committed_events_are_relayed):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All leader election tests passed!")
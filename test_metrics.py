@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Metrics tests
+Checks the per-thread counters, the request timing middleware with its
+Server-Timing header, the scraper fetch/parse/persist accounting and the
+Prometheus text on /metrics.
+
+Run with pytest or directly: python test_metrics.py
+"""
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+import requests
+
+from app import metrics
+from app.app import app
+from app.models import db
+from app.scraper_integration import _finish_run, _start_run, save_jobs_to_db
+
+PAGE = b'<html>' + b'x' * 5000 + b'</html>'
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/moved':
+            self.send_response(302)
+            self.send_header('Location', '/')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def value(metric, labels):
+    return metric.collect().get(labels, 0)
+
+
+def test_counters_add_up_across_threads():
+    counter = metrics.Counter('test_increments_total', 'Test counter', ('worker',))
+    metrics.REGISTRY.remove(counter)
+
+    def work():
+        for _ in range(1000):
+            counter.inc(('a',))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.collect() == {('a',): 8000}
+
+
+def test_requests_are_timed():
+    reset_db()
+    client = app.test_client()
+    before = value(metrics.HTTP_REQUEST_QUERIES, ('/api/jobs/<source>',))
+    response = client.get('/api/jobs/linkedin')
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=') and 'queries"' in timing and ', app;dur=' in timing
+    queries = int(timing.split('desc="')[1].split(' ')[0])
+    assert queries >= 1
+
+    counts = metrics.HTTP_REQUEST_QUERIES.collect()[('/api/jobs/<source>',)]
+    assert counts != before and counts[-1] >= queries  # sum of query counts
+    latency = metrics.HTTP_REQUEST_SECONDS.collect()
+    assert ('GET', '/api/jobs/<source>', '200') in latency
+    client.get('/no-such-page')
+    assert ('GET', 'unmatched', '404') in metrics.HTTP_REQUEST_SECONDS.collect()
+
+
+def test_scraper_fetch_parse_and_persist():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        metrics.instrument_requests()
+        metrics.instrument_requests()  # idempotent
+        pages = value(metrics.SCRAPER_PAGES, ('stepstone',))
+        parse = value(metrics.SCRAPER_PARSE_SECONDS, ('stepstone',))
+
+        requests.get(url)  # outside a scrape: not counted
+        with metrics.track_scrape('stepstone'):
+            requests.get(url)
+            requests.Session().get(url + '/moved')  # one page after the redirect
+            time.sleep(0.05)  # parsing
+        assert value(metrics.SCRAPER_PAGES, ('stepstone',)) == pages + 2
+        assert value(metrics.SCRAPER_BYTES, ('stepstone',)) >= 2 * len(PAGE)
+        assert value(metrics.SCRAPER_PARSE_SECONDS, ('stepstone',)) - parse >= 0.05
+    finally:
+        server.shutdown()
+
+    reset_db()
+    persist = value(metrics.SCRAPER_PERSIST_SECONDS, ('glassdoor',))
+    new = value(metrics.SCRAPER_JOBS, ('glassdoor', 'true'))
+    with app.app_context():
+        run = _start_run('glassdoor')
+        jobs = [{'job_title': f'Job {i}', 'job_url': f'https://example.com/m/{i}'} for i in range(3)]
+        save_jobs_to_db(jobs, 'glassdoor', run.id)
+        save_jobs_to_db(jobs, 'glassdoor', run.id)
+        _finish_run(run, 3, 3)
+    assert value(metrics.SCRAPER_PERSIST_SECONDS, ('glassdoor',)) > persist
+    assert value(metrics.SCRAPER_JOBS, ('glassdoor', 'true')) == new + 3
+    assert value(metrics.SCRAPER_RUNS, ('glassdoor', 'completed')) >= 1
+
+
+def test_metrics_endpoint_is_prometheus_text():
+    client = app.test_client()
+    client.get('/api/stats')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/stats",status="200",le="+Inf"}' in text
+    assert 'http_request_db_queries_count{route="/api/stats"}' in text
+    assert '# TYPE scraper_pages_fetched_total counter' in text
+    for line in text.splitlines():
+        assert line.startswith('#') or len(line.rsplit(' ', 1)) == 2
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing metrics")
+    print("=" * 60)
+    for test in (test_counters_add_up_across_threads,
+                 test_requests_are_timed,
+                 test_scraper_fetch_parse_and_persist,
+                 test_metrics_endpoint_is_prometheus_text):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All metrics tests passed!")
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Query plan tests
+Records every SQL statement the polling endpoints and the scheduler timing
+checks execute, and asserts via EXPLAIN QUERY PLAN that none of them falls
+back to a full table scan or a temporary sort.
+
+Run with pytest or directly: python test_query_plans.py
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import create_engine, event
+
+from app.app import app
+from app.models import db, Job, ScraperRun
+from app.migrations import MIGRATIONS, run_migrations
+from app.scheduler import check_last_run_time
+from app.scraper_integration import _finish_run, _start_run
+from app.stats import invalidate_stats
+from app import eligibility
+from app.eligibility import invalidate_eligibility
+
+SOURCES = ['linkedin', 'stepstone', 'glassdoor']
+
+POLLED_ENDPOINTS = [
+    '/api/stats',
+    '/api/jobs/linkedin',
+    '/api/jobs/all',
+    '/api/scraper/status',
+    '/api/scraper/can-run',
+]
+
+
+def seed_database():
+    """Fill the tables with enough rows for the planner to prefer indexes"""
+    invalidate_eligibility()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        now = datetime.utcnow()
+        for i in reversed(range(30)):
+            db.session.add(ScraperRun(
+                source=SOURCES[i % 3],
+                start_time=now - timedelta(hours=i, minutes=5),
+                end_time=now - timedelta(hours=i),
+                status='completed'
+            ))
+        db.session.commit()
+
+        latest_run_ids = ScraperRun.latest_completed_ids()
+        for i in range(300):
+            source = SOURCES[i % 3]
+            db.session.add(Job(
+                source=source,
+                job_title=f'Embedded Engineer {i}',
+                company=f'Company {i % 20}',
+                location='Munich',
+                job_url=f'https://example.com/jobs/{i}',
+                first_seen=now - timedelta(minutes=i),
+                last_seen=now,
+                first_seen_run_id=latest_run_ids[source] if i < 30 else None
+            ))
+        db.session.commit()
+
+
+def capture_queries(action):
+    """Run `action` and return the (statement, parameters) it executed"""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        action()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return captured
+
+
+def explain(statement, parameters):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    conn = sqlite3.connect(os.environ['DATABASE_PATH'])
+    try:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    finally:
+        conn.close()
+    return [row[-1] for row in rows]
+
+
+def assert_uses_indexes(statement, parameters):
+    plan = explain(statement, parameters)
+    for detail in plan:
+        if detail.startswith('SCAN') and 'INDEX' not in detail:
+            raise AssertionError(f'Full table scan:\n{statement}\nPlan: {plan}')
+        if 'TEMP B-TREE' in detail:
+            raise AssertionError(f'Temporary sort:\n{statement}\nPlan: {plan}')
+
+
+def test_polled_endpoints_use_indexes():
+    """Every query behind the dashboard polling endpoints is index-backed"""
+    seed_database()
+    client = app.test_client()
+
+    for url in POLLED_ENDPOINTS:
+        # Check the cold-cache queries of every endpoint
+        invalidate_stats()
+        invalidate_eligibility()
+        queries = capture_queries(lambda: client.get(url))
+        assert queries, f'No queries recorded for {url}'
+        for statement, parameters in queries:
+            assert_uses_indexes(statement, parameters)
+
+
+def test_last_run_check_uses_index():
+    """check_last_run_time (used by can_run and the scheduler) is index-backed"""
+    seed_database()
+
+    queries = capture_queries(lambda: [check_last_run_time(source) for source in SOURCES])
+    assert len(queries) == 1
+    assert_uses_indexes(*queries[0])
+
+
+def test_eligibility_is_one_query_for_every_caller():
+    """status, can-run, trigger and the scheduler share one cached grouped query"""
+    seed_database()
+    client = app.test_client()
+
+    queries = capture_queries(lambda: client.get('/api/scraper/can-run'))
+    assert len(queries) == 1
+    assert queries == capture_queries(lambda: check_last_run_time('linkedin')) + queries
+    assert capture_queries(lambda: client.get('/api/scraper/trigger/linkedin')) == []
+
+    # The latest seeded run finished just now, so every source is cooling down
+    can_run = client.get('/api/scraper/can-run').get_json()
+    assert not can_run['all']['can_run'] and not can_run['linkedin']['can_run']
+    response = client.get('/api/scraper/trigger/linkedin')
+    assert response.status_code == 429
+    assert 0 < response.get_json()['time_until_next_run_minutes'] <= 60
+
+    # A finished run is recorded without reloading
+    with app.app_context():
+        run = _start_run('stepstone')
+        run_id = run.id
+        _finish_run(run)
+    queries = capture_queries(lambda: client.get('/api/scraper/can-run'))
+    assert [statement for statement, _ in queries if 'max(scraper_runs.end_time)' in statement] == []
+    with app.app_context():
+        finished = db.session.get(ScraperRun, run_id).end_time
+    assert eligibility.last_completions()['stepstone'] == finished
+
+
+def test_cooldown_is_configurable_per_source():
+    seed_database()
+    cooldowns = dict(eligibility.COOLDOWN_SECONDS)
+    try:
+        eligibility.COOLDOWN_SECONDS['glassdoor'] = 0
+        with app.app_context():
+            assert check_last_run_time('glassdoor')
+            assert not check_last_run_time('linkedin')
+        status = app.test_client().get('/api/scraper/status').get_json()
+        assert status['glassdoor']['can_run'] and status['glassdoor']['time_until_next_run_minutes'] == 0
+        assert not status['linkedin']['can_run']
+    finally:
+        eligibility.COOLDOWN_SECONDS.update(cooldowns)
+
+
+def test_stats_take_two_queries_and_are_cached():
+    """/api/stats is two grouped queries, then served from the cache"""
+    seed_database()
+    invalidate_stats()
+    client = app.test_client()
+
+    # The first query of every poll is the ETag version check
+    queries = capture_queries(lambda: client.get('/api/stats'))
+    assert len(queries) == 3, [statement for statement, _ in queries]
+    assert len(capture_queries(lambda: client.get('/api/stats'))) == 1
+
+    # Finishing a run drops the cache
+    with app.app_context():
+        _finish_run(_start_run('linkedin'), total=10, new=4)
+    stats = client.get('/api/stats').get_json()
+    assert stats['linkedin_last_hour'] == 4
+    assert stats['last_runs']['linkedin']['jobs_found'] == 10
+    assert stats['total_jobs'] == 300
+    assert stats['linkedin_jobs'] == stats['stepstone_jobs'] == 100
+
+
+def test_unchanged_data_is_revalidated_with_one_query():
+    """Polls with a current ETag get 304 after a single index-only query"""
+    seed_database()
+    client = app.test_client()
+
+    for url in ('/api/stats', '/api/jobs/linkedin', '/api/scraper/status'):
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers['ETag']
+
+        headers = {'If-None-Match': first.headers['ETag']}
+        responses = []
+        queries = capture_queries(lambda: responses.append(client.get(url, headers=headers)))
+        assert responses[0].status_code == 304
+        assert responses[0].headers['ETag'] == first.headers['ETag']
+        assert len(queries) == 1
+        assert_uses_indexes(*queries[0])
+
+    # A finished run changes every ETag
+    etag = client.get('/api/jobs/linkedin').headers['ETag']
+    with app.app_context():
+        _finish_run(_start_run('stepstone'))
+    response = client.get('/api/jobs/linkedin', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_job_list_pages_by_cursor_without_descriptions():
+    """/api/jobs/all walks (first_seen, id) by range reads and loads only asked-for columns"""
+    seed_database()
+    client = app.test_client()
+
+    seen, cursor, pages = [], None, []
+    while True:
+        url = '/api/jobs/all?limit=40' + (f'&cursor={cursor}' if cursor else '')
+        queries = capture_queries(lambda: pages.append(client.get(url).get_json()))
+        for statement, parameters in queries:
+            assert 'description' not in statement
+            assert_uses_indexes(statement, parameters)
+        seen += [job['id'] for job in pages[-1]['jobs']]
+        cursor = pages[-1]['next_cursor']
+        if not cursor:
+            break
+    assert len(pages) == 8
+    assert len(seen) == len(set(seen)) == 300
+    assert 'description' not in pages[0]['jobs'][0]
+
+    data = client.get('/api/jobs/all?limit=1&fields=id,description,is_new_in_last_hour').get_json()
+    assert set(data['jobs'][0]) == {'id', 'description', 'is_new_in_last_hour'}
+    assert data['jobs'][0]['is_new_in_last_hour'] is True
+    assert client.get('/api/jobs/all?fields=password').status_code == 400
+    assert client.get('/api/jobs/all?cursor=not-a-cursor').status_code == 400
+
+
+def test_migration_adds_indexes_to_existing_database():
+    """A database created before the indexes existed gets them on migrate"""
+    path = os.path.join(tempfile.mkdtemp(), 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE jobs (
+            id INTEGER PRIMARY KEY, source VARCHAR(50) NOT NULL,
+            job_title VARCHAR(500), company VARCHAR(500), location VARCHAR(500),
+            job_url VARCHAR(1000) UNIQUE, description TEXT, salary VARCHAR(200),
+            job_type VARCHAR(200), posted_date VARCHAR(200),
+            first_seen DATETIME NOT NULL, last_seen DATETIME NOT NULL,
+            is_new_in_last_hour BOOLEAN
+        );
+        CREATE TABLE scraper_runs (
+            id INTEGER PRIMARY KEY, source VARCHAR(50) NOT NULL,
+            start_time DATETIME NOT NULL, end_time DATETIME, status VARCHAR(50),
+            jobs_found INTEGER, new_jobs INTEGER, error_message TEXT
+        );
+        INSERT INTO scraper_runs (id, source, start_time, end_time, status)
+        VALUES (7, 'linkedin', '2025-11-11 16:00:00', '2025-11-11 16:01:00', 'completed');
+        INSERT INTO jobs (source, job_url, first_seen, last_seen, is_new_in_last_hour)
+        VALUES ('linkedin', 'https://example.com/new', '2025-11-11 16:01:00',
+                '2025-11-11 16:01:00', 1),
+               ('linkedin', 'https://example.com/old', '2025-11-10 16:01:00',
+                '2025-11-11 16:01:00', 0);
+    """)
+    conn.close()
+
+    engine = create_engine(f'sqlite:///{path}')
+    assert run_migrations(engine) == MIGRATIONS[-1][0]
+    # Running again is a no-op
+    assert run_migrations(engine) == MIGRATIONS[-1][0]
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    indexes = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )}
+    # The old is_new_in_last_hour flag is carried over to first_seen_run_id
+    run_ids = dict(conn.execute('SELECT job_url, first_seen_run_id FROM jobs'))
+    # job_key is the only unique key left on jobs
+    unique_indexes = [row[1] for row in conn.execute('PRAGMA index_list(jobs)') if row[2]]
+    conn.close()
+    assert run_ids == {'https://example.com/new': 7, 'https://example.com/old': None}
+    assert unique_indexes == ['ix_jobs_job_key']
+
+    declared = {
+        index.name
+        for table in (Job.__table__, ScraperRun.__table__)
+        for index in table.indexes
+    }
+    assert declared <= indexes, declared - indexes
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing query plans")
+    print("=" * 60)
+    for test in (test_polled_endpoints_use_indexes,
+                 test_last_run_check_uses_index,
+                 test_eligibility_is_one_query_for_every_caller,
+                 test_cooldown_is_configurable_per_source,
+                 test_stats_take_two_queries_and_are_cached,
+                 test_unchanged_data_is_revalidated_with_one_query,
+                 test_job_list_pages_by_cursor_without_descriptions,
+                 test_migration_adds_indexes_to_existing_database):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All query plan tests passed!")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Schedule tests
+Checks that the scheduler registers one job per source from the schedule
+config and that no source is ever started more than once per interval,
+whatever the jitter. The jobs are stored in the database and resumed on
+restart, when only the sources with stale data are scraped.
+
+Run with pytest or directly: python test_schedule.py
+"""
+import math
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import insert
+
+from app import scheduler as scheduler_module
+from app.app import app
+from app.eligibility import invalidate_eligibility
+from app.models import db, ScraperRun
+from app.schedule import SOURCES, load_schedule, trigger_for
+from app.scheduler import (JOBSTORE_TABLE, build_scheduler, open_scheduler, plan_startup,
+                           run_scraper_task)
+
+NOW = datetime(2025, 11, 11, 16, 37, 12, tzinfo=timezone.utc)
+
+
+def fire_times(trigger, days):
+    """Start times of a trigger over `days`, as the scheduler computes them"""
+    times = []
+    fire_time = trigger.get_next_fire_time(None, NOW)
+    while fire_time < NOW + timedelta(days=days):
+        times.append(fire_time)
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time)
+    return times
+
+
+def slots(times, entry):
+    """Index of the interval slot every start time falls in"""
+    start = trigger_for(entry).start_date
+    return [math.floor((time - start).total_seconds() / entry.interval) for time in times]
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.session.execute(db.text(f'DROP TABLE IF EXISTS {JOBSTORE_TABLE}'))
+        db.session.commit()
+        db.create_all()
+    invalidate_eligibility()
+
+
+@contextmanager
+def opened(schedule):
+    """A paused scheduler on the job store; nothing runs while it is open"""
+    scheduler = open_scheduler(schedule)
+    try:
+        yield scheduler
+    finally:
+        scheduler.shutdown(wait=False)
+        scheduler_module._scheduler.update(instance=None, schedule=None)
+
+
+def test_one_job_per_source():
+    jobs = build_scheduler(load_schedule(environ={})).get_jobs()
+    scraper_jobs = [job for job in jobs if job.func is run_scraper_task]
+    assert sorted(job.args[0] for job in scraper_jobs) == sorted(SOURCES)
+    assert not [job for job in jobs if job.id == 'hourly_scraper']
+    for job in scraper_jobs:
+        assert job.coalesce is True
+        assert job.max_instances == 1
+        assert job.misfire_grace_time == 300
+        assert job.kwargs == {'cooldown': 1800}
+
+
+def test_no_source_starts_twice_per_interval():
+    random.seed(7)
+    environ = {'SCHEDULE_GLASSDOOR_INTERVAL': '2700', 'SCHEDULE_STEPSTONE_JITTER': '3500',
+               'SCHEDULE_STEPSTONE_MIN_INTERVAL': '3600'}
+    for entry in load_schedule(environ=environ).values():
+        times = fire_times(trigger_for(entry), days=7)
+        assert len(times) >= 7 * 86400 // entry.interval - 1
+        # One start in every slot: none twice, none skipped
+        indexes = slots(times, entry)
+        assert indexes == list(range(indexes[0], indexes[0] + len(indexes))), entry.source
+        for time, index in zip(times, indexes):
+            slot_start = trigger_for(entry).start_date + timedelta(seconds=index * entry.interval)
+            assert timedelta(0) <= time - slot_start <= timedelta(seconds=entry.jitter)
+
+    # The sources are staggered by their offsets
+    schedule = load_schedule(environ={'SCHEDULE_JITTER': '0'})
+    first = {source: fire_times(trigger_for(entry), days=1)[0] for source, entry in schedule.items()}
+    assert [first[source].minute for source in SOURCES] == [0, 10, 20]
+
+
+def test_schedule_from_file_and_environment():
+    path = os.path.join(tempfile.mkdtemp(), 'schedule.yaml')
+    with open(path, 'w') as f:
+        f.write('defaults:\n  jitter: 30\n  coalesce: false\n'
+                'sources:\n  stepstone: {offset: 900, interval: 7200}\n')
+    schedule = load_schedule(environ={'SCHEDULE_FILE': path,
+                                      'SCHEDULE_STEPSTONE_INTERVAL': '5400',
+                                      'SCHEDULE_MAX_INSTANCES': '2'})
+    assert schedule['stepstone'].interval == 5400 and schedule['stepstone'].offset == 900
+    assert schedule['linkedin'].interval == 3600 and schedule['linkedin'].jitter == 30
+    assert all(not entry.coalesce and entry.max_instances == 2 for entry in schedule.values())
+
+    for environ in ({'SCHEDULE_JITTER': '1800'}, {'SCHEDULE_LINKEDIN_OFFSET': '-5'},
+                    {'SCHEDULE_MAX_INSTANCES': '0'}, {'SCHEDULE_INTERVAL': '0'},
+                    {'SCHEDULE_MAX_INTERVAL': '3000'}, {'SCHEDULE_TARGET_NEW_JOBS': '0'}):
+        try:
+            load_schedule(environ=environ)
+        except ValueError:
+            continue
+        raise AssertionError(f'{environ} was accepted')
+
+    with open(path, 'w') as f:
+        f.write('sources:\n  monster: {offset: 0}\n')
+    try:
+        load_schedule(path)
+    except ValueError as e:
+        assert 'monster' in str(e)
+    else:
+        raise AssertionError('unknown source was accepted')
+
+
+def test_jobs_are_stored_and_resumed():
+    reset_db()
+    schedule = load_schedule(environ={})
+    later = datetime(2030, 1, 1, 12, 10, tzinfo=timezone.utc)
+    with opened(schedule) as scheduler:
+        scheduler.modify_job('stepstone_scraper', next_run_time=later)
+    with app.app_context():
+        stored = db.session.execute(db.text(f'SELECT id FROM {JOBSTORE_TABLE}')).scalars().all()
+    assert sorted(stored) == sorted([f'{source}_scraper' for source in SOURCES] + ['scrape_requests'])
+
+    # A restart resumes the stored schedule
+    with opened(schedule) as scheduler:
+        assert scheduler.get_job('stepstone_scraper').next_run_time == later
+        assert len(scheduler.get_jobs()) == 4
+
+    # A changed schedule replaces the stored job
+    changed = load_schedule(environ={'SCHEDULE_STEPSTONE_OFFSET': '900'})
+    with opened(changed) as scheduler:
+        job = scheduler.get_job('stepstone_scraper')
+        assert job.next_run_time != later and job.trigger.start_date.minute == 15
+
+
+def test_startup_scrapes_only_stale_sources():
+    reset_db()
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(insert(ScraperRun), [
+            {'source': 'linkedin', 'status': 'completed', 'start_time': now - timedelta(minutes=10),
+             'end_time': now - timedelta(minutes=5)},
+            {'source': 'stepstone', 'status': 'completed', 'start_time': now - timedelta(hours=3),
+             'end_time': now - timedelta(hours=3)},
+            {'source': 'glassdoor', 'status': 'failed', 'start_time': now - timedelta(minutes=10),
+             'end_time': now - timedelta(minutes=5)},
+        ])
+        db.session.commit()
+
+    with opened(load_schedule(environ={})) as scheduler:
+        linkedin = scheduler.get_job('linkedin_scraper').next_run_time
+        assert plan_startup(scheduler) == ['stepstone', 'glassdoor']
+        assert scheduler.get_job('linkedin_scraper').next_run_time == linkedin
+        for source in ('stepstone', 'glassdoor'):
+            next_run = scheduler.get_job(f'{source}_scraper').next_run_time
+            assert abs((next_run - datetime.now(timezone.utc)).total_seconds()) < 5
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing the scraper schedule")
+    print("=" * 60)
+    for test in (test_one_job_per_source,
+                 test_no_source_starts_twice_per_interval,
+                 test_schedule_from_file_and_environment,
+                 test_jobs_are_stored_and_resumed,
+                 test_startup_scrapes_only_stale_sources):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All schedule tests passed!")
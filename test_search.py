@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Search tests
+Checks that the FTS5 index follows the jobs table and that /api/search
+ranks, highlights, filters and paginates matches.
+
+Run with pytest or directly: python test_search.py
+"""
+import os
+import tempfile
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from app.app import app
+from app.models import db, Job
+from app.scraper_integration import save_jobs_to_db
+from app.search import build_match_query, create_search_index, rebuild_search_index
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def job(i, title, company='ACME', description=''):
+    return {'job_title': title, 'company': company, 'location': 'Munich',
+            'job_url': f'https://example.com/search/{i}', 'description': description}
+
+
+def search(**params):
+    response = app.test_client().get('/api/search', query_string=params)
+    return response.status_code, response.get_json()
+
+
+def seed():
+    reset_db()
+    save_jobs_to_db([
+        job(1, 'Firmware Engineer', description='Zephyr RTOS drivers on STM32 <b>boards</b>'),
+        job(2, 'STM32 Firmware Developer', company='Bosch'),
+        job(3, 'FPGA Engineer', description='VHDL, Xilinx'),
+    ], 'linkedin')
+    save_jobs_to_db([job(4, 'Embedded C++ Engineer', description='STM32 and Zephyr')], 'stepstone')
+
+
+def test_match_query_quotes_terms():
+    assert build_match_query('STM32 zephyr') == '"STM32" "zephyr"'
+    assert build_match_query('C++ "x') == '"C++" """x"'
+    assert build_match_query('embed*') == '"embed"*'
+    assert build_match_query(' ++ ') is None
+
+
+def test_title_hits_rank_first():
+    seed()
+    status, data = search(q='stm32')
+    assert status == 200
+    assert data['total'] == 3
+    assert data['jobs'][0]['job_title'] == 'STM32 Firmware Developer'
+
+    # All terms must match; special characters never break the query
+    assert sorted(j['job_title'] for j in search(q='zephyr stm32')[1]['jobs']) == \
+        ['Embedded C++ Engineer', 'Firmware Engineer']
+    assert search(q='C++')[0] == 200
+    assert search(q='fpg*')[1]['total'] == 1
+
+
+def test_snippets_are_escaped_and_highlighted():
+    seed()
+    result = search(q='zephyr', source='linkedin')[1]['jobs'][0]
+    assert '<mark>Zephyr</mark>' in result['snippet']
+    assert '&lt;b&gt;boards&lt;/b&gt;' in result['snippet']
+
+
+def test_source_filter_and_pagination():
+    seed()
+    assert search(q='stm32', source='stepstone')[1]['total'] == 1
+    first = search(q='stm32', per_page=2, page=1)[1]
+    second = search(q='stm32', per_page=2, page=2)[1]
+    assert (first['count'], second['count'], second['total']) == (2, 1, 3)
+    assert not {j['id'] for j in first['jobs']} & {j['id'] for j in second['jobs']}
+
+    assert search(q='')[0] == 400
+    assert search(q='stm32', source='monster')[0] == 400
+
+
+def test_index_follows_updates_and_deletes():
+    seed()
+    with app.app_context():
+        stored = Job.query.filter_by(job_title='FPGA Engineer').one()
+        stored.job_title = 'ASIC Engineer'
+        db.session.commit()
+        assert search(q='asic')[1]['total'] == 1
+        assert search(q='fpga')[1]['total'] == 0
+
+        db.session.delete(stored)
+        db.session.commit()
+    assert search(q='asic')[1]['total'] == 0
+
+
+def test_rebuild_indexes_existing_rows():
+    reset_db()
+    with app.app_context():
+        with db.engine.begin() as conn:
+            # A database from before the search index existed
+            conn.exec_driver_sql('DROP TABLE jobs_fts')
+            for action in ('insert', 'update', 'delete'):
+                conn.exec_driver_sql(f'DROP TRIGGER jobs_fts_{action}')
+            conn.exec_driver_sql(
+                "INSERT INTO jobs (source, job_title, job_url, first_seen, last_seen) "
+                "VALUES ('glassdoor', 'Hardware Engineer', 'https://example.com/x', "
+                "'2025-11-11 10:00:00', '2025-11-11 10:00:00')"
+            )
+            create_search_index(conn)
+            rebuild_search_index(conn)
+    assert search(q='hardware')[1]['total'] == 1
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing full-text search")
+    print("=" * 60)
+    for test in (test_match_query_quotes_terms,
+                 test_title_hits_rank_first,
+                 test_snippets_are_escaped_and_highlighted,
+                 test_source_filter_and_pagination,
+                 test_index_follows_updates_and_deletes,
+                 test_rebuild_indexes_existing_rows):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All search tests passed!")
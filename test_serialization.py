@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Serialization tests
+Checks that the Core/orjson read path returns the same JSON as
+Job.to_dict() / ScraperRun.to_dict() through jsonify, with and without
+orjson installed.
+
+Run with pytest or directly: python test_serialization.py
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from app import serialization
+from app.app import app
+from app.models import db, Job, ScraperRun
+from app.scraper_integration import _finish_run, _start_run, save_jobs_to_db
+
+
+def seed():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        run = _start_run('linkedin')
+        save_jobs_to_db([
+            {'job_title': 'Firmware Engineer (m/w/d)', 'company': 'Müller GmbH',
+             'location': 'München', 'job_url': f'https://www.linkedin.com/jobs/view/{i}',
+             'description': 'Zephyr "RTOS"\n', 'salary': '€70k'}
+            for i in range(5)
+        ], 'linkedin', run_id=run.id)
+        _finish_run(run, total=5, new=5)
+        # A failed run without end time or counts
+        _finish_run(_start_run('linkedin'), error='Timeout')
+        # Whole-second timestamps, which isoformat() writes without microseconds
+        db.session.get(Job, 1).first_seen = datetime(2025, 11, 11, 8, 0)
+        db.session.commit()
+
+
+def orm_payloads():
+    """What the endpoints returned when they serialized ORM objects"""
+    with app.app_context():
+        latest_run_ids = ScraperRun.latest_completed_ids()
+        jobs = Job.query.filter_by(
+            first_seen_run_id=latest_run_ids['linkedin']
+        ).order_by(Job.first_seen.desc()).all()
+        runs = ScraperRun.query.filter_by(source='linkedin').order_by(
+            ScraperRun.start_time.desc()
+        ).limit(5).all()
+        return ([job.to_dict(latest_run_ids) for job in jobs], [run.to_dict() for run in runs])
+
+
+def fetch(url):
+    response = app.test_client().get(url)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    return response.get_json()
+
+
+def check_matches_orm_path():
+    jobs, runs = orm_payloads()
+    assert fetch('/api/jobs/linkedin')['jobs'] == jobs
+    assert fetch('/api/scraper/status')['linkedin']['recent_runs'] == runs
+    assert fetch('/api/jobs/all?fields=' + ','.join(serialization.JOB_FIELDS))['jobs'] == \
+        sorted(jobs, key=lambda job: (job['first_seen'], job['id']), reverse=True)
+
+
+def test_core_path_matches_orm_path():
+    seed()
+    check_matches_orm_path()
+
+
+def test_stdlib_fallback_matches_orm_path():
+    seed()
+    orjson = serialization.orjson
+    serialization.orjson = None
+    try:
+        check_matches_orm_path()
+    finally:
+        serialization.orjson = orjson
+
+
+def test_encoders_agree():
+    payload = {'b': [datetime(2025, 1, 2, 3, 4, 5, 6789), None], 'a': 'München',
+               'c': datetime(2025, 1, 2) + timedelta(hours=1)}
+    fast = serialization.dumps(payload)
+    orjson = serialization.orjson
+    serialization.orjson = None
+    try:
+        slow = serialization.dumps(payload)
+    finally:
+        serialization.orjson = orjson
+    assert json.loads(fast) == json.loads(slow) == {
+        'a': 'München', 'b': ['2025-01-02T03:04:05.006789', None], 'c': '2025-01-02T01:00:00'
+    }
+    assert list(json.loads(fast)) == ['a', 'b', 'c']
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing serialization")
+    print("=" * 60)
+    for test in (test_core_path_matches_orm_path,
+                 test_stdlib_fallback_matches_orm_path,
+                 test_encoders_agree):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All serialization tests passed!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Startup tests
+Checks that importing the app modules has no side effects (no database, no
+scraper dependencies) and that create_app() builds independent
+applications from its configuration.
+
+Run with pytest or directly: python test_startup.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from app.app import create_app, get_app
+from app.models import db, Job
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_ONLY = """
+import os, sys
+import app.app, app.scheduler, app.scraper_integration
+print(os.path.exists(os.environ['DATABASE_PATH']))
+print(','.join(sorted(m for m in ('bs4', 'requests', 'linkedin_job_scraper') if m in sys.modules)))
+"""
+
+
+def test_imports_have_no_side_effects():
+    database_path = os.path.join(tempfile.mkdtemp(), 'untouched.db')
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_ONLY], cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, DATABASE_PATH=database_path), check=True
+    )
+    assert result.stdout.splitlines() == ['False', '']
+    assert 'Database location' not in result.stdout
+
+
+def test_create_app_uses_its_config():
+    database_path = os.path.join(tempfile.mkdtemp(), 'factory.db')
+    factory_app = create_app({'DATABASE_PATH': database_path, 'TESTING': True})
+    assert factory_app is not get_app()
+    assert factory_app.config['SQLALCHEMY_DATABASE_URI'] == f'sqlite:///{database_path}'
+
+    with factory_app.app_context():
+        # Background code called inside the context uses this app
+        assert get_app() is factory_app
+        db.session.add(Job(source='linkedin', job_title='Factory job', job_key='linkedin:1'))
+        db.session.commit()
+    jobs = factory_app.test_client().get('/api/jobs/all').get_json()['jobs']
+    assert [job['job_title'] for job in jobs] == ['Factory job']
+    assert get_app().test_client().get('/api/jobs/all').status_code == 200
+
+    bare = create_app({'DATABASE_PATH': os.path.join(tempfile.mkdtemp(), 'bare.db'),
+                       'INIT_DATABASE': False})
+    with bare.app_context():
+        assert db.inspect(db.engine).get_table_names() == []
+
+
+def test_default_app_is_created_once():
+    from app.app import app
+    assert app is get_app() is get_app()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing application startup")
+    print("=" * 60)
+    for test in (test_imports_have_no_side_effects,
+                 test_create_app_uses_its_config,
+                 test_default_app_is_created_once):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All startup tests passed!")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Trends tests
+Checks that job_rollups follows the jobs table inside the ingest
+transaction and that /api/trends answers from the rollups alone.
+
+Run with pytest or directly: python test_trends.py
+"""
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import delete, insert
+
+from app.app import app
+from app.models import db, Job
+from app.scraper_integration import save_jobs_to_db
+from app.trends import get_trends, rebuild_rollups
+from test_query_plans import capture_queries, explain
+
+NOW = datetime(2025, 11, 11, 16, 30)
+
+
+def reset_db():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def seed():
+    """Jobs first seen over the last three days"""
+    reset_db()
+    rows = []
+    for i, (source, hours_ago, company) in enumerate([
+        ('linkedin', 0, 'Bosch'), ('linkedin', 0, 'Bosch'), ('linkedin', 1, 'Infineon'),
+        ('linkedin', 30, 'Bosch'), ('stepstone', 2, 'Bosch'), ('stepstone', 50, 'Siemens'),
+        ('glassdoor', 24 * 40, 'Bosch'),  # outside a 30 day window
+    ]):
+        first_seen = NOW - timedelta(hours=hours_ago, minutes=5)
+        rows.append({'source': source, 'job_title': f'Job {i}', 'company': company,
+                     'location': 'Munich', 'job_key': f'{source}:{i}',
+                     'first_seen': first_seen, 'last_seen': first_seen})
+    with app.app_context():
+        db.session.execute(insert(Job), rows)
+        db.session.commit()
+
+
+def rollups():
+    with app.app_context():
+        return {tuple(row[:4]): row[4] for row in db.session.execute(
+            db.text('SELECT dimension, value, source, hour, new_jobs FROM job_rollups')
+        )}
+
+
+def recounted_rollups():
+    with app.app_context():
+        jobs = db.session.execute(db.select(Job)).scalars().all()
+    hour = lambda job: job.first_seen.strftime('%Y-%m-%dT%H:00:00')
+    return dict(Counter(
+        key for job in jobs for key in (
+            ('', '', job.source, hour(job)),
+            ('company', job.company or '', job.source, hour(job)),
+            ('location', job.location or '', job.source, hour(job)),
+        )
+    ))
+
+
+def trends(**kwargs):
+    with app.app_context():
+        return get_trends(now=NOW, **kwargs)
+
+
+def series(result, source):
+    return {point['start']: point['new_jobs'] for point in result['series'][source]
+            if point['new_jobs']}
+
+
+def test_rollups_follow_ingest_and_deletes():
+    seed()
+    assert rollups() == recounted_rollups()
+
+    save_jobs_to_db([{'job_title': 'Firmware Engineer', 'company': 'Bosch',
+                      'job_url': 'https://www.stepstone.de/stellenangebote--x--123.html'}],
+                    'stepstone')
+    assert rollups() == recounted_rollups()
+
+    with app.app_context():
+        db.session.execute(delete(Job).where(Job.company == 'Siemens'))
+        db.session.commit()
+    assert rollups() == recounted_rollups()
+    assert not any(value == 'Siemens' for _, value, _, _ in rollups())
+
+    expected = rollups()
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('DELETE FROM job_rollups')
+            rebuild_rollups(conn)
+    assert rollups() == expected
+
+
+def test_daily_and_hourly_series():
+    seed()
+    daily = trends(days=30)
+    assert series(daily, 'linkedin') == {'2025-11-11': 3, '2025-11-10': 1}
+    assert series(daily, 'stepstone') == {'2025-11-11': 1, '2025-11-09': 1}
+    assert series(daily, 'glassdoor') == {}
+    # Every bucket is listed, oldest first
+    starts = [point['start'] for point in daily['series']['linkedin']]
+    assert starts == sorted(starts) and len(starts) == 31
+
+    hourly = trends(days=1, bucket='hour', sources=['linkedin'])
+    assert list(hourly['series']) == ['linkedin']
+    assert series(hourly, 'linkedin') == {'2025-11-11T16:00:00': 2, '2025-11-11T15:00:00': 1}
+    assert len(hourly['series']['linkedin']) == 25
+
+    assert series(trends(days=30, company='Bosch'), 'stepstone') == {'2025-11-11': 1}
+    assert series(trends(days=90), 'glassdoor') == {'2025-10-02': 1}
+
+
+def test_trends_endpoint_reads_only_rollups():
+    seed()
+    client = app.test_client()
+    queries = capture_queries(lambda: client.get('/api/trends?days=90&location=Munich'))
+    trend_queries = [query for query in queries if 'job_rollups' in query[0]]
+    assert len(trend_queries) == 1
+    assert 'jobs.' not in trend_queries[0][0] and ' jobs ' not in trend_queries[0][0]
+    # A primary key range read; grouping sorts only the rows in the window
+    plan = explain(*trend_queries[0])
+    assert plan[0].startswith('SEARCH job_rollups USING PRIMARY KEY'), plan
+
+    data = client.get('/api/trends?bucket=hour&days=2&source=stepstone').get_json()
+    assert data['bucket'] == 'hour' and list(data['series']) == ['stepstone']
+    assert client.get('/api/trends?bucket=week').status_code == 400
+    assert client.get('/api/trends?days=0').status_code == 400
+    assert client.get('/api/trends?source=monster').status_code == 400
+    assert client.get('/api/trends?company=Bosch&location=Munich').status_code == 400
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing trends")
+    print("=" * 60)
+    for test in (test_rollups_follow_ingest_and_deletes,
+                 test_daily_and_hourly_series,
+                 test_trends_endpoint_reads_only_rollups):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All trend tests passed!")
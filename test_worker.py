@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Scraper worker tests
+Checks that web processes only queue scraper triggers and that the scraper
+worker process owns the scheduler, consumes the queue and stops on SIGTERM.
+
+Run with pytest or directly: python test_worker.py
+"""
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Use a throwaway database so the test never touches data/jobs.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_jobs.db'))
+
+from sqlalchemy import insert
+
+from app import leader, scheduler
+from app.app import app
+from app.eligibility import invalidate_eligibility
+from app.models import db, ScraperRun, ScrapeRequest
+from test_leader import restore_leader_state
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def reset_db():
+    """Every source has just been scraped, so nothing is stale"""
+    invalidate_eligibility()
+    now = datetime.utcnow()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(ScraperRun), [
+            {'source': source, 'status': 'completed',
+             'start_time': now - timedelta(minutes=2), 'end_time': now}
+            for source in scheduler.SOURCES
+        ])
+        db.session.commit()
+
+
+def queued():
+    with app.app_context():
+        return db.session.query(ScrapeRequest).count()
+
+
+def test_web_process_only_queues_triggers():
+    reset_db()
+    started = []
+    start_scrape = scheduler.start_scrape
+    scheduler.start_scrape = started.append
+    try:
+        from wsgi import start_background_services
+        start_background_services()  # SCRAPER_MODE defaults to 'process'
+        assert not leader.owns_scrapers() and not leader.is_leader()
+
+        invalidate_eligibility()
+        with app.app_context():
+            db.session.execute(db.delete(ScraperRun))
+            db.session.commit()
+        response = app.test_client().get('/api/scraper/trigger/stepstone')
+        assert response.get_json()['status'] == 'queued'
+        assert started == [] and queued() == 1
+    finally:
+        scheduler.start_scrape = start_scrape
+        restore_leader_state()
+
+
+def test_worker_process_consumes_queue():
+    reset_db()
+    lock = f"{os.environ['DATABASE_PATH']}.scheduler.lock"
+    worker = subprocess.Popen([sys.executable, 'worker.py'], cwd=ROOT,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            if os.path.exists(lock) and open(lock).read().strip() == str(worker.pid):
+                break
+            time.sleep(0.1)
+        else:
+            raise AssertionError('the worker did not take the scheduler lock')
+
+        # Fresh data: no scrape on startup; the trigger is picked up, and
+        # skipped because the cooldown has not passed
+        scheduler.request_scrape('glassdoor')
+        deadline = time.monotonic() + 3 * scheduler.SCRAPE_REQUEST_POLL_SECONDS
+        while queued() and time.monotonic() < deadline:
+            time.sleep(0.2)
+        assert queued() == 0
+
+        worker.send_signal(signal.SIGTERM)
+        output = worker.communicate(timeout=10)[0]
+    finally:
+        if worker.poll() is None:
+            worker.kill()
+            worker.communicate()
+    assert worker.returncode == 0
+    assert 'owns the scheduler and scrapers' in output
+    assert 'All sources are fresh, no scrape on startup' in output
+    assert 'triggered through another worker: glassdoor' in output
+    with app.app_context():
+        assert db.session.query(ScraperRun).count() == 3
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Testing the scraper worker")
+    print("=" * 60)
+    for test in (test_web_process_only_queues_triggers,
+                 test_worker_process_consumes_queue):
+        test()
+        print(f"   ✓ {test.__name__}")
+    print("=" * 60)
+    print("✅ All scraper worker tests passed!")
@@ -0,0 +1,72 @@
+"""
+Scraper worker
+Runs the scheduler and the scrapers in a process of their own, so HTML
+parsing (CPU-bound, holding the GIL) never slows down API requests. The web
+processes only queue manual triggers (scrape_requests table) and read the
+run status from the database; this process picks the triggers up.
+
+    python worker.py
+
+run.py and gunicorn (gunicorn.conf.py) start one automatically. The worker
+takes the scheduler lock (app/leader.py), so a second worker waits as a
+standby and takes over if the first one exits.
+
+Settings:
+    SCRAPER_MODE    (default 'process': run.py/gunicorn start this worker;
+                     'external': the worker is started separately, e.g. in
+                     its own container; 'inline': no worker, one of the web
+                     processes runs the scrapers in threads)
+"""
+import multiprocessing
+import os
+import signal
+import threading
+
+SCRAPER_MODE = os.environ.get('SCRAPER_MODE', 'process')
+
+
+def run_worker():
+    """Own the scheduler once elected, until SIGTERM or Ctrl+C"""
+    from app.app import get_app
+    from app.leader import elect_leader, lock_path
+
+    app = get_app()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    schedulers = []
+
+    def on_elected():
+        from app.scheduler import init_scheduler
+
+        print(f"👑 Scraper worker {os.getpid()} owns the scheduler and scrapers")
+        schedulers.append(init_scheduler())
+
+    if not elect_leader(lock_path(app.config['DATABASE_PATH']), on_elected):
+        print(f"⏳ Scraper worker {os.getpid()} is on standby; another process owns the scrapers")
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for scheduler in schedulers:
+            scheduler.shutdown(wait=False)
+
+
+def start_worker_process():
+    """
+    Start run_worker() in a child process
+
+    Spawned rather than forked, so it shares no database connections or
+    threads with the web process; it exits with its parent.
+    """
+    process = multiprocessing.get_context('spawn').Process(
+        target=run_worker, name='scraper-worker', daemon=True
+    )
+    process.start()
+    print(f"🔧 Scraper worker started (process {process.pid})")
+    return process
+
+
+if __name__ == '__main__':
+    run_worker()
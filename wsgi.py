@@ -0,0 +1,49 @@
+"""
+WSGI entry point for production
+Serves the API from several worker processes:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every worker calls start_background_services() once (gunicorn.conf.py) and
+relays the events of the scraper worker (worker.py) to its /api/stream
+clients. With SCRAPER_MODE=inline there is no scraper worker: exactly one
+of the web workers becomes the scheduler leader and runs the scheduler and
+the scrapers. run.py uses the same function for the development server.
+"""
+import os
+
+from app.app import get_app
+from app.events import relay_committed_events
+from app.leader import elect_leader, is_leader, lock_path, serve_only
+from worker import SCRAPER_MODE
+
+app = get_app()
+
+
+def start_background_services():
+    """
+    Take part in the scheduler leader election
+
+    The leader resumes the stored schedule and only scrapes the sources
+    whose data is stale (see app/scheduler.py), so restarts stay cheap.
+    Unless SCRAPER_MODE=inline the leader is the scraper worker and this
+    process only serves the API; so does it with SCHEDULER_ENABLED=0.
+    """
+    relay_committed_events(app, should_relay=lambda: not is_leader())
+    if SCRAPER_MODE != 'inline':
+        serve_only()
+        print(f"🌐 Process {os.getpid()} serves the API; the scraper worker runs the scrapers")
+        return
+    if os.environ.get('SCHEDULER_ENABLED', '1') == '0':
+        serve_only()
+        print("⏸️  SCHEDULER_ENABLED=0: this process only serves the API")
+        return
+
+    def on_elected():
+        from app.scheduler import init_scheduler
+
+        print(f"👑 Process {os.getpid()} owns the scheduler and scrapers")
+        init_scheduler()
+
+    if not elect_leader(lock_path(app.config['DATABASE_PATH']), on_elected):
+        print(f"👥 Process {os.getpid()} serves the API; another process owns the scheduler")